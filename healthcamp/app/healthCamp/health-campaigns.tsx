@@ -27,24 +27,45 @@ export default function HealthCampaigns() {
   const [confirmVisible, setConfirmVisible] = useState(false);
   const [selected, setSelected] = useState<Campaign | null>(null);
   const [patient, setPatient] = useState<PatientInfo | null>(null);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Backend returns a cursor page: { next, results }
+  const loadPage = async (url: string) => {
+    const res = await API.get(url);
+    const items = Array.isArray(res.data) ? res.data : res.data?.results ?? [];
+    // Map backend helpline_number -> helpline for UI compatibility
+    const normalized = items.map((c: any) => ({
+      id: c.id,
+      title: c.title,
+      timing: c.date ?? c.timing ?? null,
+      location: c.location ?? null,
+      helpline: c.helpline ?? c.helpline_number ?? null,
+      maps_url: c.maps_url ?? null,
+      vaccines: Array.isArray(c.vaccines) ? c.vaccines : [],
+      medicines: Array.isArray(c.medicines) ? c.medicines : [],
+    }));
+    setNextUrl(Array.isArray(res.data) ? null : res.data?.next ?? null);
+    return normalized as Campaign[];
+  };
+
+  const loadMore = async () => {
+    if (!nextUrl || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const more = await loadPage(nextUrl);
+      setData((prev) => [...prev, ...more]);
+    } catch (e) {
+      console.warn('Failed to load more campaigns', e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     (async () => {
       try {
-        const res = await API.get('/api/healthCampaigns/');
-        const items = Array.isArray(res.data) ? res.data : [];
-        // Map backend helpline_number -> helpline for UI compatibility
-        const normalized = items.map((c: any) => ({
-          id: c.id,
-          title: c.title,
-          timing: c.date ?? c.timing ?? null,
-          location: c.location ?? null,
-          helpline: c.helpline ?? c.helpline_number ?? null,
-          maps_url: c.maps_url ?? null,
-          vaccines: Array.isArray(c.vaccines) ? c.vaccines : [],
-          medicines: Array.isArray(c.medicines) ? c.medicines : [],
-        }));
-        setData(normalized);
+        setData(await loadPage('/api/healthCampaigns/'));
       } catch (e) {
         console.warn('Failed to load campaigns', e);
       }
@@ -90,6 +111,8 @@ export default function HealthCampaigns() {
         keyExtractor={(item) => String(item.id)}
         renderItem={({ item }) => <CampaignCard healthCampaign={item} onRegister={onRegister} />}
         ListEmptyComponent={<Text style={styles.empty}>No campaigns available.</Text>}
+        onEndReached={loadMore}
+        onEndReachedThreshold={0.5}
       />
 
       <Modal transparent visible={confirmVisible} animationType="fade" onRequestClose={() => setConfirmVisible(false)}>
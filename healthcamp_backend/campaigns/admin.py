@@ -1,7 +1,15 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
 from django import forms
-from urllib.parse import urlparse
-from .models import Campaign, Vaccine, Medicine
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from core.admin_tools import LargeTableAdmin
+from . import importer, search
+from .models import Campaign, Disease, Vaccine, Medicine
+from .validators import validate_maps_url
 
 
 class CampaignAdminForm(forms.ModelForm):
@@ -11,43 +19,111 @@ class CampaignAdminForm(forms.ModelForm):
 
     def clean_maps_url(self):
         value = self.cleaned_data.get("maps_url")
-        if not value:
-            return value
-        try:
-            parsed = urlparse(value)
-        except Exception:
-            raise forms.ValidationError("Invalid URL.")
-        host = (parsed.hostname or "").lower()
-        allowed_hosts = {
-            "maps.google.com",
-            "www.google.com",
-            "google.com",
-            "goo.gl",
-        }
-        if host not in allowed_hosts:
-            raise forms.ValidationError("Only Google Maps links are allowed.")
-        # For google.com hosts, require path to start with /maps or be a goo.gl short link
-        if host in {"www.google.com", "google.com"} and not (parsed.path or "").startswith("/maps"):
-            raise forms.ValidationError("Path must start with /maps for Google Maps links.")
+        validate_maps_url(value)
         return value
 
 
+class CatalogueImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV (.csv) or JSON (.json, .jsonl, .ndjson), UTF-8.")
+    dry_run = forms.BooleanField(required=False, help_text="Only validate the rows; write nothing.")
+
+
+class CatalogueImportMixin:
+    """Adds an "Import CSV/JSON" page to the changelist (see campaigns.importer)."""
+
+    import_kind = None
+    change_list_template = "admin/campaigns/change_list_import.html"
+    # Row errors shown as messages; the rest are only counted
+    import_error_limit = 50
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path("import/", self.admin_site.admin_view(self.import_view), name="%s_%s_import" % info),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        form = CatalogueImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = "json" if upload.name.lower().endswith((".json", ".jsonl", ".ndjson")) else "csv"
+            errors = []
+
+            def on_error(row, field, message):
+                if len(errors) < self.import_error_limit:
+                    errors.append(f"Row {row}" + (f", {field}" if field else "") + f": {message}")
+
+            try:
+                report = importer.import_catalogue(
+                    io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""),
+                    kind=self.import_kind,
+                    fmt=fmt,
+                    dry_run=form.cleaned_data["dry_run"],
+                    on_error=on_error,
+                )
+            except (importer.ImportFormatError, UnicodeDecodeError) as exc:
+                form.add_error("file", str(exc))
+            else:
+                self.message_user(request, str(report), messages.WARNING if report.failed else messages.SUCCESS)
+                for error in errors:
+                    self.message_user(request, error, messages.ERROR)
+                return redirect(reverse(f"admin:{self.opts.app_label}_{self.opts.model_name}_changelist"))
+
+        _, key, columns = importer.KINDS[self.import_kind]
+        if self.import_kind == "campaign":
+            columns = (*columns, *importer.SERVICE_COLUMNS)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": f"Import {self.opts.verbose_name_plural}",
+            "form": form,
+            "columns": columns,
+            "natural_key": " + ".join(key),
+        }
+        return TemplateResponse(request, "admin/campaigns/import.html", context)
+
+
 @admin.register(Campaign)
-class CampaignAdmin(admin.ModelAdmin):
+class CampaignAdmin(CatalogueImportMixin, LargeTableAdmin):
     form = CampaignAdminForm
-    list_display = ("title", "type", "location", "date")
-    search_fields = ("title", "location", "type")
+    list_display = ("title", "type", "location", "date", "capacity", "registered_count")
+    # Served from the catalogue search index, see get_search_results
+    search_fields = ("title", "location", "description")
+    search_help_text = "Word prefixes in the title, location or description."
     list_filter = ("type", "date")
-    filter_horizontal = ("vaccines", "medicines")
+    autocomplete_fields = ("vaccines", "medicines")
+    # Maintained by registrations.seats
+    readonly_fields = ("registered_count",)
+    search_limit = 1000
+    import_kind = "campaign"
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        hits = search.search(search_term, kinds=["campaign"], limit=self.search_limit)
+        return queryset.filter(pk__in=[hit["id"] for hit in hits]), False
 
 
 @admin.register(Vaccine)
-class VaccineAdmin(admin.ModelAdmin):
+class VaccineAdmin(CatalogueImportMixin, admin.ModelAdmin):
     list_display = ("name", "type", "age_group", "timing")
     search_fields = ("name", "type", "age_group")
+    import_kind = "vaccine"
 
 
 @admin.register(Medicine)
-class MedicineAdmin(admin.ModelAdmin):
+class MedicineAdmin(CatalogueImportMixin, admin.ModelAdmin):
     list_display = ("name", "availability")
     search_fields = ("name", "availability")
+    import_kind = "medicine"
+
+
+@admin.register(Disease)
+class DiseaseAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug")
+    search_fields = ("name",)
+    prepopulated_fields = {"slug": ("name",)}
+    autocomplete_fields = ("medicines",)
@@ -0,0 +1,99 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from core.async_views import AsyncAPIView
+from core.db_router import allow_replica_reads
+from core.instrumentation import serializer_timer
+from .cache import (
+    RESPONSE_KEY,
+    aget_versions,
+    areplicas_caught_up,
+    cache_entries,
+    etag_matches,
+    fingerprint,
+    get_cache,
+    set_validators,
+    stale_key,
+    stale_response,
+)
+from .views import CampaignViewSet, VaccineViewSet, MedicineViewSet
+
+
+class AsyncCatalogueView(AsyncAPIView):
+    """
+    Async ``list``/``retrieve`` for a catalogue viewset.
+
+    The viewset is instantiated only for its queryset, filter, pagination and
+    serializer hooks. Responses share the versioned cache entries and ETags of
+    ``VersionedCacheMixin``, so clients may switch between the two paths
+    freely.
+    """
+
+    viewset_class = None
+    chunk_size = 2000
+
+    def get_viewset(self, request, pk):
+        return self.viewset_class(
+            request=self.drf_request(request),
+            action="retrieve" if pk is not None else "list",
+            args=(),
+            kwargs={} if pk is None else {"pk": pk},
+            format_kwarg=None,
+        )
+
+    async def get(self, request, pk=None):
+        viewset = self.get_viewset(request, pk)
+        versions = await aget_versions(viewset.cache_models)
+        digest, etag = fingerprint(request, self.accepted_media_type, versions)
+        if etag_matches(request, etag):
+            return set_validators(self.render(None, status.HTTP_304_NOT_MODIFIED), etag)
+
+        cache = get_cache()
+        key = RESPONSE_KEY.format(digest)
+        data = await cache.aget(key)
+        if data is None:
+            if getattr(request, "admission_shed", False):
+                stale = await cache.aget(stale_key(request, self.accepted_media_type))
+                return stale_response(stale, self.render)
+            if await areplicas_caught_up(viewset.cache_models):
+                allow_replica_reads()
+            data = await (self.list(viewset) if pk is None else self.retrieve(viewset, pk))
+            await cache.aset_many(
+                cache_entries(request, self.accepted_media_type, key, data),
+                getattr(settings, "CATALOGUE_CACHE_TIMEOUT", 3600),
+            )
+        return set_validators(self.render(data), etag)
+
+    async def list(self, viewset):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        if paginator is None:
+            rows = [obj async for obj in queryset.aiterator(chunk_size=self.chunk_size)]
+            with serializer_timer():
+                return viewset.get_serializer(rows, many=True).data
+        rows = await paginator.apaginate_queryset(queryset, viewset.request, view=viewset)
+        with serializer_timer():
+            data = viewset.get_serializer(rows, many=True).data
+        return paginator.get_paginated_response(data).data
+
+    async def retrieve(self, viewset, pk):
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        try:
+            obj = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise NotFound("No %s matches the given query." % queryset.model._meta.object_name)
+        with serializer_timer():
+            return viewset.get_serializer(obj).data
+
+
+class AsyncCampaignView(AsyncCatalogueView):
+    viewset_class = CampaignViewSet
+
+
+class AsyncVaccineView(AsyncCatalogueView):
+    viewset_class = VaccineViewSet
+
+
+class AsyncMedicineView(AsyncCatalogueView):
+    viewset_class = MedicineViewSet
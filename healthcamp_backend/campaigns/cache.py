@@ -0,0 +1,208 @@
+"""
+Versioned response cache for the read-only catalogue endpoints.
+
+Every model that feeds a cached response has a version counter in the cache.
+Signals in ``campaigns.signals`` bump the counter whenever a row (or an M2M
+link) changes, once the change commits, so cached responses are never
+invalidated explicitly: a bump simply moves every key and ETag on to a new
+value and the old entries age out.
+
+With read replicas configured (``core.db_router``), a response may only be
+built from a replica once the replica has caught up with the write behind the
+current version, or a stale body would be cached and tagged as current. A
+version bump therefore also marks the model as recently written for
+``REPLICA_PIN_SECONDS``, and during that window reads stay on the primary.
+
+The counters live in the cache alias named by ``settings.CATALOGUE_CACHE_ALIAS``.
+Local memory is per-process, so deployments with more than one worker should
+point that alias at the file or Redis backend (see ``CACHE_BACKEND`` in
+``core.settings``).
+
+The last response for each URL is also kept under a version-less key. When
+``core.admission`` sheds a read because the process is saturated, a cache
+miss is answered from that stale copy instead of the database.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.admission import Overloaded
+from core.db_router import allow_replica_reads
+
+VERSION_KEY = "catalogue:version:{}"
+RESPONSE_KEY = "catalogue:response:{}"
+WRITTEN_KEY = "catalogue:written:{}"
+STALE_KEY = "catalogue:stale:{}"
+
+
+def get_cache():
+    return caches[getattr(settings, "CATALOGUE_CACHE_ALIAS", "default")]
+
+
+def _seed():
+    # Seed from the clock so a flushed cache never reissues an ETag a client
+    # may still hold for older data.
+    return time.time_ns()
+
+
+def get_versions(models):
+    """Return the current version counter for each model, in order."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(model._meta.label_lower) for model in models]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _seed(), timeout=None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, 0) for key in keys]
+
+
+async def aget_versions(models):
+    """Async counterpart of ``get_versions``."""
+    cache = get_cache()
+    keys = [VERSION_KEY.format(model._meta.label_lower) for model in models]
+    found = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, _seed(), timeout=None)
+        found.update(await cache.aget_many(missing))
+    return [found.get(key, 0) for key in keys]
+
+
+def bump_version(model):
+    """
+    Move ``model`` on to a new version once the current transaction commits
+    (at once outside one). Bumping earlier would let a concurrent reader cache
+    the rows it can still see, the old ones, under the new version.
+    """
+    transaction.on_commit(lambda: _bump(model))
+
+
+def _bump(model):
+    cache = get_cache()
+    key = VERSION_KEY.format(model._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter not present yet (or evicted): start a fresh one
+        cache.add(key, _seed(), timeout=None)
+    if getattr(settings, "DATABASE_REPLICAS", []):
+        cache.set(WRITTEN_KEY.format(model._meta.label_lower), 1, getattr(settings, "REPLICA_PIN_SECONDS", 5))
+
+
+def replicas_caught_up(models):
+    """True when replicas may serve ``models``: none were written in the pin window."""
+    if not getattr(settings, "DATABASE_REPLICAS", []):
+        return False
+    return not get_cache().get_many([WRITTEN_KEY.format(model._meta.label_lower) for model in models])
+
+
+async def areplicas_caught_up(models):
+    if not getattr(settings, "DATABASE_REPLICAS", []):
+        return False
+    return not await get_cache().aget_many([WRITTEN_KEY.format(model._meta.label_lower) for model in models])
+
+
+class VersionedCacheMixin:
+    """
+    Cache ``list``/``retrieve`` responses keyed on the versions of
+    ``cache_models`` and answer matching ``If-None-Match`` with 304.
+
+    The ETag is derived from the request URL, the negotiated media type, the
+    current date and the model versions only, so a conditional GET is
+    answered before any query runs. Responses are built from a read replica
+    when one is configured and has caught up with the latest write.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.cache_models)
+        digest, etag = fingerprint(request, request.accepted_media_type, versions)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = get_cache()
+            key = RESPONSE_KEY.format(digest)
+            data = cache.get(key)
+            if data is None:
+                if getattr(request, "admission_shed", False):
+                    return stale_response(cache.get(stale_key(request, request.accepted_media_type)))
+                if replicas_caught_up(self.cache_models):
+                    allow_replica_reads()
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set_many(
+                    cache_entries(request, request.accepted_media_type, key, response.data),
+                    getattr(settings, "CATALOGUE_CACHE_TIMEOUT", 3600),
+                )
+            else:
+                response = Response(data)
+        return set_validators(response, etag)
+
+
+def fingerprint(request, media_type, versions):
+    """Return the cache digest and ETag for a catalogue response."""
+    # The date is part of the fingerprint because filters such as
+    # ``upcoming`` depend on it.
+    raw = "|".join(
+        [
+            request.build_absolute_uri(),
+            media_type or "",
+            timezone.localdate().isoformat(),
+            *map(str, versions),
+        ]
+    )
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40]
+    return digest, quote_etag(digest)
+
+
+def stale_key(request, media_type):
+    """Key of the last response cached for a URL and media type, whatever the versions."""
+    raw = f"{request.build_absolute_uri()}|{media_type or ''}"
+    return STALE_KEY.format(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:40])
+
+
+def cache_entries(request, media_type, key, data):
+    """The fresh entry and the stale fallback ``core.admission`` sheds reads to."""
+    return {key: data, stale_key(request, media_type): data}
+
+
+def stale_response(data, render=Response):
+    """Answer a read shed by ``core.admission`` with a stale body, or refuse it."""
+    if data is None:
+        raise Overloaded()
+    response = render(data)
+    # No ETag: the body does not match the current versions
+    response["Cache-Control"] = "no-cache"
+    response["X-Served-Stale"] = "1"
+    return response
+
+
+def etag_matches(request, etag):
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    return "*" in client_etags or etag in [tag.removeprefix("W/") for tag in client_etags]
+
+
+def set_validators(response, etag):
+    response["ETag"] = etag
+    # Clients may store the response but must revalidate it every time
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,132 @@
+"""
+Disease -> medicine -> campaign availability index.
+
+``DiseaseAvailability`` holds one row per (disease, medicine, campaign) where
+the campaign offers a medicine linked to the disease, with a copy of the
+campaign date. "Which upcoming camps offer medicine for this condition?" is
+then one range scan on ``(disease, date)`` instead of joining diseases,
+medicines and campaigns per request.
+
+The signals in ``campaigns.signals`` keep it current as ``Campaign.medicines``
+or ``Disease.medicines`` change (``m2m_changed``) and as campaigns move date.
+Each change re-derives only the affected rows with one set-based
+``INSERT ... SELECT`` or ``DELETE``. Writers that bypass signals (the
+catalogue importer, load generation) call ``index``/``unindex`` or
+``rebuild`` themselves.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Campaign, Disease, DiseaseAvailability, Medicine
+
+# The mobile app's bundled mapping, ingested by ``manage.py load_diseases``
+DEFAULT_SOURCE = Path(settings.BASE_DIR).parent / "app" / "FreeMedicine" / "disease_medicines.json"
+# Campaign columns loaded with each index row
+CAMPAIGN_FIELDS = ("title", "location", "date", "type", "helpline_number", "maps_url", "image_url")
+
+
+def index(diseases=None, medicines=None, campaigns=None):
+    """
+    Add the index rows for the links matching every given id list (None
+    means any), e.g. ``index(campaigns=[pk], medicines=added)``. Existing
+    rows are left alone.
+    """
+    quote = connection.ops.quote_name
+    disease_links = Disease.medicines.through._meta
+    campaign_links = Campaign.medicines.through._meta
+    dm_disease = "dm." + quote(disease_links.get_field("disease").column)
+    dm_medicine = "dm." + quote(disease_links.get_field("medicine").column)
+    cm_campaign = "cm." + quote(campaign_links.get_field("campaign").column)
+    cm_medicine = "cm." + quote(campaign_links.get_field("medicine").column)
+
+    conditions, params = ["1 = 1"], []
+    for column, ids in ((dm_disease, diseases), (dm_medicine, medicines), (cm_campaign, campaigns)):
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                return
+            conditions.append(f"{column} IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+    opts = DiseaseAvailability._meta
+    columns = ", ".join(quote(opts.get_field(name).column) for name in ("disease", "medicine", "campaign", "date"))
+    # SQLite needs the WHERE clause to tell ON CONFLICT apart from a join's ON
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({columns}) "
+        f"SELECT {dm_disease}, {dm_medicine}, c.id, c.date "
+        f"FROM {quote(disease_links.db_table)} dm "
+        f"JOIN {quote(campaign_links.db_table)} cm ON {cm_medicine} = {dm_medicine} "
+        f"JOIN {quote(Campaign._meta.db_table)} c ON c.id = {cm_campaign} "
+        f"WHERE {' AND '.join(conditions)} ON CONFLICT DO NOTHING"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def unindex(**filters):
+    """Drop the index rows matching ``filters``, e.g. ``unindex(campaign=pk, medicine__in=removed)``."""
+    DiseaseAvailability.objects.filter(**filters).delete()
+
+
+def move_campaign(campaign):
+    DiseaseAvailability.objects.filter(campaign=campaign).exclude(date=campaign.date).update(date=campaign.date)
+
+
+def rebuild():
+    with transaction.atomic():
+        DiseaseAvailability.objects.all().delete()
+        index()
+
+
+def upcoming(slug, limit):
+    """
+    Up to ``limit`` upcoming campaigns offering medicine for the disease, soonest
+    first, as ``[(campaign, [medicine, ...])]``; None if there is no such disease.
+    """
+    rows = (
+        DiseaseAvailability.objects.filter(disease__slug=slug, date__gte=timezone.localdate())
+        .select_related("campaign", "medicine")
+        .only("date", "campaign", "medicine__name", *(f"campaign__{name}" for name in CAMPAIGN_FIELDS))
+        # The index order, so rows stream without a sort
+        .order_by("date", "campaign_id")
+    )
+    results = []
+    for row in rows.iterator(chunk_size=limit * 4):
+        if not results or results[-1][0].pk != row.campaign_id:
+            if len(results) == limit:
+                break
+            results.append((row.campaign, []))
+        results[-1][1].append(row.medicine)
+    if not results and not Disease.objects.filter(slug=slug).exists():
+        return None
+    return [(campaign, sorted(medicines, key=lambda m: m.name)) for campaign, medicines in results]
+
+
+def load(mapping):
+    """
+    Create or update diseases from ``{disease name: [medicine name, ...]}``,
+    creating unknown medicines. Returns the number of diseases loaded.
+    """
+    # Imported here: the importer maintains this index through this module
+    from .importer import resolve_services
+
+    if not isinstance(mapping, dict):
+        raise ValueError("Expected an object mapping disease names to medicine names.")
+    names = {name.strip() for medicines in mapping.values() for name in medicines if name.strip()}
+    medicine_ids = resolve_services(Medicine, names) if names else {}
+    with transaction.atomic():
+        for name, medicines in mapping.items():
+            disease, _ = Disease.objects.update_or_create(name=name.strip(), defaults={"slug": slugify(name)})
+            # set() sends m2m_changed, which updates the index for this disease
+            disease.medicines.set([medicine_ids[m.strip()] for m in medicines if m.strip()])
+    return len(mapping)
+
+
+def load_file(path=DEFAULT_SOURCE):
+    with open(path, encoding="utf-8") as fp:
+        return load(json.load(fp))
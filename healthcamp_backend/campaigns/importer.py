@@ -0,0 +1,319 @@
+"""
+Bulk catalogue import from district health office spreadsheets.
+
+A file (CSV with a header row, or a JSON array / JSON lines document) is read
+as a stream and handled ``chunk_size`` rows at a time, so memory use does not
+grow with the file. Each row is validated with the model fields' own
+``clean()``; invalid rows are skipped and reported through ``on_error`` with
+their row number. Valid rows are written per chunk, in one transaction, with
+``bulk_create(update_conflicts=True)`` on the natural key (a campaign's title,
+date and location; a vaccine's or medicine's name), so importing a sheet again
+updates rows in place. Only the columns present in a row are updated.
+
+Campaign rows may list vaccines and medicines by name (``;``-separated in
+CSV, a list in JSON). Unknown names are created, and the campaign's links are
+replaced with one DELETE and one ``executemany`` INSERT into the through
+table.
+
+``bulk_create`` sends no signals, so each chunk indexes its rows for search
+and disease availability, bumps the catalogue cache versions and fills seats
+freed by raised capacities itself. It publishes no push events
+(``core.events``): clients showing the catalogue see an import on their next
+delta sync or refetch.
+"""
+
+import csv
+import json
+import re
+from collections import defaultdict
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, models, transaction
+
+from registrations.models import WaitlistEntry
+from registrations.seats import promote_waitlist
+from . import diseases, search
+from .cache import bump_version
+from .models import Campaign, Vaccine, Medicine
+from .validators import validate_maps_url
+
+CHUNK_SIZE = 2000
+LIST_SEPARATOR = ";"
+FORMATS = ("csv", "json")
+
+# kind -> (model, natural key, importable columns)
+KINDS = {
+    "campaign": (
+        Campaign,
+        ("title", "date", "location"),
+        (
+            "title",
+            "description",
+            "location",
+            "date",
+            "helpline_number",
+            "maps_url",
+            "type",
+            "image_url",
+            "capacity",
+            "waitlist_enabled",
+        ),
+    ),
+    "vaccine": (Vaccine, ("name",), ("name", "type", "age_group", "timing")),
+    "medicine": (Medicine, ("name",), ("name", "type", "age_group", "description", "availability")),
+}
+# Campaign columns naming linked services
+SERVICE_COLUMNS = {"vaccines": Vaccine, "medicines": Medicine}
+
+BOOLEANS = {
+    **dict.fromkeys(("true", "t", "yes", "y", "1"), True),
+    **dict.fromkeys(("false", "f", "no", "n", "0"), False),
+}
+CAMPAIGN_TYPES = {
+    **{value: value for value, _ in Campaign.TYPE_CHOICES},
+    **{label.lower(): value for value, label in Campaign.TYPE_CHOICES},
+}
+JSON_SEPARATORS = re.compile(r"[\s,\[\]]*")
+# A JSON record that is still unparsable after this much text is malformed
+MAX_JSON_RECORD = 1 << 20
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be read (as opposed to a row failing validation)."""
+
+
+class ImportReport:
+    def __init__(self, kind, dry_run=False):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+
+    def __str__(self):
+        verb = "Validated" if self.dry_run else "Imported"
+        return f"{verb} {self.imported} of {self.rows} {self.kind} rows; {self.failed} failed."
+
+
+def header(name):
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def read_csv(fp):
+    """Yield ``(line number, row)`` from a CSV file with a header row."""
+    reader = csv.reader(fp)
+    try:
+        names = [header(name) for name in next(reader)]
+    except StopIteration:
+        return
+    except csv.Error as exc:
+        raise ImportFormatError(f"Invalid CSV: {exc}")
+    try:
+        for values in reader:
+            if any(values):
+                yield reader.line_num, dict(zip(names, values))
+    except csv.Error as exc:
+        raise ImportFormatError(f"Invalid CSV on line {reader.line_num}: {exc}")
+
+
+def read_json(fp, read_size=1 << 16):
+    """Yield ``(record number, object)`` from a JSON array or JSON lines, a buffer at a time."""
+    decoder = json.JSONDecoder()
+    buffer, position, number, eof = "", 0, 0, False
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+        try:
+            if position == len(buffer):
+                raise json.JSONDecodeError("Expecting value", buffer, position)
+            value, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as exc:
+            # Most likely a record cut off at the end of the buffer
+            if eof or len(buffer) - position > MAX_JSON_RECORD:
+                if eof and position == len(buffer):
+                    return
+                raise ImportFormatError(f"Invalid JSON after record {number}: {exc.msg}")
+            more = fp.read(read_size)
+            eof = not more
+            buffer, position = buffer[position:] + more, 0
+            continue
+        number += 1
+        yield number, value
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def coerce(field, value):
+    """Turn a spreadsheet cell into what ``field.clean()`` expects."""
+    if isinstance(value, str):
+        value = value.strip()
+    if value in ("", None):
+        if field.has_default():
+            return field.get_default()
+        return None if field.null else ""
+    if isinstance(field, models.BooleanField) and isinstance(value, str):
+        return BOOLEANS.get(value.lower(), value)
+    if field.model is Campaign and field.name == "type" and isinstance(value, str):
+        return CAMPAIGN_TYPES.get(value.lower(), value)
+    if isinstance(field, models.DateField) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def service_names(value):
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    elif not isinstance(value, list):
+        raise ValidationError("Expected a list of names.")
+    names = [str(name).strip() for name in value if name is not None and str(name).strip()]
+    too_long = [name for name in names if len(name) > 120]
+    if too_long:
+        raise ValidationError(f"Name longer than 120 characters: {too_long[0][:40]}...")
+    return list(dict.fromkeys(names))
+
+
+def clean_row(kind, record):
+    """Return ``(instance, columns, links)`` for one row, or raise ValidationError with a message dict."""
+    model, _, columns = KINDS[kind]
+    if not isinstance(record, dict):
+        raise ValidationError("Expected an object.")
+    record = {header(name): value for name, value in record.items()}
+    values, errors = {}, {}
+    for name in columns:
+        field = model._meta.get_field(name)
+        value = coerce(field, record[name]) if name in record else None
+        if value in ("", None) and not field.blank and not field.has_default():
+            errors[name] = ["This field is required."]
+        elif name in record:
+            values[name] = value
+    instance = model(**values)
+    try:
+        instance.clean_fields(exclude=[name for name in columns if name not in values])
+    except ValidationError as exc:
+        for name, messages in exc.message_dict.items():
+            errors.setdefault(name, []).extend(messages)
+    if values.get("maps_url"):
+        try:
+            validate_maps_url(values["maps_url"])
+        except ValidationError as exc:
+            errors.setdefault("maps_url", []).extend(exc.messages)
+    links = {}
+    if model is Campaign:
+        for name in SERVICE_COLUMNS:
+            if name in record and record[name] is not None:
+                try:
+                    links[name] = service_names(record[name])
+                except ValidationError as exc:
+                    errors[name] = exc.messages
+    if errors:
+        raise ValidationError(errors)
+    return instance, tuple(values), links
+
+
+def resolve_services(model, names):
+    """Map each name to a primary key, creating the services that do not exist yet."""
+    found = dict(model.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = [name for name in names if name not in found]
+    if missing:
+        model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+        created = list(model.objects.filter(name__in=missing))
+        found.update((service.name, service.pk) for service in created)
+        search.index_many(model, created)
+        bump_version(model)
+    return found
+
+
+def write_links(campaigns):
+    """Replace the service links of ``[(campaign, links)]`` for the columns each row had."""
+    for column, model in SERVICE_COLUMNS.items():
+        rows = [(campaign.pk, links[column]) for campaign, links in campaigns if column in links]
+        if not rows:
+            continue
+        ids = resolve_services(model, {name for _, names in rows for name in names})
+        through = getattr(Campaign, column).through
+        through.objects.filter(campaign_id__in=[pk for pk, _ in rows]).delete()
+        # Plain tuples: a model instance per link costs far more than its INSERT
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}, {}) VALUES (%s, %s)".format(
+            quote(through._meta.db_table),
+            quote(through._meta.get_field("campaign").column),
+            quote(through._meta.get_field(model._meta.model_name).column),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(pk, ids[name]) for pk, names in rows for name in names])
+        if model is Medicine:
+            campaign_ids = [pk for pk, _ in rows]
+            diseases.unindex(campaign__in=campaign_ids)
+            diseases.index(campaigns=campaign_ids)
+        # Linked services are embedded in the campaign representation
+        bump_version(model)
+
+
+def write_chunk(kind, rows):
+    """Upsert one chunk of cleaned ``(instance, columns, links)`` rows."""
+    model, key, _ = KINDS[kind]
+    # A key may appear only once per statement; the last row wins
+    unique = {}
+    for row in rows:
+        unique[tuple(getattr(row[0], name) for name in key)] = row
+    by_columns = defaultdict(list)
+    for instance, columns, links in unique.values():
+        by_columns[columns].append((instance, links))
+
+    written = []
+    for columns, group in by_columns.items():
+        update_fields = [name for name in columns if name not in key] + ["updated_at"]
+        instances = model.objects.bulk_create(
+            [instance for instance, _ in group],
+            update_conflicts=True,
+            unique_fields=key,
+            update_fields=update_fields,
+        )
+        written.extend(instances)
+        if model is Campaign:
+            write_links([(instance, links) for instance, (_, links) in zip(instances, group)])
+            if "capacity" in columns:
+                # Raised capacities free seats for the waitlist
+                waiting = WaitlistEntry.objects.filter(campaign__in=instances).values_list("campaign_id", flat=True)
+                for campaign_id in waiting.order_by().distinct():
+                    promote_waitlist(campaign_id)
+    search.index_many(model, written)
+    bump_version(model)
+
+
+def import_catalogue(fp, kind="campaign", fmt="csv", chunk_size=CHUNK_SIZE, dry_run=False, on_error=None):
+    """
+    Import ``kind`` rows from the text stream ``fp``. ``on_error(row, field,
+    message)`` is called for every problem in a skipped row (``field`` is None
+    for the row as a whole). Returns an ``ImportReport``.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown catalogue kind: {kind}")
+    reader = {"csv": read_csv, "json": read_json}[fmt]
+    report = ImportReport(kind, dry_run)
+    for chunk in chunked(reader(fp), chunk_size):
+        rows = []
+        for number, record in chunk:
+            try:
+                rows.append(clean_row(kind, record))
+            except ValidationError as exc:
+                report.failed += 1
+                if on_error:
+                    errors = exc.message_dict if hasattr(exc, "error_dict") else {NON_FIELD_ERRORS: exc.messages}
+                    for field, messages in errors.items():
+                        for message in messages:
+                            on_error(number, None if field == NON_FIELD_ERRORS else field, message)
+        if rows and not dry_run:
+            with transaction.atomic():
+                write_chunk(kind, rows)
+        report.rows += len(chunk)
+        report.imported += len(rows)
+    return report
@@ -0,0 +1,122 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from campaigns.models import Campaign
+from core.benchmarking import percentile, seed, test_database, write_report
+from registrations.models import Registration
+
+# SQL queries per admin page, whatever the table size or page number; exact in
+# campaigns.tests, a ceiling at scale
+QUERY_CEILINGS = {
+    "registrations": 4,
+    "registrations_search": 4,
+    "campaigns": 4,
+    "campaigns_search": 6,
+    "users": 4,
+    "users_search": 4,
+    "campaign_change": 7,
+    "registration_change": 5,
+    "user_autocomplete": 4,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and check that admin changelists, change forms and "
+        "autocomplete run a constant number of queries on every page, emitted as JSON with "
+        "timings. campaigns.tests checks the exact counts on a small dataset"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaigns", type=int, default=10000)
+        parser.add_argument("--services", type=int, default=50)
+        parser.add_argument("--users", type=int, default=20000)
+        parser.add_argument("--registrations", type=int, default=200000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        with test_database():
+            seed(
+                campaigns=options["campaigns"],
+                services=options["services"],
+                users=options["users"],
+                registrations=options["registrations"],
+                seed=options["seed"],
+            )
+            report = {"pages": self.run_cases()}
+
+        violations = []
+        for name, result in report["pages"].items():
+            if result["status"] != 200:
+                violations.append(f"{name}: unexpected status {result['status']}")
+            if len(set(result["queries"])) > 1:
+                violations.append(f"{name}: query count varies by page {result['queries']}")
+            if max(result["queries"]) > result["query_ceiling"]:
+                violations.append(f"{name}: {max(result['queries'])} queries > ceiling {result['query_ceiling']}")
+        report["violations"] = violations
+        write_report(self, report, options["output"], "Admin query regressions")
+
+    def run_cases(self):
+        admin_user = get_user_model().objects.create_superuser("benchmark_admin", password="loadtest123")
+        client = Client()
+        client.force_login(admin_user)
+        results = {}
+        for name, paths in admin_pages().items():
+            client.get(paths[0])  # warm-up
+            queries, timings, status = [], [], 200
+            for path in paths:
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(captured))
+                if response.status_code != 200:
+                    status = response.status_code
+            results[name] = {
+                "paths": paths,
+                "status": status,
+                "queries": queries,
+                "query_ceiling": QUERY_CEILINGS[name],
+                "p50_ms": round(percentile(timings, 50), 2),
+                "max_ms": round(max(timings), 2),
+            }
+        return results
+
+
+def admin_pages(pages=(1, 2, 50)):
+    """
+    ``{name: [paths]}`` of the admin pages checked, built from the data in the
+    database. Changelists are fetched at each of ``pages`` on the full tables;
+    searches only match a page or two.
+    """
+    registration = Registration.objects.select_related("user", "campaign").order_by("pk").first()
+    campaign = Campaign.objects.filter(vaccines__isnull=False).order_by("pk").first() or registration.campaign
+    member = registration.user
+    title_prefix = campaign.title.split()[0]
+
+    def paged(path, pages=pages):
+        separator = "&" if "?" in path else "?"
+        return [f"{path}{separator}p={page}" for page in pages]
+
+    return {
+        "registrations": paged("/admin/registrations/registration/"),
+        "registrations_search": paged(f"/admin/registrations/registration/?q={member.username}", (1,))
+        + paged(f"/admin/registrations/registration/?q={title_prefix}", (1, 2)),
+        "campaigns": paged("/admin/campaigns/campaign/"),
+        "campaigns_search": paged(f"/admin/campaigns/campaign/?q={title_prefix.lower()}", (1, 2)),
+        "users": paged("/admin/users/user/"),
+        "users_search": paged(f"/admin/users/user/?q={member.username[:6]}", (1, 2)),
+        "campaign_change": [f"/admin/campaigns/campaign/{campaign.pk}/change/"],
+        "registration_change": [f"/admin/registrations/registration/{registration.pk}/change/"],
+        "user_autocomplete": [
+            "/admin/autocomplete/?app_label=registrations&model_name=registration"
+            f"&field_name=user&term={member.username[:6]}&page={page}"
+            for page in (1, 2)
+        ],
+    }
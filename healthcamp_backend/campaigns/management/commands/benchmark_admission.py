@@ -0,0 +1,273 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns.cache import VERSION_KEY
+from campaigns.models import Campaign
+from core.admission import parse_rate
+from core.benchmarking import fetch_response, free_port, percentile, write_report
+
+# Client kinds driven at once: anonymous catalogue readers, users registering
+# for camps, and single accounts polling far above their rate
+KINDS = ("reader", "registrant", "flooder")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test admission control (core.admission): start a server with tight limits, "
+        "drive catalogue readers, registrations and rate-abusing clients at it while the "
+        "catalogue cache is invalidated, and check that excess load is refused with 429/503 "
+        "and Retry-After or served stale, never queued without bound. Seed a throwaway "
+        "database first (generate_load_data); registrations are written to it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", action="append", choices=["wsgi", "asgi"], help="Default: both")
+        parser.add_argument("--readers", type=int, default=200)
+        parser.add_argument("--registrants", type=int, default=50)
+        parser.add_argument("--flooders", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+        parser.add_argument("--threads", type=int, default=32, help="gunicorn threads for the WSGI server")
+        parser.add_argument("--max-concurrency", type=int, default=8)
+        parser.add_argument("--queue-size", type=int, default=16)
+        parser.add_argument("--queue-timeout", type=float, default=1.0)
+        parser.add_argument("--client-rate", default="30/min")
+        parser.add_argument("--registration-rate", default="100/s")
+        parser.add_argument(
+            "--invalidate-every", type=float, default=0.5, help="Seconds between catalogue version bumps"
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        campaigns = list(
+            Campaign.objects.filter(date__gte=timezone.localdate()).order_by("pk").values_list("pk", flat=True)
+        )
+        if not campaigns:
+            raise CommandError("No upcoming campaigns; seed the database first (generate_load_data).")
+        report = {
+            "limits": {
+                name: options[name]
+                for name in ("max_concurrency", "queue_size", "queue_timeout", "client_rate", "registration_rate")
+            },
+            "clients": {kind: options[f"{kind}s"] for kind in KINDS},
+            "duration_s": options["duration"],
+            "servers": {},
+        }
+        violations = []
+        for server in options["server"] or ["wsgi", "asgi"]:
+            tokens = self.create_users(server, options["registrants"] + options["flooders"])
+            with tempfile.TemporaryDirectory() as cache_dir:
+                port = free_port()
+                process = self.start_server(server, port, cache_dir, options)
+                try:
+                    self.wait_ready(process, port)
+                    result = asyncio.run(self.run_load(port, cache_dir, tokens, campaigns, options))
+                finally:
+                    process.terminate()
+                    try:
+                        process.wait(10)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+            violations.extend(f"{server}: {problem}" for problem in result.pop("problems"))
+            report["servers"][server] = result
+
+        report["violations"] = violations
+        write_report(self, report, options["output"], "Admission control failures")
+
+    def create_users(self, server, count):
+        """Fresh accounts for this run, so registrations never collide with earlier ones."""
+        User = get_user_model()
+        prefix = f"admission_{server}_{time.time_ns()}_"
+        User.objects.bulk_create([User(username=f"{prefix}{i}") for i in range(count)])
+        users = User.objects.filter(username__startswith=prefix).order_by("pk")
+        return [str(AccessToken.for_user(user)) for user in users]
+
+    def start_server(self, server, port, cache_dir, options):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings"),
+            # Shared with this process, which invalidates the catalogue through it
+            CACHE_BACKEND="file",
+            CACHE_LOCATION=cache_dir,
+            ADMISSION_MAX_CONCURRENCY=str(options["max_concurrency"]),
+            ADMISSION_QUEUE_SIZE=str(options["queue_size"]),
+            ADMISSION_QUEUE_TIMEOUT=str(options["queue_timeout"]),
+            ADMISSION_CLIENT_RATE=options["client_rate"],
+            ADMISSION_REGISTRATION_RATE=options["registration_rate"],
+            # Readers stand for different phones behind one proxy
+            NUM_PROXIES="1",
+            ASYNC_READ_VIEWS=str(server == "asgi"),
+        )
+        if server == "wsgi":
+            command = [
+                sys.executable, "-m", "gunicorn", "core.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", "1",
+                "--worker-class", "gthread", "--threads", str(options["threads"]),
+                "--log-level", "warning",
+            ]
+        else:
+            command = [
+                sys.executable, "-m", "uvicorn", "core.asgi:application",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", "1",
+                "--log-level", "warning", "--no-access-log",
+            ]
+        try:
+            return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        except OSError as exc:
+            raise CommandError(f"Could not start the {server} server: {exc}")
+
+    def wait_ready(self, process, port):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited early (is {process.args[2]} installed?)")
+            try:
+                status = asyncio.run(self.probe(port))
+            except OSError:
+                time.sleep(0.2)
+                continue
+            if status != 200:
+                raise CommandError(f"GET /api/healthCampaigns/ returned {status}")
+            return
+        raise CommandError("Server did not become ready within 30s")
+
+    async def probe(self, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            status, _ = await fetch_response(reader, writer, self.request_bytes(port, "GET", "/api/healthCampaigns/"))
+        finally:
+            writer.close()
+        return status
+
+    @staticmethod
+    def request_bytes(port, method, path, headers=None, body=None):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: 127.0.0.1:{port}", "Accept: application/json"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = json.dumps(body).encode() if body is not None else b""
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+    async def run_load(self, port, cache_dir, tokens, campaigns, options):
+        shared_cache = FileBasedCache(cache_dir, {})
+        timeout = options["timeout"]
+        stop_at = time.perf_counter() + options["duration"]
+        results = {kind: {"statuses": Counter(), "latencies": [], "refusals": []} for kind in KINDS}
+        problems = Counter()
+
+        async def client(kind, make_request):
+            result = results[kind]
+            connection = None
+            while time.perf_counter() < stop_at:
+                request = make_request()
+                if request is None:
+                    break
+                try:
+                    if connection is None:
+                        connection = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+                    start = time.perf_counter()
+                    status, headers = await asyncio.wait_for(fetch_response(*connection, request), timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    result["statuses"]["error"] += 1
+                    if connection is not None:
+                        connection[1].close()
+                    connection = None
+                    continue
+                latency = (time.perf_counter() - start) * 1000
+                result["latencies"].append(latency)
+                if status == 200 and headers.get("x-served-stale"):
+                    result["statuses"]["200 stale"] += 1
+                else:
+                    result["statuses"][str(status)] += 1
+                if status in (429, 503):
+                    result["refusals"].append(latency)
+                    if not headers.get("retry-after", "").isdigit():
+                        problems[f"{status} without Retry-After"] += 1
+                if status >= 500 and status != 503:
+                    problems[f"{kind} got {status}"] += 1
+                if headers.get("connection") == "close":
+                    connection[1].close()
+                    connection = None
+            if connection is not None:
+                connection[1].close()
+
+        def reader(i):
+            request = self.request_bytes(
+                port, "GET", "/api/healthCampaigns/", {"X-Forwarded-For": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"}
+            )
+            return lambda: request
+
+        def registrant(token, offset):
+            auth = {"Authorization": f"Bearer {token}"}
+            # Each account walks its own slice of camps, so no registration is a duplicate
+            choices = iter(campaigns[offset:] + campaigns[:offset])
+
+            def make_request():
+                pk = next(choices, None)
+                return None if pk is None else self.request_bytes(port, "POST", "/api/registrations/", auth, {"campaign": pk})
+
+            return make_request
+
+        def flooder(token):
+            request = self.request_bytes(port, "GET", "/api/users/me/", {"Authorization": f"Bearer {token}"})
+            return lambda: request
+
+        async def invalidate():
+            # An organizer editing campaigns: every bump makes cached responses miss
+            key = VERSION_KEY.format(Campaign._meta.label_lower)
+            while time.perf_counter() < stop_at:
+                await asyncio.sleep(options["invalidate_every"])
+                try:
+                    shared_cache.incr(key)
+                except ValueError:
+                    shared_cache.add(key, time.time_ns(), timeout=None)
+
+        registrants, flooders = tokens[: options["registrants"]], tokens[options["registrants"] :]
+        step = max(1, len(campaigns) // max(1, len(registrants)))
+        clients = (
+            [client("reader", reader(i)) for i in range(options["readers"])]
+            + [client("registrant", registrant(token, i * step)) for i, token in enumerate(registrants)]
+            + [client("flooder", flooder(token)) for token in flooders]
+        )
+        started = time.perf_counter()
+        await asyncio.gather(invalidate(), *clients)
+        elapsed = time.perf_counter() - started
+
+        report = {}
+        for kind, result in results.items():
+            latencies, refusals = result["latencies"], result["refusals"]
+            report[kind] = {
+                "statuses": dict(sorted(result["statuses"].items())),
+                "requests_per_s": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+                "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+                "refusal_p99_ms": round(percentile(refusals, 99), 2) if refusals else None,
+            }
+        engaged = sum(
+            count
+            for result in results.values()
+            for status, count in result["statuses"].items()
+            if status in ("429", "503", "200 stale")
+        )
+        report["problems"] = [f"{problem} ({count}x)" for problem, count in problems.items()]
+        if not engaged:
+            report["problems"].append("admission control never engaged; raise the load or lower the limits")
+        # Only a flooder that got more responses than its bucket holds must have seen a 429
+        capacity, _ = parse_rate(options["client_rate"])
+        flooded = sum(results["flooder"]["statuses"].values()) > capacity * max(1, len(flooders))
+        if flooded and not results["flooder"]["statuses"].get("429"):
+            report["problems"].append("flooders were never rate limited")
+        return report
@@ -0,0 +1,164 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns.models import Campaign
+from core.admission import unthrottled
+from core.benchmarking import percentile, seed, test_database, write_report
+
+# Maximum SQL queries per request. Raising one of these should be a conscious
+# decision made in review, not a side effect of a serializer change.
+QUERY_CEILINGS = {
+    "campaigns_list": 3,
+    "campaigns_list_cached": 0,
+    "vaccines_list": 1,
+    "medicines_list": 1,
+    "registrations_mine": 3,
+    # Includes the seat claim and, on SQLite, the BEGIN/COMMIT around it
+    "registration_create": 9,
+    "users_me": 0,
+    "signup": 2,
+    "token_obtain": 1,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and benchmark the API: per-endpoint query counts "
+        "(checked against ceilings), p50/p95 latency and response size, emitted as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaigns", type=int, default=10000)
+        parser.add_argument("--services", type=int, default=50)
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--registrations", type=int, default=100000)
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        with test_database():
+            started = time.perf_counter()
+            seed(
+                campaigns=options["campaigns"],
+                services=options["services"],
+                users=options["users"],
+                registrations=options["registrations"],
+                seed=options["seed"],
+            )
+            seed_seconds = time.perf_counter() - started
+            # Measure the endpoints themselves, not core.admission's limits
+            with override_settings(REST_FRAMEWORK=unthrottled(settings.REST_FRAMEWORK)):
+                endpoints = self.run_cases(options["iterations"])
+            report = {
+                "dataset": {
+                    "campaigns": options["campaigns"],
+                    "services_per_campaign": options["services"],
+                    "users": options["users"],
+                    "registrations": options["registrations"],
+                    "seed_seconds": round(seed_seconds, 2),
+                },
+                "iterations": options["iterations"],
+                "endpoints": endpoints,
+            }
+
+        report["violations"] = [
+            f"{name}: {result['queries']} queries > ceiling {result['query_ceiling']}"
+            for name, result in report["endpoints"].items()
+            if result["queries"] > result["query_ceiling"]
+        ] + [
+            f"{name}: unexpected status {status}"
+            for name, result in report["endpoints"].items()
+            for status in result["statuses"]
+            if status >= 400
+        ]
+        write_report(self, report, options["output"])
+
+    def run_cases(self, iterations):
+        User = get_user_model()
+        cache = caches["default"]
+        member = User.objects.filter(registrations__isnull=False).order_by("pk").first()
+        if member is None:
+            raise CommandError("Benchmark needs at least one registered user (--users, --registrations).")
+        newcomer = User.objects.create_user("benchmark_newcomer", password="loadtest123")
+        free_campaigns = iter(Campaign.objects.values_list("pk", flat=True)[: iterations + 1])
+        signups = iter(range(iterations + 1))
+
+        def bearer(user):
+            return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+        cases = [
+            ("campaigns_list", "get", "/api/healthCampaigns/", lambda: {}, cache.clear),
+            ("campaigns_list_cached", "get", "/api/healthCampaigns/", lambda: {}, None),
+            ("vaccines_list", "get", "/api/services/vaccines/", lambda: {}, cache.clear),
+            ("medicines_list", "get", "/api/services/medicines/", lambda: {}, cache.clear),
+            ("registrations_mine", "get", "/api/registrations/mine/", lambda: bearer(member), None),
+            ("users_me", "get", "/api/users/me/", lambda: bearer(member), None),
+            (
+                "registration_create",
+                "post",
+                "/api/registrations/",
+                lambda: {"data": {"campaign": next(free_campaigns)}, **bearer(newcomer)},
+                None,
+            ),
+            (
+                "signup",
+                "post",
+                "/api/users/signup/",
+                lambda: {"data": {"username": f"benchmark_signup_{next(signups)}", "password": "loadtest123"}},
+                None,
+            ),
+            (
+                "token_obtain",
+                "post",
+                "/api/token/",
+                lambda: {"data": {"username": member.username, "password": "loadtest123"}},
+                None,
+            ),
+        ]
+
+        client = Client()
+        results = {}
+        for name, method, path, make_kwargs, before in cases:
+            timings, queries, sizes, statuses = [], [], [], set()
+            # One untimed warm-up request so first-use costs are not sampled
+            if before:
+                before()
+            getattr(client, method)(path, **make_kwargs())
+            for _ in range(iterations):
+                if before:
+                    before()
+                kwargs = make_kwargs()
+                with ExitStack() as stack:
+                    # Count queries on every alias, replicas included
+                    captured = [
+                        stack.enter_context(CaptureQueriesContext(connections[alias]))
+                        for alias in ["default", *settings.DATABASE_REPLICAS]
+                    ]
+                    start = time.perf_counter()
+                    response = getattr(client, method)(path, **kwargs)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(sum(len(c) for c in captured))
+                sizes.append(len(response.content))
+                statuses.add(response.status_code)
+            results[name] = {
+                "method": method.upper(),
+                "path": path,
+                "statuses": sorted(statuses),
+                "queries": max(queries),
+                "query_ceiling": QUERY_CEILINGS[name],
+                "p50_ms": round(percentile(timings, 50), 2),
+                "p95_ms": round(percentile(timings, 95), 2),
+                "mean_ms": round(sum(timings) / len(timings), 2),
+                "response_bytes": max(sizes),
+            }
+        return results
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import (
+    IDLE_RAMP,
+    fetch,
+    free_port,
+    percentile,
+    process_status,
+    raise_file_limit,
+    write_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare connection capacity of the threaded WSGI path (gunicorn gthread) and the "
+        "native async ASGI path (uvicorn with ASYNC_READ_VIEWS): hold many idle keep-alive "
+        "connections, drive active clients alongside them, and report latency, errors and "
+        "server memory/threads as JSON. Seed the configured database first (generate_load_data)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", action="append", choices=["wsgi", "asgi"], help="Default: both")
+        parser.add_argument("--path", default="/api/healthCampaigns/")
+        parser.add_argument("--idle", type=int, default=2000, help="Idle keep-alive connections to hold")
+        parser.add_argument("--concurrency", type=int, default=50, help="Active clients")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds of active load")
+        parser.add_argument("--threads", type=int, default=32, help="gunicorn threads for the WSGI server")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        raise_file_limit(options["idle"] + options["concurrency"])
+        report = {
+            "path": options["path"],
+            "idle_connections": options["idle"],
+            "concurrency": options["concurrency"],
+            "duration_s": options["duration"],
+            "servers": {},
+        }
+        for server in options["server"] or ["wsgi", "asgi"]:
+            port = free_port()
+            process = self.start_server(server, port, options)
+            try:
+                self.wait_ready(process, port, options["path"])
+                result = asyncio.run(self.run_load(port, options))
+                result["rss_kib"], result["threads"] = process_status(process.pid)
+                report["servers"][server] = result
+            finally:
+                process.terminate()
+                try:
+                    process.wait(10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+        write_report(self, report, options["output"])
+
+    def start_server(self, server, port, options):
+        keep_alive = str(int(options["duration"] + options["timeout"] * 3 + 30))
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings"))
+        # Measure raw capacity, not core.admission's limits
+        env.update(ADMISSION_MAX_CONCURRENCY="0", ADMISSION_CLIENT_RATE="", ADMISSION_ROUTE_RATE="")
+        if server == "wsgi":
+            env["ASYNC_READ_VIEWS"] = "False"
+            command = [
+                sys.executable, "-m", "gunicorn", "core.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", "1",
+                "--worker-class", "gthread", "--threads", str(options["threads"]),
+                "--worker-connections", str(options["idle"] + options["concurrency"]),
+                "--keep-alive", keep_alive, "--log-level", "warning",
+            ]
+        else:
+            env["ASYNC_READ_VIEWS"] = "True"
+            command = [
+                sys.executable, "-m", "uvicorn", "core.asgi:application",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", "1",
+                "--timeout-keep-alive", keep_alive, "--log-level", "warning", "--no-access-log",
+            ]
+        try:
+            return subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        except OSError as exc:
+            raise CommandError(f"Could not start the {server} server: {exc}")
+
+    def wait_ready(self, process, port, path):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited early (is {process.args[2]} installed?)")
+            try:
+                status = asyncio.run(self.probe(port, path))
+            except OSError:
+                time.sleep(0.2)
+                continue
+            if status != 200:
+                raise CommandError(f"GET {path} returned {status}")
+            return
+        raise CommandError("Server did not become ready within 30s")
+
+    async def probe(self, port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            status, _ = await fetch(reader, writer, self.request_bytes(path, port))
+        finally:
+            writer.close()
+        return status
+
+    def request_bytes(self, path, port):
+        return f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nAccept: application/json\r\n\r\n".encode()
+
+    async def run_load(self, port, options):
+        request = self.request_bytes(options["path"], port)
+        timeout = options["timeout"]
+
+        # Ramp up gradually, as real clients arrive, rather than in one burst
+        ramp = asyncio.Semaphore(IDLE_RAMP)
+
+        async def open_idle():
+            # One request to establish a keep-alive connection, then sit on it
+            async with ramp:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await asyncio.wait_for(fetch(reader, writer, request), timeout)
+            return writer
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(open_idle() for _ in range(options["idle"])), return_exceptions=True)
+        idle = [r for r in results if not isinstance(r, BaseException)]
+        idle_seconds = time.perf_counter() - started
+
+        latencies, errors = [], 0
+        stop_at = time.perf_counter() + options["duration"]
+
+        async def client():
+            nonlocal errors
+            connection = None
+            while time.perf_counter() < stop_at:
+                try:
+                    if connection is None:
+                        connection = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+                    start = time.perf_counter()
+                    status, keep_alive = await asyncio.wait_for(fetch(*connection, request), timeout)
+                    if status != 200:
+                        errors += 1
+                    else:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    if not keep_alive:
+                        connection[1].close()
+                        connection = None
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    if connection is not None:
+                        connection[1].close()
+                    connection = None
+            if connection is not None:
+                connection[1].close()
+
+        load_started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(options["concurrency"])))
+        elapsed = time.perf_counter() - load_started
+
+        for writer in idle:
+            writer.close()
+        return {
+            "idle_established": len(idle),
+            "idle_failed": len(results) - len(idle),
+            "idle_setup_s": round(idle_seconds, 2),
+            "requests": len(latencies),
+            "errors": errors,
+            "requests_per_s": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        }
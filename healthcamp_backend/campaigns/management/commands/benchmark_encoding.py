@@ -0,0 +1,141 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns.models import Campaign
+from core import compression, renderers
+from core.admission import unthrottled
+from core.benchmarking import percentile, seed, test_database, write_report
+
+# format -> Accept header
+FORMATS = {
+    "json-stdlib": "application/json",
+    "json-orjson": "application/json",
+    "msgpack": "application/msgpack",
+}
+ENCODINGS = ("identity", "gzip", "br")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and compare API response encodings (stdlib JSON, "
+        "orjson, MessagePack; identity, gzip, Brotli): bytes on the wire and CPU per request, "
+        "emitted as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaigns", type=int, default=2000)
+        parser.add_argument("--services", type=int, default=50)
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--registrations", type=int, default=20000)
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        with test_database():
+            seed(
+                campaigns=options["campaigns"],
+                services=options["services"],
+                users=options["users"],
+                registrations=options["registrations"],
+                seed=options["seed"],
+            )
+            with override_settings(REST_FRAMEWORK=unthrottled(settings.REST_FRAMEWORK)):
+                endpoints = self.run_cases(options["iterations"])
+            report = {
+                "iterations": options["iterations"],
+                "unavailable": self.unavailable(),
+                "endpoints": endpoints,
+            }
+
+        violations = [
+            f"{name} {variant}: {problem}"
+            for name, variants in report["endpoints"].items()
+            for variant, result in variants.items()
+            for problem in result.pop("problems")
+        ]
+        report["violations"] = violations
+        write_report(self, report, options["output"], "Encoding regressions")
+
+    def unavailable(self):
+        missing = []
+        if renderers.orjson is None or renderers.FastJSONRenderer not in api_settings.DEFAULT_RENDERER_CLASSES:
+            missing.append("json-orjson")
+        if renderers.msgpack is None or renderers.MessagePackRenderer not in api_settings.DEFAULT_RENDERER_CLASSES:
+            missing.append("msgpack")
+        if compression.brotli is None:
+            missing.append("br")
+        return missing
+
+    def run_cases(self, iterations):
+        member = get_user_model().objects.filter(registrations__isnull=False).order_by("pk").first()
+        if member is None:
+            raise CommandError("Benchmark needs at least one registered user (--users, --registrations).")
+        campaign = Campaign.objects.filter(vaccines__isnull=False).order_by("pk").first()
+        bearer = {"Authorization": f"Bearer {AccessToken.for_user(member)}"}
+        cases = {
+            "campaigns_list": ("/api/healthCampaigns/", {}),
+            "campaign_detail": (f"/api/healthCampaigns/{campaign.pk}/", {}),
+            "medicines_list": ("/api/services/medicines/", {}),
+            "registrations_mine": ("/api/registrations/mine/", bearer),
+        }
+        skipped = set(self.unavailable())
+        client = Client()
+        results = {}
+        for name, (path, headers) in cases.items():
+            # The reference every format must decode to
+            expected = json.loads(self.fetch(client, path, headers, "json-stdlib", "identity").content)
+            results[name] = {}
+            for fmt, accept in FORMATS.items():
+                for encoding in ENCODINGS:
+                    if fmt in skipped or encoding in skipped:
+                        continue
+                    self.fetch(client, path, headers, fmt, encoding)  # warm-up
+                    timings, cpu, sizes, problems = [], [], [], set()
+                    for _ in range(iterations):
+                        start, start_cpu = time.perf_counter(), time.process_time()
+                        response = self.fetch(client, path, headers, fmt, encoding)
+                        body = b"".join(response) if response.streaming else response.content
+                        cpu.append((time.process_time() - start_cpu) * 1000)
+                        timings.append((time.perf_counter() - start) * 1000)
+                        sizes.append(len(body))
+                    if response.status_code != 200:
+                        problems.add(f"unexpected status {response.status_code}")
+                    elif response.get("Content-Type", "").partition(";")[0] != accept:
+                        problems.add(f"served as {response.get('Content-Type')}")
+                    elif encoding == "identity" and self.decode(fmt, body) != expected:
+                        problems.add("decodes to different data than stdlib JSON")
+                    results[name][f"{fmt}+{encoding}"] = {
+                        "content_encoding": response.get("Content-Encoding", "identity"),
+                        "wire_bytes": max(sizes),
+                        "cpu_ms": round(sum(cpu) / len(cpu), 3),
+                        "p50_ms": round(percentile(timings, 50), 2),
+                        "problems": sorted(problems),
+                    }
+        return results
+
+    @staticmethod
+    def fetch(client, path, headers, fmt, encoding):
+        headers = {**headers, "Accept": FORMATS[fmt], "Accept-Encoding": encoding}
+        fast = renderers.orjson
+        if fmt == "json-stdlib":
+            # FastJSONRenderer falls back to DRF's encoder without orjson
+            renderers.orjson = None
+        try:
+            return client.get(path, headers=headers)
+        finally:
+            renderers.orjson = fast
+
+    @staticmethod
+    def decode(fmt, body):
+        if fmt == "msgpack":
+            return renderers.msgpack.unpackb(body)
+        return json.loads(body)
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns.models import Campaign
+from core import events
+from core.admission import unthrottled
+from core.benchmarking import (
+    IDLE_RAMP,
+    fetch_response,
+    free_port,
+    percentile,
+    process_status,
+    raise_file_limit,
+    seed,
+    test_database,
+    write_report,
+)
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover - optional dependency
+    uvicorn = None
+
+
+class Subscriber:
+    """One open ``/api/events/`` stream and the frames it has received."""
+
+    def __init__(self, user_id, reader, writer):
+        self.user_id = user_id
+        self.reader = reader
+        self.writer = writer
+        self.heartbeats = 0
+        # (event, data, arrival time)
+        self.events = []
+
+    async def listen(self):
+        buffer = b""
+        try:
+            while True:
+                # The stream is chunked: a hex size line, the data, CRLF
+                size = int((await self.reader.readline()).split(b";")[0] or b"0", 16)
+                if size == 0:
+                    return
+                buffer += (await self.reader.readexactly(size + 2))[:-2]
+                while b"\n\n" in buffer:
+                    frame, buffer = buffer.split(b"\n\n", 1)
+                    self.record(frame.decode(), time.perf_counter())
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            return
+
+    def record(self, frame, arrived):
+        if frame.startswith(":"):
+            self.heartbeats += 1
+            return
+        fields = dict(line.split(": ", 1) for line in frame.split("\n") if ": " in line)
+        if "event" in fields:
+            self.events.append((fields["event"], json.loads(fields["data"]), arrived))
+
+    def received(self, name):
+        return [(data, arrived) for event, data, arrived in self.events if event == name]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database, serve it from uvicorn in this process as core.asgi "
+        "does with PUSH_EVENTS on, hold thousands of idle /api/events/ subscribers, then "
+        "check that campaign and registration changes reach every subscriber they should "
+        "(and no other), that heartbeats flow, that requests are still served, and that "
+        "disconnected streams are released. Emits a JSON report; the clients share this "
+        "process with the server, so latencies are upper bounds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=5000)
+        parser.add_argument(
+            "--authenticated", type=int, default=50, help="Subscribers with their own account (registration events)"
+        )
+        parser.add_argument("--events", type=int, default=5, help="Campaign updates published")
+        parser.add_argument("--heartbeat", type=float, default=2.0, help="PUSH_HEARTBEAT for the run")
+        parser.add_argument("--idle", type=float, default=5.0, help="Seconds subscribers sit idle")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for connections and events")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        if uvicorn is None:
+            raise CommandError("benchmark_push needs uvicorn.")
+        if options["authenticated"] > options["subscribers"]:
+            raise CommandError("--authenticated cannot exceed --subscribers.")
+        # Client and server sockets both live in this process
+        raise_file_limit(options["subscribers"] * 2)
+        with test_database():
+            seed(campaigns=max(10, options["events"]), services=2, users=options["authenticated"], registrations=0)
+            with self.push_settings(options):
+                report = self.run(options)
+        write_report(self, report, options["output"], "Push channel failures")
+
+    @contextmanager
+    def push_settings(self, options):
+        with override_settings(
+            PUSH_BACKEND="local",
+            PUSH_HEARTBEAT=options["heartbeat"],
+            PUSH_MAX_SUBSCRIBERS=options["subscribers"],
+            # Every subscriber connects from 127.0.0.1
+            REST_FRAMEWORK=unthrottled(settings.REST_FRAMEWORK),
+        ):
+            yield
+
+    def run(self, options):
+        port = free_port()
+        # What core.asgi serves with PUSH_EVENTS on
+        server = uvicorn.Server(
+            uvicorn.Config(
+                events.EventStreamApp(get_asgi_application()), host="127.0.0.1", port=port, log_level="warning",
+                access_log=False, lifespan="off", timeout_graceful_shutdown=1,
+            )
+        )
+        thread = threading.Thread(target=server.run, name="benchmark-push-server", daemon=True)
+        thread.start()
+        deadline = time.monotonic() + options["timeout"]
+        while not server.started:
+            if not thread.is_alive() or time.monotonic() > deadline:
+                raise CommandError("The uvicorn server did not start.")
+            time.sleep(0.05)
+        try:
+            return asyncio.run(self.run_load(port, options))
+        finally:
+            server.should_exit = True
+            thread.join(10)
+
+    @staticmethod
+    def request_bytes(port, method, path, token=None, body=None):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: 127.0.0.1:{port}", "Accept: application/json"]
+        if token:
+            lines.append(f"Authorization: Bearer {token}")
+        payload = json.dumps(body).encode() if body is not None else b""
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode() + payload
+
+    async def request(self, port, method, path, token=None, body=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return await fetch_response(reader, writer, self.request_bytes(port, method, path, token, body))
+        finally:
+            writer.close()
+
+    async def run_load(self, port, options):
+        timeout = options["timeout"]
+        broker = events.get_broker()
+        users = await asyncio.to_thread(self.accounts, options["authenticated"])
+        problems = []
+
+        # Ramp up gradually, as real clients arrive, rather than in one burst
+        ramp = asyncio.Semaphore(IDLE_RAMP)
+
+        async def subscribe(user_id=None, token=None):
+            async with ramp:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+                writer.write(self.request_bytes(port, "GET", "/api/events/", token))
+                await writer.drain()
+                head = (await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)).decode("latin-1")
+                if " 200 " not in head.split("\r\n", 1)[0] or "text/event-stream" not in head:
+                    writer.close()
+                    raise ValueError(head.split("\r\n", 1)[0])
+            return Subscriber(user_id, reader, writer)
+
+        rss_before, _ = process_status(os.getpid())
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(subscribe(user_id, token) for user_id, token in users),
+            *(subscribe() for _ in range(options["subscribers"] - len(users))),
+            return_exceptions=True,
+        )
+        setup_seconds = time.perf_counter() - started
+        subscribers = [result for result in results if isinstance(result, Subscriber)]
+        failures = sorted({str(result) or type(result).__name__ for result in results if isinstance(result, BaseException)})
+        if failures:
+            problems.append(f"{len(results) - len(subscribers)} subscribers failed to connect: {failures[:3]}")
+        listeners = [asyncio.create_task(subscriber.listen()) for subscriber in subscribers]
+
+        # Idle: only heartbeats flow, and ordinary requests must still be served
+        latencies = []
+        idle_until = time.perf_counter() + options["idle"]
+        while time.perf_counter() < idle_until:
+            start = time.perf_counter()
+            status, _ = await self.request(port, "GET", "/api/healthCampaigns/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                problems.append(f"GET /api/healthCampaigns/ returned {status} while idle")
+            await asyncio.sleep(0.25)
+        rss_after, threads = process_status(os.getpid())
+        silent = sum(1 for subscriber in subscribers if not subscriber.heartbeats)
+        if silent:
+            problems.append(f"{silent} subscribers got no heartbeat in {options['idle']}s")
+
+        # Campaign updates are broadcast to every subscriber
+        published = await asyncio.to_thread(self.update_campaigns, options["events"])
+        expected = {pk for pk, _ in published}
+
+        def campaign_events_done():
+            return all(
+                expected <= {data["id"] for data, _ in subscriber.received("campaign.updated")}
+                for subscriber in subscribers
+            )
+
+        await self.wait_for(campaign_events_done, timeout)
+        sent_at = dict(published)
+        fan_out = [
+            (arrived - sent_at[data["id"]]) * 1000
+            for subscriber in subscribers
+            for data, arrived in subscriber.received("campaign.updated")
+            if data["id"] in sent_at
+        ]
+        missed = len(expected) * len(subscribers) - len(fan_out)
+        if missed:
+            problems.append(f"{missed} campaign events were not delivered")
+
+        # Registrations reach their own user's streams only
+        campaign = published[0][0]
+        tokens = dict(users)
+        for user_id, token in users:
+            status, _ = await self.request(port, "POST", "/api/registrations/", token, {"campaign": campaign})
+            if status != 201:
+                problems.append(f"POST /api/registrations/ returned {status}")
+        mine = [subscriber for subscriber in subscribers if subscriber.user_id is not None]
+        await self.wait_for(lambda: all(subscriber.received("registration.created") for subscriber in mine), timeout)
+        for subscriber in mine:
+            for data, _ in subscriber.received("registration.created"):
+                status, _ = await self.request(
+                    port, "DELETE", f"/api/registrations/{data['id']}/", tokens[subscriber.user_id]
+                )
+                if status != 204:
+                    problems.append(f"DELETE /api/registrations/ returned {status}")
+        await self.wait_for(lambda: all(subscriber.received("registration.deleted") for subscriber in mine), timeout)
+        for kind in ("registration.created", "registration.deleted"):
+            if missing := sum(1 for subscriber in mine if len(subscriber.received(kind)) != 1):
+                problems.append(f"{missing} users did not get exactly one {kind}")
+            if leaked := sum(1 for subscriber in subscribers if subscriber.user_id is None and subscriber.received(kind)):
+                problems.append(f"{leaked} anonymous subscribers got {kind}")
+
+        # Disconnected clients must release their subscriptions
+        for subscriber in subscribers:
+            subscriber.writer.close()
+        await asyncio.gather(*listeners)
+        await self.wait_for(lambda: broker.count == 0, timeout)
+        if broker.count:
+            problems.append(f"{broker.count} subscriptions outlived their connections")
+
+        return {
+            "subscribers": options["subscribers"],
+            "connected": len(subscribers),
+            "setup_s": round(setup_seconds, 2),
+            "process_rss_kib": {"before": rss_before, "with_subscribers": rss_after},
+            "rss_per_subscriber_kib": (
+                round((rss_after - rss_before) / len(subscribers), 2) if rss_before and subscribers else None
+            ),
+            "threads": threads,
+            "heartbeats_per_subscriber": (
+                round(sum(s.heartbeats for s in subscribers) / len(subscribers), 1) if subscribers else None
+            ),
+            "idle_request_p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+            "idle_request_p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+            "campaign_events": len(published),
+            "fan_out_p50_ms": round(percentile(fan_out, 50), 2) if fan_out else None,
+            "fan_out_p99_ms": round(percentile(fan_out, 99), 2) if fan_out else None,
+            "fan_out_max_ms": round(max(fan_out), 2) if fan_out else None,
+            "violations": problems,
+        }
+
+    @staticmethod
+    def accounts(count):
+        users = get_user_model().objects.order_by("pk")[:count]
+        result = [(user.pk, str(AccessToken.for_user(user))) for user in users]
+        close_old_connections()
+        return result
+
+    @staticmethod
+    def update_campaigns(count):
+        """Save ``count`` campaigns one by one; return (pk, time sent) for each."""
+        published = []
+        for campaign in Campaign.objects.order_by("pk")[:count]:
+            campaign.description += " (updated)"
+            sent = time.perf_counter()
+            campaign.save()
+            published.append((campaign.pk, sent))
+            time.sleep(0.05)
+        close_old_connections()
+        return published
+
+    @staticmethod
+    async def wait_for(predicate, timeout):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from campaigns.models import Campaign
+from core.benchmarking import percentile, test_database, write_report
+from registrations.models import Registration, WaitlistEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one capacity-limited campaign with concurrent registrations (then concurrent "
+        "cancellations) on a throwaway test database, and check that it is never overbooked, "
+        "the waitlist is promoted, and p99 latency stays bounded. Emits JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000, help="Users racing for seats")
+        parser.add_argument("--capacity", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--cancel", type=int, default=50, help="Registrations cancelled in the second phase")
+        parser.add_argument("--no-waitlist", action="store_true", help="Reject overflow instead of waitlisting")
+        parser.add_argument("--max-p99-ms", type=float, default=2000.0, help="Fail above this p99 latency")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        # Threads write concurrently, which SQLite's in-memory test database cannot take
+        with test_database(on_disk=True):
+            report = self.run(options)
+        write_report(self, report, options["output"], "Seat allocation failed")
+
+    def run(self, options):
+        User = get_user_model()
+        campaign = Campaign.objects.create(
+            title="Seat contention benchmark",
+            location="Benchmark",
+            date=timezone.localdate() + timedelta(days=30),
+            type="other",
+            capacity=options["capacity"],
+            waitlist_enabled=not options["no_waitlist"],
+        )
+        password = make_password("loadtest123")
+        users = User.objects.bulk_create(
+            [User(username=f"seat_benchmark_{i}", password=password) for i in range(options["users"])],
+            batch_size=1000,
+        )
+        tokens = [f"Bearer {AccessToken.for_user(user)}" for user in users]
+
+        register = self.hammer(
+            options["threads"],
+            [("post", "/api/registrations/", {"data": {"campaign": campaign.pk}}, token) for token in tokens],
+        )
+
+        seated = list(
+            Registration.objects.filter(campaign=campaign).order_by("?").values_list("pk", "user_id")[: options["cancel"]]
+        )
+        token_for = {user.pk: token for user, token in zip(users, tokens)}
+        cancel = self.hammer(
+            options["threads"],
+            [("delete", f"/api/registrations/{pk}/", {}, token_for[user_id]) for pk, user_id in seated],
+        )
+
+        campaign.refresh_from_db()
+        registrations = Registration.objects.filter(campaign=campaign).count()
+        waiting = WaitlistEntry.objects.filter(campaign=campaign).count()
+        violations = []
+        if registrations > campaign.capacity:
+            violations.append(f"overbooked: {registrations} registrations for {campaign.capacity} seats")
+        if registrations != campaign.registered_count:
+            violations.append(f"registered_count {campaign.registered_count} != {registrations} registrations")
+        if waiting and registrations < campaign.capacity:
+            violations.append(f"{waiting} waitlisted with {campaign.capacity - registrations} seats free")
+        for name, phase in (("register", register), ("cancel", cancel)):
+            if phase["errors"]:
+                violations.append(f"{name}: {phase['errors']} failed requests")
+            if phase["p99_ms"] is not None and phase["p99_ms"] > options["max_p99_ms"]:
+                violations.append(f"{name}: p99 {phase['p99_ms']}ms > {options['max_p99_ms']}ms")
+
+        return {
+            "database": connection.vendor,
+            "users": options["users"],
+            "capacity": campaign.capacity,
+            "threads": options["threads"],
+            "waitlist": campaign.waitlist_enabled,
+            "phases": {"register": register, "cancel": cancel},
+            "final": {
+                "registrations": registrations,
+                "registered_count": campaign.registered_count,
+                "waitlisted": waiting,
+            },
+            "violations": violations,
+        }
+
+    def hammer(self, threads, requests):
+        """Send ``requests`` from ``threads`` concurrent clients; return latency and status counts."""
+        pending = queue.Queue()
+        for request in requests:
+            pending.put(request)
+        latencies, statuses, lock = [], {}, threading.Lock()
+        start_line = threading.Barrier(threads)
+
+        def worker():
+            client = Client(raise_request_exception=False)
+            start_line.wait()
+            try:
+                while True:
+                    try:
+                        method, path, kwargs, token = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    start = time.perf_counter()
+                    response = getattr(client, method)(
+                        path, content_type="application/json", HTTP_AUTHORIZATION=token, **kwargs
+                    )
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {
+            "requests": len(latencies),
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+            "errors": sum(count for code, count in statuses.items() if code >= 500),
+            "requests_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+            "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        }
@@ -0,0 +1,243 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from campaigns import diseases, search
+from campaigns.cache import bump_version
+from campaigns.models import Campaign, Vaccine, Medicine
+from registrations.models import Registration
+from registrations import rollups
+from registrations.seats import recount_seats
+
+LOCATIONS = ("Ward {}, Kathmandu", "Ward {}, Lalitpur", "Ward {}, Bhaktapur", "Ward {}, Pokhara", "Ward {}, Biratnagar")
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate realistic synthetic campaigns, services, users and registrations for "
+        "capacity testing, using batched bulk inserts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaigns", type=int, default=1000)
+        parser.add_argument("--services", type=int, default=10, help="Vaccines and medicines linked to each campaign")
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--registrations", type=int, default=100000)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data")
+        parser.add_argument("--password", default="loadtest123", help="Password given to every generated user")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = time.perf_counter()
+        with self.fast_inserts(), transaction.atomic():
+            vaccine_ids, medicine_ids = self.generate_services(options["campaigns"], options["services"])
+            campaign_ids = self.generate_campaigns(options["campaigns"])
+            self.generate_links(campaign_ids, vaccine_ids, medicine_ids, options["services"])
+            user_ids = self.generate_users(options["users"], options["password"])
+            self.generate_registrations(user_ids, campaign_ids, options["registrations"])
+            if campaign_ids or vaccine_ids or medicine_ids:
+                # bulk inserts bypass the signals that maintain the search and disease
+                # indexes and move the catalogue cache on
+                search.rebuild()
+                diseases.rebuild()
+                for model in (Campaign, Vaccine, Medicine):
+                    bump_version(model)
+        self.stdout.write(self.style.SUCCESS(f"Load data generated in {time.perf_counter() - started:.1f}s."))
+
+    @contextmanager
+    def fast_inserts(self):
+        """On SQLite, skip fsync while loading; the load itself is one transaction."""
+        # SQLite refuses the pragma inside a transaction (a TestCase, for one)
+        if connection.vendor != "sqlite" or connection.in_atomic_block:
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            previous = cursor.fetchone()[0]
+            cursor.execute("PRAGMA synchronous = OFF")
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA synchronous = {int(previous)}")
+
+    def report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f"  {label}: {count} rows in {elapsed:.1f}s ({rate:,.0f}/s)")
+
+    def insert(self, model, objects, **kwargs):
+        """bulk_create in batches; returns the created primary keys."""
+        ids = []
+        for batch in batched(objects, self.batch_size):
+            created = model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+            ids.extend(obj.pk for obj in created)
+        return ids
+
+    def insert_rows(self, model, columns, rows):
+        """
+        Insert plain value tuples with ``executemany``, skipping conflicts.
+
+        Used for the join tables (M2M links, registrations) where building a
+        model instance per row costs an order of magnitude more than the
+        INSERT itself.
+        """
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT DO NOTHING".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(model._meta.get_field(name).column) for name in columns),
+            ", ".join(["%s"] * len(columns)),
+        )
+        count = 0
+        with connection.cursor() as cursor:
+            for batch in batched(rows, self.batch_size):
+                cursor.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def generate_services(self, campaigns, services):
+        started = time.perf_counter()
+        pool = max(services * 4, 1) if campaigns and services else 0
+        # Names are unique: later runs reuse the pool instead of duplicating it
+        upsert = dict(update_conflicts=True, unique_fields=["name"], update_fields=["type"])
+        vaccine_ids = self.insert(
+            Vaccine,
+            (Vaccine(name=f"Vaccine {i}", type="Routine", age_group="All ages", timing="Single dose") for i in range(pool)),
+            **upsert,
+        )
+        medicine_ids = self.insert(
+            Medicine,
+            (
+                Medicine(
+                    name=f"Medicine {i}",
+                    type="Tablet",
+                    age_group="Adults",
+                    description="Synthetic medicine for load testing.",
+                    availability="Available",
+                )
+                for i in range(pool)
+            ),
+            **upsert,
+        )
+        self.report("services", len(vaccine_ids) + len(medicine_ids), started)
+        return vaccine_ids, medicine_ids
+
+    def generate_campaigns(self, count):
+        started = time.perf_counter()
+        today = date.today()
+        types = [choice for choice, _ in Campaign.TYPE_CHOICES]
+        rng = self.rng
+        # Number past earlier runs so titles (part of the natural key) stay unique
+        offset = Campaign.objects.aggregate(top=Max("pk"))["top"] or 0
+        ids = self.insert(
+            Campaign,
+            (
+                Campaign(
+                    title=f"{types[i % len(types)].title()} Camp {offset + i}",
+                    description="Synthetic campaign for load testing.",
+                    location=rng.choice(LOCATIONS).format(i % 33 + 1),
+                    date=today + timedelta(days=rng.randint(-180, 180)),
+                    helpline_number="+977-9800000000",
+                    type=types[i % len(types)],
+                )
+                for i in range(count)
+            ),
+        )
+        self.report("campaigns", len(ids), started)
+        return ids
+
+    def generate_links(self, campaign_ids, vaccine_ids, medicine_ids, per_campaign):
+        started = time.perf_counter()
+        rng = self.rng
+        count = 0
+        for field, target, service_ids in (
+            (Campaign.vaccines, "vaccine", vaccine_ids),
+            (Campaign.medicines, "medicine", medicine_ids),
+        ):
+            k = min(per_campaign, len(service_ids))
+            rows = (
+                (campaign_id, service_id)
+                for campaign_id in campaign_ids
+                for service_id in rng.sample(service_ids, k)
+            )
+            count += self.insert_rows(field.through, ["campaign", target], rows)
+        self.report("campaign services", count, started)
+
+    def generate_users(self, count, password):
+        started = time.perf_counter()
+        User = get_user_model()
+        # Hash once and share it; one PBKDF2 run per row would dominate the load
+        hashed = make_password(password)
+        rng = self.rng
+        # Continue numbering after earlier runs so usernames stay unique
+        offset = User.objects.filter(username__startswith="loadtest_").count()
+        ids = self.insert(
+            User,
+            (
+                User(
+                    username=f"loadtest_{offset + i}",
+                    password=hashed,
+                    full_name=f"Load Test User {offset + i}",
+                    email=f"loadtest_{offset + i}@example.com",
+                    age=rng.randint(1, 90),
+                    gender=rng.choice(("male", "female", "other")),
+                    phone=f"98{rng.randrange(10**8):08d}",
+                )
+                for i in range(count)
+            ),
+        )
+        self.report("users", len(ids), started)
+        return ids
+
+    def generate_registrations(self, user_ids, campaign_ids, count):
+        started = time.perf_counter()
+        if not user_ids or not campaign_ids:
+            user_ids = user_ids or list(get_user_model().objects.values_list("pk", flat=True))
+            campaign_ids = campaign_ids or list(Campaign.objects.values_list("pk", flat=True))
+        count = min(count, len(user_ids) * len(campaign_ids))
+        if not count:
+            return
+        rng = self.rng
+        per_user, extra = divmod(count, len(user_ids))
+
+        # Spread sign-up times over the last six months from a pool of
+        # pre-adapted values, so rows stay cheap to build.
+        now = timezone.now()
+        adapt = connection.ops.adapt_datetimefield_value
+        timestamps = [adapt(now - timedelta(seconds=rng.randrange(180 * 86400))) for _ in range(4096)]
+
+        def rows():
+            # Distinct campaigns per user, so unique_together never conflicts
+            for index, user_id in enumerate(user_ids):
+                k = per_user + (1 if index < extra else 0)
+                for campaign_id in rng.sample(campaign_ids, k) if k else ():
+                    yield (user_id, campaign_id, rng.choice(timestamps))
+
+        top = Registration.objects.aggregate(top=Max("pk"))["top"] or 0
+        # Conflicts can only come from pairs created by an earlier run
+        created = self.insert_rows(Registration, ["user", "campaign", "created_at"], rows())
+        # Raw inserts bypass seat allocation and the rollup signals
+        recount_seats()
+        rollups.record_inserted(top)
+        self.report("registrations", created, started)
@@ -0,0 +1,66 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from campaigns import importer
+
+JSON_EXTENSIONS = (".json", ".jsonl", ".ndjson")
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert campaigns, vaccines or medicines from a CSV or JSON file in chunks, matching "
+        "existing rows on their natural key and reporting invalid rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin")
+        parser.add_argument("--kind", choices=list(importer.KINDS), default="campaign")
+        parser.add_argument("--format", choices=importer.FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument("--chunk-size", type=int, default=importer.CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate every row but write nothing")
+        parser.add_argument("--errors", help="Write every row error to this CSV file")
+        parser.add_argument("--show-errors", type=int, default=20, help="Row errors printed without --errors")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("json" if path.lower().endswith(JSON_EXTENSIONS) else "csv")
+        report_file = open(options["errors"], "w", newline="") if options["errors"] else None
+        errors = csv.writer(report_file) if report_file else None
+        if errors:
+            errors.writerow(["row", "field", "error"])
+        shown = 0
+
+        def on_error(row, field, message):
+            nonlocal shown
+            if errors:
+                errors.writerow([row, field or "", message])
+            elif shown < options["show_errors"]:
+                shown += 1
+                self.stderr.write(f"  row {row}" + (f", {field}" if field else "") + f": {message}")
+
+        started = time.perf_counter()
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        try:
+            report = importer.import_catalogue(
+                source,
+                kind=options["kind"],
+                fmt=fmt,
+                chunk_size=options["chunk_size"],
+                dry_run=options["dry_run"],
+                on_error=on_error,
+            )
+        except (importer.ImportFormatError, UnicodeDecodeError) as exc:
+            raise CommandError(f"{path}: {exc}")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if report_file:
+                report_file.close()
+
+        elapsed = time.perf_counter() - started
+        rate = report.rows / elapsed if elapsed else 0
+        style = self.style.WARNING if report.failed else self.style.SUCCESS
+        self.stdout.write(style(f"{report} ({elapsed:.1f}s, {rate:,.0f} rows/s)"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from campaigns import diseases
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update diseases and their medicines from the app's disease_medicines.json "
+        "(unknown medicines are added to the catalogue) and index their campaigns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=str(diseases.DEFAULT_SOURCE))
+
+    def handle(self, *args, **options):
+        try:
+            loaded = diseases.load_file(options["path"])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"{options['path']}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Loaded {loaded} diseases."))
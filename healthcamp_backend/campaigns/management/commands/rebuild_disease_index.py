@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from campaigns import diseases
+from campaigns.models import DiseaseAvailability
+
+
+class Command(BaseCommand):
+    help = "Rebuild the disease -> medicine -> campaign availability index from the link tables"
+
+    def handle(self, *args, **options):
+        diseases.rebuild()
+        count = DiseaseAvailability.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Disease index rebuilt with {count} rows."))
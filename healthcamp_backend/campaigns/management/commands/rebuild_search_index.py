@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from campaigns import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the catalogue search index from the campaign, vaccine and medicine tables"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -1,10 +1,20 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from campaigns.models import Campaign
 from datetime import date, timedelta
 
 
 class Command(BaseCommand):
-    help = "Seed sample health campaigns"
+    help = "Seed sample health campaigns, optionally with synthetic volume for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--campaigns", type=int, default=0, help="Synthetic campaigns to add (see generate_load_data)")
+        parser.add_argument(
+            "--services", type=int, default=50, help="Vaccines and medicines linked to each synthetic campaign"
+        )
+        parser.add_argument("--users", type=int, default=0, help="Synthetic users to add")
+        parser.add_argument("--registrations", type=int, default=0, help="Synthetic registrations to add")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for reproducible data")
 
     def handle(self, *args, **options):
         samples = [
@@ -35,3 +45,14 @@ class Command(BaseCommand):
             )
             created += 1 if was_created else 0
         self.stdout.write(self.style.SUCCESS(f"Seed complete. Created {created} campaigns."))
+
+        if options["campaigns"] or options["users"] or options["registrations"]:
+            call_command(
+                "generate_load_data",
+                campaigns=options["campaigns"],
+                services=options["services"],
+                users=options["users"],
+                registrations=options["registrations"],
+                seed=options["seed"],
+                stdout=self.stdout,
+            )
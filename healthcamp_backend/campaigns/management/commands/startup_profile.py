@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarking import write_report
+
+# "import time:      self [us] |  cumulative | imported package"
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile cold worker starts: start fresh interpreters the way core.wsgi does, with "
+        "and without warm-up (core.warmup), and report settings, per-app import/models/"
+        "ready time, handler set-up, warm-up steps and the time to the first response "
+        "(medians over --runs), plus the slowest imports, as JSON. Serves from the "
+        "configured database and cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/healthCampaigns/", help="Requested once the worker is up")
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode")
+        parser.add_argument("--imports", type=int, default=15, help="Slowest imports to list (0 to skip)")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    def handle(self, *args, **options):
+        report = {"path": options["path"], "runs": options["runs"], "modes": {}}
+        for mode in ("cold", "warm"):
+            samples = [self.probe(options["path"], warm=mode == "warm") for _ in range(options["runs"])]
+            report["modes"][mode] = self.summarize(samples)
+        cold, warm = report["modes"]["cold"], report["modes"]["warm"]
+        report["first_request_saved_ms"] = round(cold["requests_ms"][0] - warm["requests_ms"][0], 2)
+        if options["imports"]:
+            report["slowest_imports"] = self.slowest_imports(options["path"], options["imports"])
+
+        write_report(self, report, options["output"])
+
+    def run_probe(self, path, warm, python_flags=()):
+        command = [sys.executable, *python_flags, "-m", "core.startup", "--path", path]
+        if not warm:
+            command.append("--no-warmup")
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings"),
+            # The probe calls core.warmup itself, to time it
+            WARMUP="False",
+        )
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+        if result.returncode:
+            raise CommandError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), wall_ms, result.stderr
+
+    def probe(self, path, warm):
+        sample, wall_ms, _ = self.run_probe(path, warm)
+        statuses = {r["status"] for r in sample["requests"]}
+        if statuses != {200}:
+            raise CommandError(f"GET {path} returned {sorted(statuses)}; migrate the database first.")
+        sample["phases"]["process_ms"] = wall_ms
+        return sample
+
+    @staticmethod
+    def summarize(samples):
+        def median(values):
+            return round(statistics.median(values), 2)
+
+        phases = {name: median([s["phases"][name] for s in samples]) for name in samples[0]["phases"]}
+        apps = {
+            label: {key: median([s["apps"][label].get(key, 0) for s in samples]) for key in timings}
+            for label, timings in samples[0]["apps"].items()
+        }
+        summary = {
+            "phases": phases,
+            # Slowest first
+            "apps": dict(sorted(apps.items(), key=lambda item: -sum(item[1].values()))),
+            "requests_ms": [median([s["requests"][i]["ms"] for s in samples]) for i in range(len(samples[0]["requests"]))],
+        }
+        if samples[0]["warmup"] is not None:
+            summary["warmup"] = {step: median([s["warmup"][step] for s in samples]) for step in samples[0]["warmup"]}
+        return summary
+
+    def slowest_imports(self, path, count):
+        """Modules with the most import time of their own, from ``python -X importtime``."""
+        _, _, stderr = self.run_probe(path, warm=True, python_flags=("-X", "importtime"))
+        modules = []
+        for line in stderr.splitlines():
+            match = IMPORTTIME.match(line)
+            if match:
+                own, cumulative, _, name = match.groups()
+                modules.append({"module": name, "self_ms": int(own) / 1000, "cumulative_ms": int(cumulative) / 1000})
+        return sorted(modules, key=lambda module: -module["self_ms"])[:count]
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary onto the SQLite replica files (REPLICA_SQLITE_FILES), "
+        "standing in for replication when trying read replicas locally"
+    )
+
+    def handle(self, *args, **options):
+        primary = connections["default"]
+        if primary.vendor != "sqlite":
+            raise CommandError("The primary database is not SQLite; replicas are kept in sync by the server.")
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if connections[alias].vendor == "sqlite"]
+        if not replicas:
+            raise CommandError("No SQLite replicas configured (set REPLICA_SQLITE_FILES).")
+
+        source = sqlite3.connect(primary.settings_dict["NAME"])
+        try:
+            for alias in replicas:
+                connections[alias].close()
+                target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"  {alias}: {connections[alias].settings_dict['NAME']}")
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Synced {len(replicas)} replica(s)."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0005_medicine_age_group_medicine_type"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="campaign",
+            index=models.Index(fields=["-date", "-created_at", "-id"], name="campaign_feed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="campaign",
+            index=models.Index(fields=["type", "-date", "-created_at", "-id"], name="campaign_type_feed_idx"),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0006_campaign_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("campaign", "Campaign"), ("vaccine", "Vaccine"), ("medicine", "Medicine")], max_length=20)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="medicine",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="vaccine",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="campaign",
+            index=models.Index(fields=["updated_at"], name="campaign_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="medicine",
+            index=models.Index(fields=["updated_at"], name="medicine_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="vaccine",
+            index=models.Index(fields=["updated_at"], name="vaccine_updated_idx"),
+        ),
+    ]
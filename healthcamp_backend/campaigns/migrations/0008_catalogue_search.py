@@ -0,0 +1,70 @@
+# Full-text search index for the catalogue (see campaigns.search)
+
+from django.db import migrations
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE catalogue_search USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, title, detail, body, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')",
+    "CREATE VIRTUAL TABLE catalogue_search_vocab USING fts5vocab(catalogue_search, 'row')",
+]
+SQLITE_DROP = [
+    "DROP TABLE catalogue_search_vocab",
+    "DROP TABLE catalogue_search",
+]
+
+POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE TABLE catalogue_search ("
+    "id bigint PRIMARY KEY, kind varchar(16) NOT NULL, object_id bigint NOT NULL, "
+    "title text NOT NULL, detail text NOT NULL, body text NOT NULL, "
+    "document tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', detail), 'B') || "
+    "setweight(to_tsvector('simple', body), 'C')) STORED)",
+    "CREATE INDEX catalogue_search_document_idx ON catalogue_search USING gin (document)",
+    "CREATE INDEX catalogue_search_title_trgm_idx ON catalogue_search USING gin (title gin_trgm_ops)",
+]
+POSTGRES_DROP = ["DROP TABLE catalogue_search"]
+
+# kind, code, table, title, detail, body
+DOCUMENTS = [
+    ("campaign", 1, "campaigns_campaign", "title", "location", "description"),
+    ("vaccine", 2, "campaigns_vaccine", "name", "type", "''"),
+    ("medicine", 3, "campaigns_medicine", "name", "''", "description"),
+]
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        statements, id_column = SQLITE, "rowid"
+    elif vendor == "postgresql":
+        statements, id_column = POSTGRES, "id"
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+    for kind, code, table, title, detail, body in DOCUMENTS:
+        schema_editor.execute(
+            f"INSERT INTO catalogue_search ({id_column}, kind, object_id, title, detail, body) "
+            f"SELECT id * 4 + {code}, '{kind}', id, {title}, {detail}, {body} FROM {table}"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0007_catalogue_sync"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0008_catalogue_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaign",
+            name="capacity",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="campaign",
+            name="registered_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="campaign",
+            name="waitlist_enabled",
+            field=models.BooleanField(default=False),
+        ),
+    ]
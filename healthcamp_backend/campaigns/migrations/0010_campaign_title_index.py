@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0009_campaign_capacity"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="campaign",
+            name="title",
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:43
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_services(apps, schema_editor):
+    """Fold vaccines and medicines sharing a name into the oldest row, keeping their campaign links."""
+    Campaign = apps.get_model("campaigns", "Campaign")
+    Tombstone = apps.get_model("campaigns", "Tombstone")
+    connection = schema_editor.connection
+    for model_name, field_name in (("Vaccine", "vaccines"), ("Medicine", "medicines")):
+        model = apps.get_model("campaigns", model_name)
+        through = Campaign._meta.get_field(field_name).remote_field.through
+        kind = model._meta.model_name
+        duplicates = model.objects.values("name").annotate(n=Count("pk"), keep=Min("pk")).filter(n__gt=1)
+        for row in duplicates:
+            merged = list(model.objects.filter(name=row["name"]).exclude(pk=row["keep"]).values_list("pk", flat=True))
+            linked = set(through.objects.filter(**{kind: row["keep"]}).values_list("campaign_id", flat=True))
+            moved = set(through.objects.filter(**{f"{kind}__in": merged}).values_list("campaign_id", flat=True))
+            through.objects.bulk_create(
+                [through(campaign_id=campaign_id, **{f"{kind}_id": row["keep"]}) for campaign_id in moved - linked]
+            )
+            model.objects.filter(pk__in=merged).delete()
+            # Deletes here send no signals: tell sync clients and the search index
+            Tombstone.objects.bulk_create([Tombstone(kind=kind, object_id=pk) for pk in merged])
+            if connection.vendor in ("sqlite", "postgresql"):
+                placeholders = ", ".join(["%s"] * len(merged))
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"DELETE FROM catalogue_search WHERE kind = %s AND object_id IN ({placeholders})",
+                        [kind, *merged],
+                    )
+
+
+def check_duplicate_campaigns(apps, schema_editor):
+    # Campaigns carry registrations and waitlists, so they are not merged blindly
+    Campaign = apps.get_model("campaigns", "Campaign")
+    duplicates = list(
+        Campaign.objects.values_list("title", "date", "location").annotate(n=Count("pk")).filter(n__gt=1)[:10]
+    )
+    if duplicates:
+        listed = "; ".join(f"{title!r} on {date} at {location!r}" for title, date, location, _ in duplicates)
+        raise RuntimeError(
+            "Campaigns must be unique by title, date and location before this migration can run. "
+            f"Merge or rename the duplicates in the admin first: {listed}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0010_campaign_title_index"),
+    ]
+
+    # Data only: on Postgres the deletes leave deferred constraint checks
+    # pending, which would block altering the same tables in this transaction
+    operations = [
+        migrations.RunPython(merge_duplicate_services, migrations.RunPython.noop),
+        migrations.RunPython(check_duplicate_campaigns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0011_merge_duplicate_services"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="medicine",
+            name="name",
+            field=models.CharField(max_length=120, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="vaccine",
+            name="name",
+            field=models.CharField(max_length=120, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name="campaign",
+            constraint=models.UniqueConstraint(fields=("title", "date", "location"), name="campaign_natural_key"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0012_catalogue_natural_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Disease",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=120, unique=True)),
+                ("slug", models.SlugField(max_length=140, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("medicines", models.ManyToManyField(blank=True, related_name="diseases", to="campaigns.medicine")),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DiseaseAvailability",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("campaign", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="disease_availability", to="campaigns.campaign")),
+                ("disease", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="availability", to="campaigns.disease")),
+                ("medicine", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="disease_availability", to="campaigns.medicine")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["disease", "date", "campaign"], name="disease_upcoming_idx")],
+                "unique_together": {("disease", "medicine", "campaign")},
+            },
+        ),
+    ]
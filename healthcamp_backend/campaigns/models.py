@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.text import slugify
 
 
 class Campaign(models.Model):
@@ -9,7 +10,9 @@ class Campaign(models.Model):
         ("other", "Other"),
     )
 
-    title = models.CharField(max_length=200)
+    # db_index (not Meta.indexes) so Postgres also builds the pattern-ops
+    # index that title__startswith needs (registration admin search)
+    title = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True)
     location = models.CharField(max_length=200)
     date = models.DateField()
@@ -17,6 +20,11 @@ class Campaign(models.Model):
     maps_url = models.URLField(blank=True)
     type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     image_url = models.URLField(blank=True)
+    # Seats; null means unlimited. registered_count is maintained by
+    # registrations.seats and never written by a full save().
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    registered_count = models.PositiveIntegerField(default=0)
+    waitlist_enabled = models.BooleanField(default=False)
     vaccines = models.ManyToManyField("Vaccine", related_name="campaigns", blank=True)
     medicines = models.ManyToManyField("Medicine", related_name="campaigns", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -24,35 +32,119 @@ class Campaign(models.Model):
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            # Keyset pagination for the campaign feed (see campaigns.pagination)
+            models.Index(fields=["-date", "-created_at", "-id"], name="campaign_feed_idx"),
+            models.Index(fields=["type", "-date", "-created_at", "-id"], name="campaign_type_feed_idx"),
+            # Delta sync (see campaigns.sync)
+            models.Index(fields=["updated_at"], name="campaign_updated_idx"),
+        ]
+        constraints = [
+            # Natural key that catalogue imports upsert on (see campaigns.importer)
+            models.UniqueConstraint(fields=["title", "date", "location"], name="campaign_natural_key"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        # A stale instance (e.g. an admin edit) must not overwrite the seat count
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            skipped = self.get_deferred_fields() | {"registered_count"}
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields if not f.primary_key and f.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
 
 class Vaccine(models.Model):
-    name = models.CharField(max_length=120)
+    name = models.CharField(max_length=120, unique=True)
     type = models.CharField(max_length=120, blank=True)
     age_group = models.CharField(max_length=120, blank=True)
     timing = models.CharField(max_length=120, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
+        indexes = [models.Index(fields=["updated_at"], name="vaccine_updated_idx")]
 
     def __str__(self) -> str:
         return self.name
 
 
 class Medicine(models.Model):
-    name = models.CharField(max_length=120)
+    name = models.CharField(max_length=120, unique=True)
     type = models.CharField(max_length=120, blank=True)
     age_group = models.CharField(max_length=120, blank=True)
     description = models.TextField(blank=True)
     availability = models.CharField(max_length=120, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+        indexes = [models.Index(fields=["updated_at"], name="medicine_updated_idx")]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Disease(models.Model):
+    name = models.CharField(max_length=120, unique=True)
+    # URL key: /api/diseases/<slug>/campaigns/
+    slug = models.SlugField(max_length=140, unique=True)
+    medicines = models.ManyToManyField(Medicine, related_name="diseases", blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
 
     def __str__(self) -> str:
         return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
+
+class DiseaseAvailability(models.Model):
+    """
+    Inverted index row: ``campaign`` offers ``medicine``, which treats
+    ``disease``. Maintained by ``campaigns.diseases``; never edit by hand.
+    """
+
+    disease = models.ForeignKey(Disease, on_delete=models.CASCADE, related_name="availability")
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="disease_availability")
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="disease_availability")
+    # Copy of campaign.date, so upcoming campaigns come straight off the index
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("disease", "medicine", "campaign")
+        indexes = [models.Index(fields=["disease", "date", "campaign"], name="disease_upcoming_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.disease_id}:{self.medicine_id}:{self.campaign_id}"
+
+
+class Tombstone(models.Model):
+    """Records a deleted catalogue row so delta-sync clients can drop it."""
+
+    KIND_CHOICES = (
+        ("campaign", "Campaign"),
+        ("vaccine", "Vaccine"),
+        ("medicine", "Medicine"),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["deleted_at"]
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.object_id}"
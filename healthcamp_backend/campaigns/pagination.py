@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite ordering.
+
+    The cursor encodes the ordering values of the last row on the page, so the
+    next page is a single indexed range scan regardless of how deep the client
+    has scrolled. Unlike DRF's CursorPagination the whole ordering tuple is
+    used as the position, so ties on the leading column never fall back to
+    OFFSET.
+    """
+
+    ordering = ("-id",)
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        return self._paginate(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset`` for the ASGI read path."""
+        queryset = self._page_queryset(queryset, request)
+        return self._paginate([obj async for obj in queryset[: self.page_size + 1]])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        return queryset
+
+    def _paginate(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_position = self.position_of(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            size = int(raw)
+        except ValueError:
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    # Cursor helpers
+
+    def _fields(self):
+        return [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+    def position_of(self, obj):
+        return [getattr(obj, name) for name, _ in self._fields()]
+
+    def after(self, position):
+        """Build ``(a, b, c) < (x, y, z)`` as an OR of prefix-equal comparisons."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), position):
+            lookup = f"{name}__lt" if descending else f"{name}__gt"
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position):
+        raw = json.dumps([str(v) for v in position], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii"))
+            fields = self._fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, values)
+            ]
+        except (TypeError, ValueError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class CampaignFeedPagination(KeysetPagination):
+    # Campaign.Meta.ordering plus the primary key as a unique tie-breaker
+    ordering = ("-date", "-created_at", "-id")
@@ -0,0 +1,317 @@
+"""
+Full-text and prefix search over the campaign, vaccine and medicine catalogues.
+
+Every catalogue row has one document (title, detail, body) in the
+``catalogue_search`` table, kept current by the signals in
+``campaigns.signals``:
+
+* SQLite: an FTS5 virtual table with prefix indexes, ranked by bm25. Typos are
+  handled by correcting unknown terms against the index vocabulary
+  (``catalogue_search_vocab``), loaded lazily and rebuilt when the catalogue
+  version changes.
+* PostgreSQL: a table with a weighted, generated ``tsvector`` column under a
+  GIN index for prefix queries, plus a trigram GIN index on the title for
+  typo-tolerant matches (pg_trgm).
+
+Document ids are ``object_id * 4 + kind code`` so a document is replaced or
+removed with a primary-key lookup. Bulk writes that bypass signals should
+pass their rows to ``index_many()``, or finish with ``rebuild()`` (or
+``manage.py rebuild_search_index``) after a full load.
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from core.instrumentation import serializer_timer
+from .cache import get_versions
+from .models import Campaign, Vaccine, Medicine
+
+TABLE = "catalogue_search"
+VOCAB_TABLE = "catalogue_search_vocab"
+
+# kind -> (code, model, title, detail, body)
+DOCUMENTS = {
+    "campaign": (1, Campaign, "title", "location", "description"),
+    "vaccine": (2, Vaccine, "name", "type", None),
+    "medicine": (3, Medicine, "name", None, "description"),
+}
+DOCUMENT_MODELS = [model for _, model, *_ in DOCUMENTS.values()]
+
+TERM_RE = re.compile(r"\w+")
+MAX_TERMS = 8
+# Typo correction only kicks in for terms at least this long
+MIN_TYPO_LENGTH = 4
+MAX_CORRECTIONS = 5
+# SQLite: matches beyond which results are ordered by recency instead of bm25
+RANK_LIMIT = 2000
+
+
+def document_id(kind, object_id):
+    return object_id * 4 + DOCUMENTS[kind][0]
+
+
+def tokenize(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+class SearchBackend(ABC):
+    def document(self, kind, instance):
+        _, _, title, detail, body = DOCUMENTS[kind]
+        return [
+            document_id(kind, instance.pk),
+            kind,
+            instance.pk,
+            getattr(instance, title),
+            getattr(instance, detail) if detail else "",
+            getattr(instance, body) if body else "",
+        ]
+
+    def index(self, cursor, kind, instance):
+        cursor.execute(self.upsert_sql, self.document(kind, instance))
+
+    def index_many(self, cursor, kind, instances):
+        cursor.executemany(self.upsert_sql, [self.document(kind, instance) for instance in instances])
+
+    def remove(self, cursor, kind, object_id):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE {self.id_column} = %s", [document_id(kind, object_id)])
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE}")
+        quote = connection.ops.quote_name
+        for kind, (code, model, *columns) in DOCUMENTS.items():
+            title, detail, body = (quote(column) if column else "''" for column in columns)
+            cursor.execute(
+                f"INSERT INTO {TABLE} ({self.id_column}, kind, object_id, title, detail, body) "
+                f"SELECT id * 4 + {code}, %s, id, {title}, {detail}, {body} FROM {quote(model._meta.db_table)}",
+                [kind],
+            )
+
+    @abstractmethod
+    def search(self, cursor, terms, kinds, limit):
+        """Return ``(kind, object_id, title, detail)`` rows matching every term, best first."""
+
+
+class SQLiteSearchBackend(SearchBackend):
+    id_column = "rowid"
+    # FTS5 tables have no upsert; the DELETE is a rowid lookup
+    upsert_sql = (
+        f"INSERT INTO {TABLE} (rowid, kind, object_id, title, detail, body) VALUES (%s, %s, %s, %s, %s, %s)"
+    )
+
+    def index(self, cursor, kind, instance):
+        self.remove(cursor, kind, instance.pk)
+        super().index(cursor, kind, instance)
+
+    def index_many(self, cursor, kind, instances):
+        cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [[document_id(kind, i.pk)] for i in instances])
+        super().index_many(cursor, kind, instances)
+
+    def search(self, cursor, terms, kinds, limit):
+        rows = self.match(cursor, [[term] for term in terms], kinds, limit)
+        if rows:
+            return rows
+        alternatives = get_vocabulary(cursor).correct(terms)
+        if alternatives == [[term] for term in terms]:
+            return rows
+        return self.match(cursor, alternatives, kinds, limit)
+
+    def match(self, cursor, alternatives, kinds, limit):
+        # Every term is a prefix query; a term with corrections matches any of them
+        expression = " AND ".join(
+            "(" + " OR ".join(f'"{term}"*' for term in options) + ")" for options in alternatives
+        )
+        where = f"{TABLE} MATCH %s"
+        params = [expression]
+        if kinds:
+            where += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+            params += kinds
+
+        # bm25 costs a few microseconds per match. A prefix that matches more
+        # than RANK_LIMIT documents is too broad for relevance to mean much,
+        # so return the newest matches instead of ranking them all.
+        cursor.execute(
+            f"SELECT count(*) FROM (SELECT 1 FROM {TABLE} WHERE {where} LIMIT %s)", params + [RANK_LIMIT + 1]
+        )
+        if cursor.fetchone()[0] > RANK_LIMIT:
+            order = "rowid DESC"
+        else:
+            # Weights per column: kind, object_id, title, detail, body
+            order = f"bm25({TABLE}, 0, 0, 10.0, 4.0, 1.0)"
+        cursor.execute(
+            f"SELECT kind, object_id, title, detail FROM {TABLE} WHERE {where} ORDER BY {order} LIMIT %s",
+            params + [limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgresSearchBackend(SearchBackend):
+    id_column = "id"
+    upsert_sql = (
+        f"INSERT INTO {TABLE} (id, kind, object_id, title, detail, body) VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, detail = EXCLUDED.detail, body = EXCLUDED.body"
+    )
+
+    def search(self, cursor, terms, kinds, limit):
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        text = " ".join(terms)
+        sql = (
+            f"SELECT kind, object_id, title, detail FROM {TABLE} "
+            "WHERE (document @@ to_tsquery('simple', %s) OR %s <%% title)"
+        )
+        params = [tsquery, text]
+        if kinds:
+            sql += " AND kind = ANY(%s)"
+            params.append(list(kinds))
+        sql += (
+            " ORDER BY ts_rank(document, to_tsquery('simple', %s)) + word_similarity(%s, title) DESC, id"
+            " LIMIT %s"
+        )
+        cursor.execute(sql, params + [tsquery, text, limit])
+        return cursor.fetchall()
+
+
+BACKENDS = {"sqlite": SQLiteSearchBackend(), "postgresql": PostgresSearchBackend()}
+
+
+def get_backend():
+    try:
+        return BACKENDS[connection.vendor]
+    except KeyError:
+        raise ImproperlyConfigured(f"Catalogue search does not support the {connection.vendor} backend.")
+
+
+def index_instance(instance):
+    with connection.cursor() as cursor:
+        get_backend().index(cursor, instance._meta.model_name, instance)
+
+
+def index_many(model, instances):
+    """Index rows written without signals, e.g. by ``bulk_create``."""
+    with connection.cursor() as cursor:
+        get_backend().index_many(cursor, model._meta.model_name, instances)
+
+
+def remove_instance(instance):
+    with connection.cursor() as cursor:
+        get_backend().remove(cursor, instance._meta.model_name, instance.pk)
+
+
+def rebuild():
+    with connection.cursor() as cursor:
+        get_backend().rebuild(cursor)
+
+
+def search(query, kinds=(), limit=10):
+    """Return up to ``limit`` matches as dicts, best first."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        rows = get_backend().search(cursor, terms, list(kinds), limit)
+    with serializer_timer():
+        return [
+            {"kind": kind, "id": object_id, "title": title, "detail": detail}
+            for kind, object_id, title, detail in rows
+        ]
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class Vocabulary:
+    """
+    Index terms bucketed by their first ``MIN_TYPO_LENGTH`` characters, with a
+    single-deletion map over the bucket keys, so that candidates for a
+    misspelt term are found without scanning the whole vocabulary.
+    """
+
+    def __init__(self, terms):
+        self.buckets = defaultdict(list)
+        for term, frequency in terms:
+            if len(term) >= MIN_TYPO_LENGTH:
+                self.buckets[term[:MIN_TYPO_LENGTH]].append((term, frequency))
+        self.keys = defaultdict(set)
+        for key in self.buckets:
+            for variant in _deletes(key) | {key}:
+                self.keys[variant].add(key)
+
+    def is_prefix(self, term):
+        return any(t.startswith(term) for t, _ in self.buckets.get(term[:MIN_TYPO_LENGTH], ()))
+
+    def candidates(self, term):
+        head = term[:MIN_TYPO_LENGTH]
+        keys = set()
+        for variant in _deletes(head) | {head}:
+            keys |= self.keys.get(variant, set())
+        limit = 1 if len(term) < 6 else 2
+        found = {}
+        for key in keys:
+            for candidate, frequency in self.buckets[key]:
+                # Compare equal-length prefixes, and one longer or shorter to
+                # allow for a dropped or doubled letter
+                distance, prefix = min(
+                    (edit_distance(term, candidate[:n], limit), candidate[:n])
+                    for n in (len(term) - 1, len(term), len(term) + 1)
+                )
+                if distance <= limit:
+                    best = found.get(prefix)
+                    score = (distance, -frequency)
+                    if best is None or score < best:
+                        found[prefix] = score
+        return [prefix for prefix, _ in sorted(found.items(), key=lambda item: item[1])[:MAX_CORRECTIONS]]
+
+    def correct(self, terms):
+        """Return, per term, the term itself or its likely intended prefixes."""
+        corrected = []
+        for term in terms:
+            if len(term) < MIN_TYPO_LENGTH or self.is_prefix(term):
+                corrected.append([term])
+            else:
+                corrected.append(self.candidates(term) or [term])
+        return corrected
+
+
+_vocabulary = None
+_lock = threading.Lock()
+
+
+def get_vocabulary(cursor):
+    """Return the SQLite index vocabulary, reloading it if the catalogue changed."""
+    global _vocabulary
+    version = tuple(get_versions(DOCUMENT_MODELS))
+    current = _vocabulary
+    if current is not None and current[0] == version:
+        return current[1]
+    with _lock:
+        current = _vocabulary
+        if current is None or current[0] != version:
+            cursor.execute(f"SELECT term, doc FROM {VOCAB_TABLE}")
+            current = (version, Vocabulary(cursor.fetchall()))
+            _vocabulary = current
+    return current[1]
+
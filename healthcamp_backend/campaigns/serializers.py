@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Campaign, Vaccine, Medicine
+from .models import Campaign, Disease, Vaccine, Medicine
 
 
 class VaccineSerializer(serializers.ModelSerializer):
@@ -12,6 +12,7 @@ class VaccineSerializer(serializers.ModelSerializer):
             "age_group",
             "timing",
             "created_at",
+            "updated_at",
         ]
 
 
@@ -26,12 +27,24 @@ class MedicineSerializer(serializers.ModelSerializer):
             "description",
             "availability",
             "created_at",
+            "updated_at",
         ]
 
 
 class CampaignSerializer(serializers.ModelSerializer):
     vaccines = VaccineSerializer(many=True, read_only=True)
     medicines = MedicineSerializer(many=True, read_only=True)
+
+    # Nested relations that clients opt into with ?expand=
+    expandable_fields = ("vaccines", "medicines")
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Optional sparse fieldset: drop everything not explicitly requested
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Campaign
         fields = [
@@ -44,8 +57,35 @@ class CampaignSerializer(serializers.ModelSerializer):
             "maps_url",
             "type",
             "image_url",
+            "capacity",
+            "waitlist_enabled",
             "vaccines",
             "medicines",
             "created_at",
             "updated_at",
         ]
+
+
+class SyncCampaignSerializer(serializers.ModelSerializer):
+    """Campaign row for delta sync; services are sent by id and synced separately."""
+
+    vaccines = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    medicines = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Campaign
+        fields = CampaignSerializer.Meta.fields
+
+
+class MedicineSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Medicine
+        fields = ["id", "name"]
+
+
+class DiseaseSerializer(serializers.ModelSerializer):
+    medicines = MedicineSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Disease
+        fields = ["id", "name", "slug", "medicines"]
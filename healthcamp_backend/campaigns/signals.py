@@ -0,0 +1,122 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import events
+from . import diseases, search
+from .cache import bump_version
+from .models import Campaign, Disease, Vaccine, Medicine, Tombstone
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+@receiver(post_save, sender=Vaccine)
+@receiver(post_delete, sender=Vaccine)
+@receiver(post_save, sender=Medicine)
+@receiver(post_delete, sender=Medicine)
+def bump_catalogue_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(post_delete, sender=Campaign)
+@receiver(post_delete, sender=Vaccine)
+@receiver(post_delete, sender=Medicine)
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(kind=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_save, sender=Vaccine)
+@receiver(post_save, sender=Medicine)
+def index_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_instance(instance)
+
+
+@receiver(post_delete, sender=Campaign)
+@receiver(post_delete, sender=Vaccine)
+@receiver(post_delete, sender=Medicine)
+def remove_search_document(sender, instance, **kwargs):
+    search.remove_instance(instance)
+
+
+@receiver(m2m_changed, sender=Campaign.vaccines.through)
+@receiver(m2m_changed, sender=Campaign.medicines.through)
+def bump_campaign_links_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # The campaigns losing this service are only knowable before the clear
+        instance._cleared_campaign_ids = list(instance.campaigns.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    # Linked services are embedded in the campaign representation
+    bump_version(Campaign)
+
+    # Touch updated_at so delta sync picks up the new links
+    if not reverse:
+        campaign_ids = [instance.pk]
+    elif action == "post_clear":
+        campaign_ids = getattr(instance, "_cleared_campaign_ids", [])
+    else:
+        campaign_ids = list(pk_set or [])
+    if campaign_ids:
+        Campaign.objects.filter(pk__in=campaign_ids).update(updated_at=timezone.now())
+        push_campaigns_updated(campaign_ids)
+
+
+@receiver(m2m_changed, sender=Campaign.medicines.through)
+@receiver(m2m_changed, sender=Disease.medicines.through)
+def index_medicine_links(sender, instance, action, reverse, pk_set, **kwargs):
+    # Keep the disease availability index in step with both link tables
+    owner = "disease" if sender is Disease.medicines.through else "campaign"
+    side, other = ("medicine", owner) if reverse else (owner, "medicine")
+    if action == "post_add":
+        diseases.index(**{f"{side}s": [instance.pk], f"{other}s": pk_set})
+    elif action == "post_remove":
+        diseases.unindex(**{side: instance.pk, f"{other}__in": pk_set})
+    elif action == "post_clear":
+        diseases.unindex(**{side: instance.pk})
+
+
+@receiver(post_save, sender=Campaign)
+def move_disease_availability(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        diseases.move_campaign(instance)
+
+
+@receiver(post_save, sender=Campaign)
+def push_campaign_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        events.publish(events.CAMPAIGNS, "campaign.created" if created else "campaign.updated", {"id": instance.pk})
+
+
+@receiver(post_delete, sender=Campaign)
+def push_campaign_deleted(sender, instance, **kwargs):
+    events.publish(events.CAMPAIGNS, "campaign.deleted", {"id": instance.pk})
+
+
+def push_campaigns_updated(campaign_ids):
+    for pk in campaign_ids:
+        events.publish(events.CAMPAIGNS, "campaign.updated", {"id": pk})
+
+
+@receiver(post_save, sender=Vaccine)
+@receiver(post_save, sender=Medicine)
+def push_service_saved(sender, instance, created, raw=False, **kwargs):
+    # Campaigns embed their services; a new service has no campaigns yet
+    if not created and not raw:
+        push_campaigns_updated(instance.campaigns.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Vaccine)
+@receiver(pre_delete, sender=Medicine)
+def remember_service_campaigns(sender, instance, **kwargs):
+    # The links are deleted with the service, without m2m_changed
+    instance._campaign_ids = list(instance.campaigns.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Vaccine)
+@receiver(post_delete, sender=Medicine)
+def push_service_deleted(sender, instance, **kwargs):
+    push_campaigns_updated(instance.__dict__.pop("_campaign_ids", []))
@@ -0,0 +1,86 @@
+"""
+Delta sync for offline-first clients.
+
+A sync token is an opaque encoding of the server time at which a sync ran.
+The next sync returns rows whose ``updated_at`` is at or after that time (less
+a small overlap, so rows committed by transactions that were still open are
+not missed) and tombstones recorded since. Clients upsert rows by id, so the
+occasional repeat from the overlap is harmless.
+"""
+
+import base64
+import binascii
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.instrumentation import serializer_timer
+
+from .models import Campaign, Vaccine, Medicine, Tombstone
+from .serializers import MedicineSerializer, SyncCampaignSerializer, VaccineSerializer
+
+TOKEN_PREFIX = "v1:"
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def encode_token(moment):
+    raw = TOKEN_PREFIX + moment.isoformat()
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+
+def decode_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii")).decode("ascii")
+    except (ValueError, UnicodeError, binascii.Error):
+        raise InvalidToken(token)
+    if not raw.startswith(TOKEN_PREFIX):
+        raise InvalidToken(token)
+    try:
+        moment = parse_datetime(raw[len(TOKEN_PREFIX):])
+    except ValueError:
+        moment = None
+    if moment is None or timezone.is_naive(moment):
+        raise InvalidToken(token)
+    return moment
+
+
+def build_changes(since=None):
+    """
+    Return the sync payload for changes after ``since`` (a datetime), or a
+    full snapshot when ``since`` is None or older than the tombstone
+    retention window.
+    """
+    now = timezone.now()
+    retention = timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+    reset = since is None or since < now - retention
+
+    campaigns = Campaign.objects.prefetch_related(
+        Prefetch("vaccines", queryset=Vaccine.objects.only("id")),
+        Prefetch("medicines", queryset=Medicine.objects.only("id")),
+    )
+    vaccines = Vaccine.objects.all()
+    medicines = Medicine.objects.all()
+    deleted = {"campaigns": [], "vaccines": [], "medicines": []}
+
+    if not reset:
+        after = since - timedelta(seconds=getattr(settings, "SYNC_OVERLAP_SECONDS", 5))
+        campaigns = campaigns.filter(updated_at__gte=after)
+        vaccines = vaccines.filter(updated_at__gte=after)
+        medicines = medicines.filter(updated_at__gte=after)
+        tombstones = Tombstone.objects.filter(deleted_at__gte=after).values_list("kind", "object_id")
+        for kind, object_id in tombstones:
+            deleted[f"{kind}s"].append(object_id)
+
+    with serializer_timer():
+        changes = {
+            "campaigns": SyncCampaignSerializer(campaigns, many=True).data,
+            "vaccines": VaccineSerializer(vaccines, many=True).data,
+            "medicines": MedicineSerializer(medicines, many=True).data,
+        }
+    return {"token": encode_token(now), "reset": reset, **changes, "deleted": deleted}
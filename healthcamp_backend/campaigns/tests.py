@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.admin_tools import EstimatedCountPaginator
+from core.benchmarking import seed
+from .management.commands.benchmark_admin import QUERY_CEILINGS, admin_pages
+
+
+class AdminQueryCountTests(TestCase):
+    """
+    Admin pages run the same number of queries on every page. The ceilings of
+    ``manage.py benchmark_admin`` are the exact counts here; that command
+    checks them again, with timings, at full scale.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(campaigns=300, services=5, users=300, registrations=3000)
+        cls.admin = get_user_model().objects.create_superuser("admin_tests", password="admin-tests")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        # Size tables from their estimate, as past exact_threshold rows in production
+        patcher = mock.patch.object(EstimatedCountPaginator, "exact_threshold", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_query_counts(self):
+        for name, paths in admin_pages(pages=(1, 2, 3)).items():
+            # Session and content type lookups are cached after the first request
+            self.client.get(paths[0])
+            for path in paths:
+                with self.subTest(path=path), self.assertNumQueries(QUERY_CEILINGS[name]):
+                    self.assertEqual(self.client.get(path).status_code, 200)
@@ -1,10 +1,27 @@
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import CampaignViewSet, VaccineViewSet, MedicineViewSet
+from .async_views import AsyncCampaignView, AsyncVaccineView, AsyncMedicineView
+from .views import CampaignViewSet, DiseaseViewSet, VaccineViewSet, MedicineViewSet, SearchView, SyncView
 
 router = DefaultRouter()
 router.register(r"healthCampaigns", CampaignViewSet, basename="healthCampaigns")
 router.register(r"services/vaccines", VaccineViewSet, basename="vaccine")
 router.register(r"services/medicines", MedicineViewSet, basename="medicine")
+router.register(r"diseases", DiseaseViewSet, basename="disease")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("sync/", SyncView.as_view(), name="catalogue-sync"),
+    path("search/", SearchView.as_view(), name="catalogue-search"),
+] + router.urls
 
+if settings.ASYNC_READ_VIEWS:
+    # Native async read path for ASGI deployments (see core.async_views)
+    urlpatterns = [
+        path("healthCampaigns/", AsyncCampaignView.as_view(), name="healthCampaigns-list"),
+        path("healthCampaigns/<int:pk>/", AsyncCampaignView.as_view(), name="healthCampaigns-detail"),
+        path("services/vaccines/", AsyncVaccineView.as_view(), name="vaccine-list"),
+        path("services/vaccines/<int:pk>/", AsyncVaccineView.as_view(), name="vaccine-detail"),
+        path("services/medicines/", AsyncMedicineView.as_view(), name="medicine-list"),
+        path("services/medicines/<int:pk>/", AsyncMedicineView.as_view(), name="medicine-detail"),
+    ] + urlpatterns
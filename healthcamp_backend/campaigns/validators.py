@@ -0,0 +1,26 @@
+from urllib.parse import urlparse
+
+from django.core.exceptions import ValidationError
+
+MAPS_HOSTS = {
+    "maps.google.com",
+    "www.google.com",
+    "google.com",
+    "goo.gl",
+}
+
+
+def validate_maps_url(value):
+    """Only Google Maps links may be shown to patients as a campaign's map."""
+    if not value:
+        return
+    try:
+        parsed = urlparse(value)
+    except Exception:
+        raise ValidationError("Invalid URL.")
+    host = (parsed.hostname or "").lower()
+    if host not in MAPS_HOSTS:
+        raise ValidationError("Only Google Maps links are allowed.")
+    # For google.com hosts, require path to start with /maps or be a goo.gl short link
+    if host in {"www.google.com", "google.com"} and not (parsed.path or "").startswith("/maps"):
+        raise ValidationError("Path must start with /maps for Google Maps links.")
@@ -1,21 +1,220 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
 from rest_framework import viewsets, permissions
-from .models import Campaign, Vaccine, Medicine
-from .serializers import CampaignSerializer, VaccineSerializer, MedicineSerializer
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core.instrumentation import TimedSerializationMixin, serializer_timer
+from .cache import VersionedCacheMixin
+from .models import Campaign, Disease, Vaccine, Medicine
+from .pagination import CampaignFeedPagination
+from . import diseases, search
+from .serializers import (
+    CampaignSerializer,
+    DiseaseSerializer,
+    MedicineSerializer,
+    MedicineSummarySerializer,
+    VaccineSerializer,
+)
+from .sync import InvalidToken, build_changes, decode_token
 
-class CampaignViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Campaign.objects.all().prefetch_related("vaccines", "medicines")
+
+def _parse_date_param(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_date(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({name: ["Enter a valid date (YYYY-MM-DD)."]})
+    return value
+
+
+def _parse_limit_param(params, default, maximum):
+    try:
+        limit = min(int(params.get("limit", default)), maximum)
+    except ValueError:
+        raise ValidationError({"limit": ["Enter a whole number."]})
+    if limit < 1:
+        raise ValidationError({"limit": ["Ensure this value is greater than or equal to 1."]})
+    return limit
+
+
+def _parse_list_param(params, name, allowed):
+    values = [v.strip() for v in params.get(name, "").split(",") if v.strip()]
+    unknown = [v for v in values if v not in allowed]
+    if unknown:
+        raise ValidationError({name: [f"Unknown value: {', '.join(unknown)}."]})
+    return values
+
+
+class CampaignViewSet(VersionedCacheMixin, TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (Campaign, Vaccine, Medicine)
+    queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CampaignFeedPagination
+
+    def get_requested_fields(self):
+        """
+        Resolve ``?fields=`` and ``?expand=`` into the serializer field list.
+
+        Without either parameter the full representation is returned. An
+        ``expand`` parameter (even an empty one) limits the nested relations
+        to the ones it names.
+        """
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+        all_fields = list(CampaignSerializer.Meta.fields)
+        expandable = CampaignSerializer.expandable_fields
+        params = self.request.query_params if self.request is not None else {}
 
+        fields = _parse_list_param(params, "fields", all_fields) or all_fields
+        if "expand" in params:
+            expand = _parse_list_param(params, "expand", expandable)
+            fields = [f for f in fields if f not in expandable] + expand
+        self._requested_fields = fields
+        return fields
 
-class VaccineViewSet(viewsets.ReadOnlyModelViewSet):
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        fields = self.get_requested_fields()
+        nested = [f for f in CampaignSerializer.expandable_fields if f in fields]
+        if nested:
+            qs = qs.prefetch_related(*nested)
+        # Load only the columns being serialized, plus the pagination key
+        columns = {f for f in fields if f not in CampaignSerializer.expandable_fields}
+        qs = qs.only(*(columns | {"id", "date", "created_at"}))
+        if self.action != "list":
+            return qs
+
+        # Filters on the feed; each combination is covered by campaign_feed_idx
+        # or campaign_type_feed_idx so pages stay an index range scan.
+        params = self.request.query_params
+        types = [t.strip() for t in params.get("type", "").split(",") if t.strip()]
+        if types:
+            valid = {choice for choice, _ in Campaign.TYPE_CHOICES}
+            unknown = sorted(set(types) - valid)
+            if unknown:
+                raise ValidationError({"type": [f"Unknown campaign type: {', '.join(unknown)}."]})
+            qs = qs.filter(type__in=types)
+
+        date_from = _parse_date_param(params, "date_from")
+        date_to = _parse_date_param(params, "date_to")
+        if params.get("upcoming", "").lower() in ("1", "true", "yes"):
+            today = timezone.localdate()
+            date_from = max(date_from, today) if date_from else today
+        if date_from:
+            qs = qs.filter(date__gte=date_from)
+        if date_to:
+            qs = qs.filter(date__lte=date_to)
+        return qs
+
+
+class VaccineViewSet(VersionedCacheMixin, TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (Vaccine,)
     queryset = Vaccine.objects.all()
     serializer_class = VaccineSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class MedicineViewSet(viewsets.ReadOnlyModelViewSet):
+class MedicineViewSet(VersionedCacheMixin, TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    cache_models = (Medicine,)
     queryset = Medicine.objects.all()
     serializer_class = MedicineSerializer
     permission_classes = [permissions.AllowAny]
+
+
+class DiseaseViewSet(TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Diseases and the medicines that treat them. ``<slug>`` also accepts the
+    disease name (``/api/diseases/Heart Disease/``).
+
+    ``GET /api/diseases/<slug>/campaigns/`` lists upcoming campaigns offering
+    any of those medicines, soonest first, from the availability index (see
+    ``campaigns.diseases``). ``limit`` caps the campaigns (default 50, at
+    most 200).
+    """
+
+    queryset = Disease.objects.prefetch_related("medicines")
+    serializer_class = DiseaseSerializer
+    permission_classes = [permissions.AllowAny]
+    lookup_field = "slug"
+    lookup_value_regex = "[^/]+"
+    default_limit = 50
+    max_limit = 200
+
+    def get_object(self):
+        self.kwargs["slug"] = slugify(self.kwargs["slug"])
+        return super().get_object()
+
+    @action(detail=True, methods=["get"])
+    def campaigns(self, request, slug=None):
+        slug = slugify(slug)
+        limit = _parse_limit_param(request.query_params, self.default_limit, self.max_limit)
+        found = diseases.upcoming(slug, limit)
+        if found is None:
+            raise NotFound("No such disease.")
+        with serializer_timer():
+            campaigns = CampaignSerializer(
+                [campaign for campaign, _ in found], many=True, fields=["id", *diseases.CAMPAIGN_FIELDS]
+            ).data
+            results = [
+                {**campaign, "matching_medicines": MedicineSummarySerializer(medicines, many=True).data}
+                for campaign, (_, medicines) in zip(campaigns, found)
+            ]
+        return Response({"disease": slug, "results": results})
+
+
+class SyncView(APIView):
+    """
+    Delta sync of the campaign, vaccine and medicine catalogues.
+
+    ``GET /api/sync/`` returns a full snapshot and a token; passing that token
+    back as ``?since=`` returns only rows changed or deleted since. ``reset``
+    is true whenever the client must replace its local copy.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        token = request.query_params.get("since")
+        since = None
+        if token:
+            try:
+                since = decode_token(token)
+            except InvalidToken:
+                raise ValidationError({"since": ["Invalid sync token."]})
+        return Response(build_changes(since))
+
+
+class SearchView(APIView):
+    """
+    Prefix autocomplete over campaigns, vaccines and medicines.
+
+    ``GET /api/search/?q=vacc kath`` matches every term as a word prefix,
+    best first; when nothing matches, misspelt terms are corrected against
+    the index vocabulary. ``kind`` restricts the catalogues searched and
+    ``limit`` caps the results (default 10, at most 50).
+    """
+
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        params = request.query_params
+        query = params.get("q", "").strip()
+        kinds = _parse_list_param(params, "kind", search.DOCUMENTS)
+        limit = _parse_limit_param(params, self.default_limit, self.max_limit)
+        results = search.search(query, kinds, limit) if len(query) >= 2 else []
+        return Response({"results": results})
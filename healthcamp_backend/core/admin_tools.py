@@ -0,0 +1,84 @@
+"""
+Admin building blocks for tables too large to count or scan.
+
+``LargeTableAdmin`` pages with ``EstimatedCountPaginator``, skips the
+unfiltered "N total" count, and matches the whole search term against indexed
+lookups. Search fields must name their lookup explicitly
+(``"username__startswith"``, ``"user__phone__exact"``); fields reached through
+a foreign key are matched in the related table first and joined back with
+``fk IN (subquery)``, so the large table is only touched through its foreign
+key indexes.
+"""
+
+from collections import defaultdict
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q, QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_rows(model, using):
+    """Row estimate from table statistics, or None if there is none."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been vacuumed or analyzed
+        return row[0] if row and row[0] >= 0 else None
+    # Elsewhere the highest primary key is an index lookup and close enough
+    return model._base_manager.using(using).aggregate(top=Max("pk"))["top"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an unbounded ``COUNT(*)``.
+
+    An unfiltered queryset is sized from the database's row estimate; a
+    filtered one is counted up to ``count_limit`` rows, so matches beyond that
+    are not reachable by page number (narrow the filter instead). Tables
+    below ``exact_threshold`` rows are counted exactly.
+    """
+
+    exact_threshold = 10000
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if not queryset.query.where:
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.exact_threshold:
+                return estimate
+            return super().count
+        return queryset.order_by()[: self.count_limit].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term or not self.search_fields:
+            return super().get_search_results(request, queryset, search_term)
+        conditions = defaultdict(Q)
+        for lookup in self.search_fields:
+            name, _, rest = lookup.partition("__")
+            field = self.model._meta.get_field(name)
+            if field.many_to_one and rest:
+                conditions[name] |= Q(**{rest: term})
+            else:
+                conditions[None] |= Q(**{lookup: term})
+        matches = conditions.pop(None, Q())
+        for name, condition in conditions.items():
+            related = self.model._meta.get_field(name).related_model
+            matches |= Q(**{f"{name}__in": related._default_manager.filter(condition).values("pk")})
+        return queryset.filter(matches), False
@@ -0,0 +1,379 @@
+"""
+Admission control for traffic spikes (a campaign announcement sends thousands
+of phones to the catalogue and registration endpoints at once).
+
+Two layers, both configured in ``settings.REST_FRAMEWORK``:
+
+Token buckets (``DEFAULT_THROTTLE_CLASSES``)
+    ``ClientRateThrottle`` gives every client (the user when authenticated,
+    else the IP address; set ``NUM_PROXIES`` behind a load balancer) a bucket
+    at the ``client`` rate in ``DEFAULT_THROTTLE_RATES``. ``RouteRateThrottle``
+    gives every route one bucket shared by all clients, at the rate
+    ``ADMISSION_CONTROL["ROUTE_RATES"]`` lists for its view name, else the
+    ``route`` rate. A rate of ``"300/min"`` holds 300 tokens and refills 5 a
+    second, so clients may burst up to the full bucket. An empty bucket
+    answers 429 with ``Retry-After`` set to when the next token is due.
+
+    Buckets live in process by default (``BUCKET_STORE: "local"``); naming a
+    cache alias shares them between workers. Like DRF's own throttles the
+    cache store reads and writes without a lock, so concurrent requests can
+    overdraw a bucket slightly.
+
+Concurrency limit (``AdmissionMiddleware``)
+    At most ``MAX_CONCURRENCY`` requests run at once per process, which keeps
+    the database pool from saturating. Further requests wait, at most
+    ``QUEUE_SIZE`` of them for at most ``QUEUE_TIMEOUT`` seconds, and are
+    then refused with 503 and ``Retry-After`` rather than queueing without
+    bound. Reads of ``SHED_ROUTES`` (the catalogue) do not wait: they are
+    admitted without a slot and answered only from the catalogue cache,
+    falling back to the last response cached for the URL (see
+    ``campaigns.cache``), or refused with 503 if there is none.
+    ``MAX_CONCURRENCY: 0`` turns the limit off.
+"""
+
+import asyncio
+import math
+from abc import ABC, abstractmethod
+import random
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    "BUCKET_STORE": "local",
+    "ROUTE_RATES": {},
+    "MAX_CONCURRENCY": 0,
+    "QUEUE_SIZE": 64,
+    "QUEUE_TIMEOUT": 2.0,
+    # Seconds; refused clients are told to come back after this to twice this,
+    # so they do not all retry at the same moment
+    "RETRY_AFTER": 2,
+    "SHED_ROUTES": (),
+    "EXEMPT_PATHS": (),
+}
+# Idle local buckets are pruned once there are more than this many
+LOCAL_BUCKET_LIMIT = 100_000
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def admission_settings():
+    return {**DEFAULTS, **getattr(settings, "REST_FRAMEWORK", {}).get("ADMISSION_CONTROL", {})}
+
+
+def parse_rate(rate):
+    """``"300/min"`` -> (capacity 300, refill 5.0 tokens a second); None for no limit."""
+    if not rate:
+        return None
+    count, period = rate.split("/")
+    return int(count), int(count) / PERIODS[period[0]]
+
+
+def unthrottled(rest_framework):
+    """A copy of a ``REST_FRAMEWORK`` setting with every admission limit off, for benchmarks."""
+    return {
+        **rest_framework,
+        "DEFAULT_THROTTLE_RATES": {},
+        "ADMISSION_CONTROL": {
+            **rest_framework.get("ADMISSION_CONTROL", {}),
+            "ROUTE_RATES": {},
+            "MAX_CONCURRENCY": 0,
+        },
+    }
+
+
+def retry_after():
+    base = admission_settings()["RETRY_AFTER"]
+    return random.randint(base, base * 2)
+
+
+class Overloaded(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The service is busy. Please retry shortly."
+    default_code = "overloaded"
+
+    def __init__(self, wait=None):
+        super().__init__()
+        # DRF's exception handler turns ``wait`` into Retry-After
+        self.wait = wait or retry_after()
+
+
+class LocalBucketStore:
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill):
+        """Take a token; return (allowed, seconds until one is available)."""
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self.buckets) > LOCAL_BUCKET_LIMIT:
+                self.prune(now)
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill)
+        return allowed, 0 if allowed else (1 - tokens) / refill
+
+    def prune(self, now):
+        # A bucket that has refilled completely is the same as no bucket
+        self.buckets = {key: value for key, value in self.buckets.items() if value[2] > now}
+
+
+class CacheBucketStore:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, capacity, refill):
+        now = time.time()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expire when the bucket would be full again
+        self.cache.set(key, (tokens, now), math.ceil((capacity - tokens) / refill) + 1)
+        return allowed, 0 if allowed else (1 - tokens) / refill
+
+
+_store = None
+_limiter = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        alias = admission_settings()["BUCKET_STORE"]
+        _store = LocalBucketStore() if alias == "local" else CacheBucketStore(alias)
+    return _store
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        config = admission_settings()
+        _limiter = ConcurrencyLimiter(config["MAX_CONCURRENCY"], config["QUEUE_SIZE"])
+    return _limiter
+
+
+def reset(*, setting, **kwargs):
+    global _store, _limiter
+    if setting == "REST_FRAMEWORK":
+        _store = _limiter = None
+
+
+setting_changed.connect(reset)
+
+
+class TokenBucketThrottle(BaseThrottle, ABC):
+    scope = None
+
+    def get_rate(self, request, view):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    @abstractmethod
+    def get_key(self, request, view):
+        """The bucket this request draws from, within ``scope``."""
+
+    def allow_request(self, request, view):
+        rate = parse_rate(self.get_rate(request, view))
+        if rate is None:
+            return True
+        allowed, self.delay = get_store().take(f"admission:{self.scope}:{self.get_key(request, view)}", *rate)
+        return allowed
+
+    def wait(self):
+        return self.delay
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    scope = "client"
+
+    def get_key(self, request, view):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class RouteRateThrottle(TokenBucketThrottle):
+    scope = "route"
+
+    def get_rate(self, request, view):
+        rates = admission_settings()["ROUTE_RATES"]
+        return rates.get(view_name(request), super().get_rate(request, view))
+
+    def get_key(self, request, view):
+        return view_name(request)
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else None
+
+
+class ConcurrencyLimiter:
+    """
+    Counts the requests running in this process. Threads wait on a
+    condition; coroutines wait on futures that ``release`` hands a slot to.
+    """
+
+    def __init__(self, limit, queue_size):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.condition = threading.Condition()
+        self.async_waiters = deque()
+
+    def try_acquire(self):
+        with self.condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            return False
+
+    def acquire(self, timeout):
+        with self.condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.enqueue()
+            try:
+                admitted = self.condition.wait_for(lambda: self.active < self.limit, timeout)
+                if admitted:
+                    self.active += 1
+                return admitted
+            finally:
+                self.waiting -= 1
+
+    async def aacquire(self, timeout):
+        with self.condition:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.enqueue()
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self.async_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[1]), timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            with self.condition:
+                queued = waiter in self.async_waiters
+                if queued:
+                    self.async_waiters.remove(waiter)
+                    self.waiting -= 1
+            if isinstance(error, asyncio.CancelledError):
+                # The client went away; a slot ``release`` already handed over
+                # would otherwise never be given back
+                if not queued:
+                    self.release()
+                raise
+            # ``release`` may have handed this waiter a slot just as it timed out
+            return not queued
+
+    def enqueue(self):
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def release(self):
+        with self.condition:
+            if self.async_waiters:
+                # Hand the slot straight to the oldest coroutine
+                loop, future = self.async_waiters.popleft()
+                self.waiting -= 1
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+            else:
+                self.active -= 1
+                self.condition.notify()
+
+
+class AdmissionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = admission_settings()
+        self.enabled = config["MAX_CONCURRENCY"] > 0
+        self.timeout = config["QUEUE_TIMEOUT"]
+        self.shed_routes = set(config["SHED_ROUTES"])
+        self.exempt_paths = tuple(config["EXEMPT_PATHS"])
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled or request.path_info.startswith(self.exempt_paths):
+            return self.get_response(request)
+        limiter = get_limiter()
+        if limiter.try_acquire():
+            return self.admitted(request, limiter)
+        if self.sheddable(request):
+            request.admission_shed = True
+            return self.get_response(request)
+        if limiter.acquire(self.timeout):
+            return self.admitted(request, limiter)
+        return self.refuse()
+
+    async def __acall__(self, request):
+        if not self.enabled or request.path_info.startswith(self.exempt_paths):
+            return await self.get_response(request)
+        limiter = get_limiter()
+        if limiter.try_acquire():
+            try:
+                return await self.get_response(request)
+            finally:
+                limiter.release()
+        if self.sheddable(request):
+            request.admission_shed = True
+            return await self.get_response(request)
+        if await limiter.aacquire(self.timeout):
+            try:
+                return await self.get_response(request)
+            finally:
+                limiter.release()
+        return self.refuse()
+
+    def admitted(self, request, limiter):
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release()
+
+    def sheddable(self, request):
+        if request.method not in ("GET", "HEAD") or not self.shed_routes:
+            return False
+        # Only reached when the process is saturated, so resolving twice is rare
+        try:
+            return resolve(request.path_info).view_name in self.shed_routes
+        except Resolver404:
+            return False
+
+    def refuse(self):
+        exc = Overloaded()
+        response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+        response["Retry-After"] = str(exc.wait)
+        # Refusals show in the instrumentation metrics; logging each one as a
+        # server error would flood the log during a spike
+        response._has_been_logged = True
+        return response
@@ -1,7 +1,41 @@
 """
 ASGI config for core project.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+It exposes the ASGI callable as a module-level variable named ``application``,
+warmed up before it serves (see ``core.warmup``) unless ``WARMUP`` is false.
+
+Running under uvicorn
+---------------------
+With ``ASYNC_READ_VIEWS=True`` the catalogue list/detail endpoints and
+``registrations/mine`` are served by native async views (``core.async_views``),
+so an idle or slow client costs a socket on the event loop rather than a
+thread. Everything else still runs through DRF in a thread::
+
+    pip install "uvicorn[standard]"
+    ASYNC_READ_VIEWS=True uvicorn core.asgi:application \\
+        --host 0.0.0.0 --port 8000 --workers 4 --timeout-keep-alive 75
+
+Raise the open-file limit (``ulimit -n``) to comfortably above the number of
+connections you expect to hold. ``manage.py benchmark_concurrency`` compares
+this mode with a threaded WSGI server (gunicorn gthread). Expect the async
+path to hold thousands of idle connections on a handful of threads, but to
+spend more CPU per request: Django still runs the session, auth, CSRF and
+message middleware hooks through ``sync_to_async``. Size workers for the
+request rate, not the connection count.
+
+Push events
+-----------
+With ``PUSH_EVENTS=True`` clients can hold open ``/api/events/``, a
+server-sent event stream of campaign and registration changes
+(``core.events``), instead of polling. Each stream is one coroutine parked on
+the event loop, served beside Django's handler so that it holds no thread.
+``manage.py benchmark_push`` holds thousands of idle subscribers on one
+worker and checks that events still reach all of them.
+Run more than one worker only with ``PUSH_BACKEND=redis``, and pass
+``--timeout-graceful-shutdown`` so restarts do not wait on open streams::
+
+    PUSH_EVENTS=True ASYNC_READ_VIEWS=True uvicorn core.asgi:application \\
+        --host 0.0.0.0 --port 8000 --timeout-graceful-shutdown 5
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,8 +43,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 application = get_asgi_application()
+
+if settings.PUSH_EVENTS:
+    from core.events import EventStreamApp
+
+    application = EventStreamApp(application)
+
+if settings.WARMUP:
+    from core.warmup import warmup
+
+    warmup()
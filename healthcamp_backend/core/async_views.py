@@ -0,0 +1,126 @@
+"""
+Building blocks for the native async read path.
+
+DRF views are synchronous, so under ASGI each DRF request holds a thread
+(``sync_to_async``) for its whole lifetime. The async views built on
+``AsyncAPIView`` are plain Django async views instead: the event loop holds
+the connection, and only the ORM calls themselves hop to a thread.
+
+They are mounted in place of the DRF read endpoints when
+``settings.ASYNC_READ_VIEWS`` is true (see ``core.asgi``), and reuse the DRF
+viewsets' querysets, filters, pagination and serializers, so both paths return
+the same payloads.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users.authentication import CachedJWTAuthentication
+from .admission import LocalBucketStore, get_store
+
+
+async def aauthenticate(request):
+    """
+    Return the user named by the request's JWT, or None when no token was
+    sent. Token validation needs no I/O; only the (usually cached) user
+    lookup leaves the event loop. The result is kept on the request.
+    """
+    if not hasattr(request, "_jwt_user"):
+        request._jwt_user = await _aauthenticate(request)
+    return request._jwt_user
+
+
+async def _aauthenticate(request):
+    authenticator = CachedJWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    validated_token = authenticator.get_validated_token(raw_token)
+    return await sync_to_async(authenticator.get_user)(validated_token)
+
+
+class AsyncAPIView(View):
+    """
+    Async view that picks one of the project's DRF renderers from the Accept
+    header (or ``?format=``) as DRF does, applies the default throttles and
+    turns DRF exceptions into the same error bodies DRF would send. The
+    browsable API needs a DRF view, so it is not offered here.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Until negotiation picks one; errors raised before that use it too
+        self.renderer = self.get_renderers()[0]
+        self.accepted_media_type = self.renderer.media_type
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            self.renderer, self.accepted_media_type = self.perform_content_negotiation(request)
+            await self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    def get_renderers(self):
+        return [
+            renderer()
+            for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+            if not issubclass(renderer, BrowsableAPIRenderer)
+        ]
+
+    def perform_content_negotiation(self, request):
+        """Return (renderer, accepted media type); raises NotAcceptable (406) when none fits."""
+        try:
+            return DefaultContentNegotiation().select_renderer(self.drf_request(request), self.get_renderers())
+        except Http404:
+            # An unknown ?format=, answered as DRF answers it
+            raise exceptions.NotFound()
+
+    async def check_throttles(self, request):
+        throttles = [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]
+        if not throttles:
+            return
+        drf_request = self.drf_request(request)
+        drf_request.user = await aauthenticate(request) or AnonymousUser()
+
+        def refused():
+            return [throttle.wait() for throttle in throttles if not throttle.allow_request(drf_request, self)]
+
+        # The in-process buckets only take a lock; a cache store does I/O
+        waits = refused() if isinstance(get_store(), LocalBucketStore) else await sync_to_async(refused)()
+        if waits:
+            raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+    def handle_exception(self, exc):
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = self.render(detail, exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response["WWW-Authenticate"] = JWTAuthentication().authenticate_header(None)
+        if getattr(exc, "wait", None):
+            response["Retry-After"] = "%d" % exc.wait
+        return response
+
+    def drf_request(self, request):
+        """Wrap the request for DRF helpers that read ``query_params``."""
+        return Request(request)
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        content = self.renderer.render(data, self.accepted_media_type, {"view": self})
+        content_type = self.renderer.media_type
+        if self.renderer.charset:
+            content_type = f"{content_type}; charset={self.renderer.charset}"
+        return HttpResponse(content, status=status_code, content_type=content_type)
@@ -0,0 +1,151 @@
+"""
+Shared harness for the ``benchmark_*`` management commands.
+
+``test_database()`` gives a command a throwaway database the way the test
+runner does, ``seed()`` fills it with ``generate_load_data``, and
+``write_report()`` emits the JSON report and fails the command when the
+report lists violations. The rest drives real servers over raw HTTP/1.1:
+free ports, the open-file limit, reading responses and sampling a server's
+memory and threads from ``/proc``.
+
+Exact checks that need no scale, such as the admin query counts, are also
+``TestCase``s that ``manage.py test`` runs.
+"""
+
+import json
+import math
+import os
+import resource
+import shutil
+import socket
+import tempfile
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+# Idle connections being set up at any one time
+IDLE_RAMP = 50
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+@contextmanager
+def test_database(on_disk=False):
+    """
+    Run the block against a freshly created test database, destroyed
+    afterwards. ``on_disk`` keeps a SQLite test database in a file, which
+    unlike the in-memory one takes writes from many threads.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    old_test_name = connection.settings_dict["TEST"]["NAME"]
+    scratch = None
+    if on_disk and connection.vendor == "sqlite":
+        scratch = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(scratch, "benchmark.sqlite3")
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Point replicas at the test database, as the test runner does
+            for alias in settings.DATABASE_REPLICAS:
+                connections[alias].close()
+                connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        teardown_test_environment()
+        if scratch:
+            connection.settings_dict["TEST"]["NAME"] = old_test_name
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def seed(**counts):
+    """Fill the database with ``generate_load_data`` (campaigns, services, users, registrations, seed)."""
+    call_command("generate_load_data", stdout=StringIO(), **counts)
+
+
+def write_report(command, report, output=None, failure="Benchmark regressions"):
+    """Write ``report`` as JSON to ``output`` or the command's stdout; fail on ``report["violations"]``."""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as fp:
+            fp.write(text + "\n")
+    else:
+        command.stdout.write(text)
+    if report.get("violations"):
+        raise CommandError(f"{failure}: " + "; ".join(report["violations"]))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def raise_file_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed + 256:
+        target = hard if hard == resource.RLIM_INFINITY else min(hard, max(needed + 256, soft))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as fp:
+            for child in fp.read().split():
+                pids.extend(process_tree(int(child)))
+    return pids
+
+
+def process_status(pid):
+    """Resident memory (KiB) and thread count of a Linux process and its children, if available."""
+    rss = threads = 0
+    try:
+        for member in process_tree(pid):
+            with open(f"/proc/{member}/status") as fp:
+                fields = dict(line.split(":", 1) for line in fp if ":" in line)
+            rss += int(fields["VmRSS"].split()[0])
+            threads += int(fields["Threads"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+    return rss, threads
+
+
+async def fetch(reader, writer, request):
+    """Send one HTTP/1.1 request on an open connection; return (status, keep_alive)."""
+    status, headers = await fetch_response(reader, writer, request)
+    return status, headers.get("connection") != "close"
+
+
+async def fetch_response(reader, writer, request):
+    """Send one HTTP/1.1 request on an open connection; return (status, lower-cased headers)."""
+    writer.write(request)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers
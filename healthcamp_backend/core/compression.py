@@ -0,0 +1,140 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` encodes responses with Brotli (when the ``brotli``
+package is installed) or gzip, whichever the request's ``Accept-Encoding``
+ranks higher; Brotli wins a tie. Bodies under ``COMPRESSION_MIN_SIZE`` bytes
+are sent as they are, since the saving there does not pay for the CPU.
+
+Only ``COMPRESSION_CONTENT_TYPES`` are compressed: the API's JSON,
+MessagePack, CSV and NDJSON, and the metrics text. HTML is deliberately left
+out, because admin pages put CSRF tokens next to reflected input (BREACH).
+Streaming responses such as exports are compressed chunk by chunk and flushed
+after each one, so rows still reach the client as they are produced.
+
+Settings:
+    COMPRESSION_MIN_SIZE        smallest body compressed, in bytes
+    COMPRESSION_GZIP_LEVEL      zlib level, 1-9
+    COMPRESSION_BROTLI_QUALITY  Brotli quality, 0-11; 4-5 suits dynamic content
+    COMPRESSION_CONTENT_TYPES   media types compressed
+"""
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CONTENT_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "text/csv",
+    "text/plain",
+)
+
+
+def accepted_coding(header):
+    """The coding to use for an ``Accept-Encoding`` header, or None."""
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    ranks = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranks[coding.strip().lower()] = quality
+    wildcard = ranks.get("*", 0.0)
+    best = max(available, key=lambda coding: ranks.get(coding, wildcard))
+    return best if ranks.get(best, wildcard) > 0 else None
+
+
+class Compressor:
+    def __init__(self, coding, gzip_level, brotli_quality):
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 31: zlib stream with a gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        """Compress and flush ``data`` so it can be sent on its own."""
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.coding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.gzip_level = getattr(settings, "COMPRESSION_GZIP_LEVEL", 6)
+        self.brotli_quality = getattr(settings, "COMPRESSION_BROTLI_QUALITY", 5)
+        self.content_types = set(getattr(settings, "COMPRESSION_CONTENT_TYPES", CONTENT_TYPES))
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").partition(";")[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = accepted_coding(request.headers.get("Accept-Encoding", ""))
+        if coding is None:
+            return response
+        compressor = Compressor(coding, self.gzip_level, self.brotli_quality)
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(compressor, response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(compressor, response.streaming_content)
+            del response["Content-Length"]
+        else:
+            compressed = compressor.compress(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The bytes differ from the uncompressed representation's
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        return response
+
+    @staticmethod
+    def compress_stream(compressor, chunks):
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def acompress_stream(compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
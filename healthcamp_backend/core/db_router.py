@@ -0,0 +1,127 @@
+"""
+Primary/replica database routing.
+
+Reads go to a replica only when a view opts in and the request is safe:
+``ReplicaReadMixin`` on ``RegistrationViewSet``, ``VersionedCacheMixin`` on
+the catalogue viewsets (once replicas have caught up with the last catalogue
+write, see ``campaigns.cache``) and the async read views. Everything else
+stays on the primary: authentication, admin, management commands and all
+writes.
+
+Read-your-writes:
+
+* The first write in a request pins the rest of that request to the primary,
+  so a response built after a write (e.g. the registration-create body) sees
+  the row it just wrote.
+* ``ReplicaPinningMiddleware`` then sets a short-lived cookie, and requests
+  carrying it read from the primary too, covering replication lag for the
+  client's next few requests (``REPLICA_PIN_SECONDS``).
+
+Without ``DATABASE_REPLICAS`` the router sends everything to ``default``.
+"""
+
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = "db_pin"
+
+_state = contextvars.ContextVar("db_routing_state", default=None)
+
+
+class RoutingState:
+    __slots__ = ("replica_reads", "pinned", "wrote", "replica")
+
+    def __init__(self, pinned=False):
+        self.replica_reads = False
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+def allow_replica_reads():
+    """Let the current request read from a replica, unless it is pinned."""
+    state = _state.get()
+    if state is not None:
+        state.replica_reads = True
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if state is None or not replicas or not state.replica_reads or state.pinned:
+            return "default"
+        if state.replica is None:
+            # One replica per request, so its reads see a single snapshot
+            state.replica = random.choice(replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db == "default"
+
+
+class ReplicaReadMixin:
+    """Serve this viewset's safe requests from a replica (see ``core.db_router``)."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            allow_replica_reads()
+
+
+class ReplicaPinningMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    def finish(self, state, response):
+        if state.wrote and getattr(settings, "DATABASE_REPLICAS", []):
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
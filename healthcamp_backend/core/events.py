@@ -0,0 +1,304 @@
+"""
+Push channel for catalogue and registration changes (server-sent events).
+
+``GET /api/events/`` (``EventStreamView``) is a ``text/event-stream`` that
+stays open and carries compact change events, so the campaign and
+registration screens can update in place instead of polling whole lists:
+
+    event: campaign.updated
+    data: {"id": 12}
+
+Every client receives ``campaign.created``, ``campaign.updated`` and
+``campaign.deleted`` (a cancelled campaign is deleted; see the tombstones of
+``campaigns.sync``). An authenticated client also receives
+``registration.created`` and ``registration.deleted`` for its own
+registrations. Events carry ids only; clients fetch what changed (delta sync,
+detail endpoints). A client that falls ``PUSH_QUEUE_SIZE`` events behind gets
+a single ``resync`` event and is disconnected; it should refetch and
+reconnect. A comment line every ``PUSH_HEARTBEAT`` seconds keeps proxies from
+closing idle streams.
+
+Events are published by model signals (``campaigns.signals``,
+``registrations.signals``) once the transaction commits, through a broker.
+``campaign.updated`` also follows changes to what a campaign embeds: a
+vaccine or medicine edited or deleted, or links added or removed from either
+side. Bulk writes that bypass signals (``manage.py import_catalogue``, the
+admin import, ``generate_load_data``) publish nothing; clients catch up on
+their next delta sync, so run one after an import.
+
+``PUSH_BACKEND = "local"``
+    In-process pub/sub. Only subscribers connected to the worker that made
+    the change hear about it, so this suits a single worker.
+``PUSH_BACKEND = "redis"``
+    Publishes to a Redis channel (``PUSH_LOCATION``) that every worker
+    listens on, then fans out in process as above. Needs the ``redis``
+    package.
+
+The endpoint is served by ``core.asgi`` when ``PUSH_EVENTS`` is true, and
+only there: each stream is a coroutine parked on the event loop. It is not
+in the URLconf. ``EventStreamApp`` answers it beside Django's handler rather
+than through it, because Django runs a request's sync middleware on a thread
+reserved for that request until it ends, which is a thread per open stream.
+The view still authenticates and applies the throttles (its route is named
+``events``), but no middleware runs, CORS included; the stream is for the
+native app. At most ``PUSH_MAX_SUBSCRIBERS`` streams are open per process;
+further clients get 503 with ``Retry-After``.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, RequestAborted
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.http import StreamingHttpResponse
+from django.urls import ResolverMatch
+
+from .admission import Overloaded
+from .async_views import AsyncAPIView, aauthenticate
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger("healthcamp.events")
+
+PATH = "/api/events/"
+CAMPAIGNS = "campaigns"
+CHANNEL = "healthcamp:events"
+# Tells a client that missed events to refetch; it is disconnected after it
+RESYNC = b"event: resync\ndata: {}\n\n"
+HEARTBEAT = b": ping\n\n"
+
+
+def user_topic(user_id):
+    return f"user:{user_id}"
+
+
+def encode(event, data):
+    """One SSE frame, encoded once however many subscribers receive it."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def publish(topic, event, data):
+    """Send ``event`` to ``topic``'s subscribers once the current transaction commits."""
+    frame = encode(event, data)
+    transaction.on_commit(lambda: get_broker().publish(topic, frame))
+
+
+class Subscription:
+    """One stream's queue. Owned by its event loop; only touched from there."""
+
+    def __init__(self, topics, loop, queue_size):
+        self.topics = topics
+        self.loop = loop
+        self.queue_size = queue_size
+        self.frames = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+
+    def deliver(self, frame):
+        if self.overflowed:
+            return
+        if len(self.frames) >= self.queue_size:
+            self.frames.clear()
+            self.frames.append(RESYNC)
+            self.overflowed = True
+        else:
+            self.frames.append(frame)
+        self.ready.set()
+
+    async def next(self, timeout):
+        """The next frame, or None when ``timeout`` passes without one."""
+        if not self.frames:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.frames.popleft()
+
+
+def fan_out(subscriptions, frame):
+    for subscription in subscriptions:
+        subscription.deliver(frame)
+
+
+class LocalBroker:
+    def __init__(self):
+        self.topics = defaultdict(set)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self, topics, queue_size):
+        subscription = Subscription(topics, asyncio.get_running_loop(), queue_size)
+        with self.lock:
+            self.count += 1
+            for topic in topics:
+                self.topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.count -= 1
+            for topic in subscription.topics:
+                subscribers = self.topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.topics[topic]
+
+    def publish(self, topic, frame):
+        self.deliver(topic, frame)
+
+    def deliver(self, topic, frame):
+        """Hand ``frame`` to every local subscriber of ``topic``; safe from any thread."""
+        with self.lock:
+            subscribers = list(self.topics.get(topic, ()))
+        # Publishers run in threads; one callback per event loop, not per subscriber
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(fan_out, batch, frame)
+            except RuntimeError:
+                # The loop has closed; its streams are gone with it
+                pass
+
+
+class RedisBroker(LocalBroker):
+    """Publishes through a Redis channel; a listener thread fans messages out locally."""
+
+    def __init__(self, location):
+        super().__init__()
+        if redis is None:
+            raise ImproperlyConfigured('PUSH_BACKEND "redis" needs the redis package.')
+        self.client = redis.Redis.from_url(location)
+        self.listener = None
+
+    def subscribe(self, topics, queue_size):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name="push-events", daemon=True)
+                self.listener.start()
+        return super().subscribe(topics, queue_size)
+
+    def publish(self, topic, frame):
+        try:
+            self.client.publish(CHANNEL, json.dumps({"topic": topic, "frame": frame.decode()}))
+        except redis.RedisError:
+            # Clients catch up on their next refetch; never fail the write for this
+            logger.warning("Could not publish %s event", topic, exc_info=True)
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    self.deliver(payload["topic"], payload["frame"].encode())
+            except redis.RedisError:
+                logger.warning("Lost the push event channel; reconnecting", exc_info=True)
+                threading.Event().wait(1)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        backend = getattr(settings, "PUSH_BACKEND", "local")
+        if backend == "local":
+            _broker = LocalBroker()
+        elif backend == "redis":
+            _broker = RedisBroker(getattr(settings, "PUSH_LOCATION", "") or "redis://127.0.0.1:6379/0")
+        else:
+            raise ImproperlyConfigured(f"Unknown PUSH_BACKEND: {backend!r}")
+    return _broker
+
+
+def reset(*, setting, **kwargs):
+    global _broker
+    if setting in ("PUSH_BACKEND", "PUSH_LOCATION"):
+        _broker = None
+
+
+setting_changed.connect(reset)
+
+
+class EventStreamView(AsyncAPIView):
+    http_method_names = ["get", "options"]
+
+    def perform_content_negotiation(self, request):
+        # EventSource sends Accept: text/event-stream; errors are sent as JSON
+        return self.renderer, self.accepted_media_type
+
+    async def get(self, request):
+        user = await aauthenticate(request)
+        topics = [CAMPAIGNS] if user is None else [CAMPAIGNS, user_topic(user.pk)]
+        broker = get_broker()
+        if broker.count >= getattr(settings, "PUSH_MAX_SUBSCRIBERS", 10000):
+            raise Overloaded()
+        response = StreamingHttpResponse(self.stream(broker, topics), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, broker, topics):
+        # Subscribed only once the stream is being sent, so the finally below
+        # always runs for it
+        subscription = broker.subscribe(topics, getattr(settings, "PUSH_QUEUE_SIZE", 100))
+        heartbeat = getattr(settings, "PUSH_HEARTBEAT", 15)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                frame = await subscription.next(heartbeat)
+                yield HEARTBEAT if frame is None else frame
+                if frame is RESYNC:
+                    break
+        finally:
+            # Also reached when the client disconnects and Django cancels the stream
+            broker.unsubscribe(subscription)
+
+
+class EventStreamApp:
+    """ASGI application serving ``PATH`` with ``EventStreamView`` and everything else with Django."""
+
+    def __init__(self, application):
+        # Django's ASGIHandler, whose request and response plumbing is reused
+        self.application = application
+        self.view = EventStreamView.as_view()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].removeprefix(scope.get("root_path", "")) != PATH:
+            return await self.application(scope, receive, send)
+        try:
+            body_file = await self.application.read_body(receive)
+        except RequestAborted:
+            return
+        request, response = self.application.create_request(scope, body_file)
+        if request is not None:
+            request.resolver_match = ResolverMatch(self.view, (), {}, url_name="events", route=PATH[1:])
+            response = await self.view(request)
+            # The user lookup ran on asgiref's shared thread, outside any request
+            await sync_to_async(close_old_connections)()
+        # Until the client disconnects, which closes the stream and its subscription
+        tasks = [
+            asyncio.create_task(self.application.listen_for_disconnect(receive)),
+            asyncio.create_task(self.application.send_response(response, send)),
+        ]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        body_file.close()
@@ -0,0 +1,327 @@
+"""
+Per-endpoint query count and latency instrumentation.
+
+``InstrumentationMiddleware`` installs a ``connection.execute_wrapper`` on
+every database connection (as each one connects) and records, per route, the
+query count, DB time, serializer time, total time and response size into
+in-memory histograms. Serializer time is the time views spend building
+``serializer.data``, less SQL: they wrap it in ``serializer_timer()``, or get
+``list``/``retrieve``/``create`` from ``TimedSerializationMixin``. Each
+response carries a ``Server-Timing`` header, and ``MetricsView`` (``/api/_metrics/``, admin only) exposes the
+histograms in the Prometheus text format.
+
+The middleware is sync and async capable. Per-request state lives in a
+context variable, which asgiref carries into the threads that run async ORM
+calls, so queries issued from async views are counted as well.
+
+Histograms are per process; scrape every worker (or sum them) when running
+more than one.
+
+Settings:
+    METRICS_ENABLED           turn the middleware into a no-op when False
+    METRICS_SERVER_TIMING     add the Server-Timing header (default True)
+    METRICS_SLOW_QUERY_MS     log queries slower than this, with the project
+                              frames that issued them (None disables)
+"""
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger("healthcamp.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = contextvars.ContextVar("instrumentation_state", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield "+Inf", self.count
+
+
+class RouteStats:
+    def __init__(self):
+        self.statuses = {}
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.db_duration = Histogram(LATENCY_BUCKETS)
+        self.serializer_duration = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = {}
+
+    def record(self, route, method, status, state, duration, size):
+        with self._lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[(route, method)] = RouteStats()
+            status_class = f"{status // 100}xx"
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+            stats.duration.observe(duration)
+            stats.db_duration.observe(state.db_time)
+            stats.serializer_duration.observe(state.serializer_time)
+            stats.queries.observe(state.queries)
+            if size is not None:
+                stats.response_size.observe(size)
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+
+    def render(self):
+        """Render every histogram in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                "# HELP healthcamp_http_requests_total Requests handled, by route, method and status class.",
+                "# TYPE healthcamp_http_requests_total counter",
+            ]
+            for (route, method), stats in routes:
+                for status_class, count in sorted(stats.statuses.items()):
+                    labels = _labels(route=route, method=method, status=status_class)
+                    lines.append(f"healthcamp_http_requests_total{{{labels}}} {count}")
+
+            histograms = (
+                ("healthcamp_request_duration_seconds", "Total time spent handling the request.", "duration"),
+                ("healthcamp_db_duration_seconds", "Time spent executing SQL per request.", "db_duration"),
+                ("healthcamp_serializer_duration_seconds", "Time spent building serializer data per request, excluding SQL.", "serializer_duration"),
+                ("healthcamp_db_queries", "SQL queries executed per request.", "queries"),
+                ("healthcamp_response_size_bytes", "Response body size.", "response_size"),
+            )
+            for name, help_text, attr in histograms:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (route, method), stats in routes:
+                    hist = getattr(stats, attr)
+                    base = _labels(route=route, method=method)
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{{{base},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{base}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{base}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+registry = Registry()
+
+
+class RequestState:
+    __slots__ = ("queries", "db_time", "serializer_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+
+
+def _project_frames():
+    base = str(settings.BASE_DIR)
+    frames = [
+        f"{frame.filename[len(base) + 1:]}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(base)
+        and "/site-packages/" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return frames[-5:]
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    state = _current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        state.queries += 1
+        state.db_time += elapsed
+        slow_ms = getattr(settings, "METRICS_SLOW_QUERY_MS", None)
+        if slow_ms is not None and elapsed * 1000 >= slow_ms:
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s\n  %s",
+                elapsed * 1000,
+                context["connection"].alias,
+                sql,
+                "\n  ".join(_project_frames()),
+            )
+
+
+def install_query_wrapper(connection, **kwargs):
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+def instrument_connections():
+    """
+    Wrap every connection, including the per-thread ones created later (for
+    example in the executor threads behind the async ORM). The wrapper is a
+    no-op outside an instrumented request.
+    """
+    connection_created.connect(install_query_wrapper, dispatch_uid="healthcamp.instrumentation")
+    for conn in connections.all():
+        install_query_wrapper(conn)
+
+
+@contextmanager
+def serializer_timer():
+    """Count the block's time, less the SQL it runs, as the request's serializer time."""
+    state = _current.get()
+    if state is None:
+        yield
+        return
+    db_before = state.db_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Lazy querysets evaluate during serialization; count that as DB time
+        state.serializer_time += (time.perf_counter() - start) - (state.db_time - db_before)
+
+
+class TimedSerializationMixin:
+    """
+    ``list``, ``retrieve`` and ``create`` as DRF's model mixins implement
+    them, with building ``serializer.data`` timed by ``serializer_timer()``.
+    Views that serialize in their own handlers wrap those calls themselves.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(queryset if page is None else page, many=True)
+        with serializer_timer():
+            data = serializer.data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with serializer_timer():
+            data = serializer.data
+        return Response(data)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        with serializer_timer():
+            data = serializer.data
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        if self.enabled:
+            instrument_connections()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        state = RequestState()
+        token = _current.set(state)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, state, start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        state = RequestState()
+        token = _current.set(state)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, state, start)
+
+    def finish(self, request, response, state, start):
+        duration = time.perf_counter() - start
+
+        size = None if response.streaming else len(response.content)
+        registry.record(route_name(request), request.method, response.status_code, state, duration, size)
+
+        if getattr(settings, "METRICS_SERVER_TIMING", True):
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={state.db_time * 1000:.2f};desc="{state.queries} queries"',
+                    f"ser;dur={state.serializer_time * 1000:.2f}",
+                    f"total;dur={duration * 1000:.2f}",
+                ]
+            )
+        return response
+
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint for the instrumentation histograms."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
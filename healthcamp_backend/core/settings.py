@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import importlib.util
 from datetime import timedelta
 
 from dotenv import load_dotenv
@@ -53,9 +54,17 @@ INSTALLED_APPS = [
     "campaigns",
     "registrations",
     "users",
+    "facilities",
+    "jobs",
+    "notifications",
 ]
 
 MIDDLEWARE = [
+    "core.instrumentation.InstrumentationMiddleware",
+    # Inside instrumentation, so recorded response sizes are bytes on the wire
+    "core.compression.CompressionMiddleware",
+    "core.admission.AdmissionMiddleware",
+    "core.db_router.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -97,13 +106,60 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "127.0.0.1")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Persistent connections, re-validated (CONN_HEALTH_CHECKS) before reuse in a
+# new request. DB_POOL switches Postgres to Django's native connection pool
+# instead, which needs psycopg 3 with the "pool" extra. Each setting can be
+# overridden for replicas with the REPLICA_ prefix (REPLICA_CONN_MAX_AGE, ...).
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+
+
+def _connection_settings(prefix, pool_supported):
+    def env(name, default):
+        return os.getenv(f"{prefix}_{name}", str(default))
+
+    pool = pool_supported and env("POOL", DB_POOL).lower() == "true"
+    options = {}
+    if pool:
+        options["pool"] = {
+            "min_size": int(env("POOL_MIN_SIZE", DB_POOL_MIN_SIZE)),
+            "max_size": int(env("POOL_MAX_SIZE", DB_POOL_MAX_SIZE)),
+        }
+    return {
+        # The pool keeps connections itself; Django rejects CONN_MAX_AGE with it
+        "CONN_MAX_AGE": 0 if pool else int(env("CONN_MAX_AGE", DB_CONN_MAX_AGE)),
+        "CONN_HEALTH_CHECKS": env("CONN_HEALTH_CHECKS", DB_CONN_HEALTH_CHECKS).lower() == "true",
+        "OPTIONS": options,
+    }
+
+
+# Read replicas (see core.db_router): REPLICA_HOSTS for Postgres, sharing the
+# primary's database and credentials unless REPLICA_DB/USER/PASSWORD/PORT are
+# set; REPLICA_SQLITE_FILES (paths relative to BASE_DIR) to stand in for
+# replicas locally, refreshed with ``manage.py sync_sqlite_replicas``.
+REPLICA_HOSTS = [h.strip() for h in os.getenv("REPLICA_HOSTS", "").split(",") if h.strip()]
+REPLICA_SQLITE_FILES = [f.strip() for f in os.getenv("REPLICA_SQLITE_FILES", "").split(",") if f.strip()]
+# Seconds a client keeps reading from the primary after a request that wrote
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
 if USE_SQLITE:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            **_connection_settings("DB", pool_supported=False),
         }
     }
+    for _i, _path in enumerate(REPLICA_SQLITE_FILES, 1):
+        DATABASES[f"replica_{_i}"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / _path,
+            "TEST": {"MIRROR": "default"},
+            **_connection_settings("REPLICA", pool_supported=False),
+        }
 else:
     DATABASES = {
         "default": {
@@ -113,8 +169,67 @@ else:
             "PASSWORD": POSTGRES_PASSWORD,
             "HOST": POSTGRES_HOST,
             "PORT": POSTGRES_PORT,
+            **_connection_settings("DB", pool_supported=True),
+        }
+    }
+    for _i, _host in enumerate(REPLICA_HOSTS, 1):
+        DATABASES[f"replica_{_i}"] = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("REPLICA_DB", POSTGRES_DB),
+            "USER": os.getenv("REPLICA_USER", POSTGRES_USER),
+            "PASSWORD": os.getenv("REPLICA_PASSWORD", POSTGRES_PASSWORD),
+            "HOST": _host,
+            "PORT": os.getenv("REPLICA_PORT", POSTGRES_PORT),
+            "TEST": {"MIRROR": "default"},
+            **_connection_settings("REPLICA", pool_supported=True),
+        }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+
+
+# Cache
+# Local memory by default; "file" or "redis" (any Redis-compatible server), or
+# a dotted backend path. Multi-worker deployments need a shared backend for the
+# catalogue version counters to be seen by every worker.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_LOCATION or "redis://127.0.0.1:6379/1",
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_LOCATION or str(BASE_DIR / ".cache"),
         }
     }
+elif "." in CACHE_BACKEND:
+    CACHES = {"default": {"BACKEND": os.getenv("CACHE_BACKEND"), "LOCATION": CACHE_LOCATION}}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": CACHE_LOCATION or "healthcamp",
+        }
+    }
+
+# Cell size (degrees) of the in-process grid behind /api/facilities/nearby/
+FACILITY_GRID_CELL_DEGREES = float(os.getenv("FACILITY_GRID_CELL_DEGREES", "0.1"))
+
+# Versioned response cache for the read-only catalogue endpoints (campaigns.cache)
+CATALOGUE_CACHE_ALIAS = "default"
+CATALOGUE_CACHE_TIMEOUT = int(os.getenv("CATALOGUE_CACHE_TIMEOUT", "3600"))
+
+# Delta sync (campaigns.sync): tokens older than the tombstone retention get a
+# full snapshot; the overlap covers transactions still open when a token was cut.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+SYNC_OVERLAP_SECONDS = int(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
 
 
 # Password validation
@@ -152,21 +267,86 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# API encoding (core.renderers): JSON via orjson or the standard library, and
+# MessagePack for clients sending Accept: application/msgpack
+API_JSON_RENDERER = os.getenv("API_JSON_RENDERER", "orjson").lower()
+API_MSGPACK = os.getenv("API_MSGPACK", "True").lower() == "true"
+_renderers = [
+    "rest_framework.renderers.JSONRenderer" if API_JSON_RENDERER == "stdlib" else "core.renderers.FastJSONRenderer",
+    "rest_framework.renderers.BrowsableAPIRenderer",
+]
+if API_MSGPACK and importlib.util.find_spec("msgpack"):
+    _renderers.append("core.renderers.MessagePackRenderer")
+
+# Response compression (core.compression); br needs the brotli package
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Admission control (core.admission): token buckets per client and per route
+# answer 429; past ADMISSION_MAX_CONCURRENCY requests per process, requests
+# queue briefly and are then refused with 503, and catalogue reads are served
+# from stale cached copies. Rates look like "300/min"; empty means no limit.
+ADMISSION_CLIENT_RATE = os.getenv("ADMISSION_CLIENT_RATE", "300/min")
+ADMISSION_ROUTE_RATE = os.getenv("ADMISSION_ROUTE_RATE", "")
+ADMISSION_REGISTRATION_RATE = os.getenv("ADMISSION_REGISTRATION_RATE", "100/s")
+ADMISSION_LOGIN_RATE = os.getenv("ADMISSION_LOGIN_RATE", "50/s")
+
 # DRF & JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
+    "DEFAULT_RENDERER_CLASSES": _renderers,
+    "DEFAULT_THROTTLE_CLASSES": (
+        "core.admission.ClientRateThrottle",
+        "core.admission.RouteRateThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        "client": ADMISSION_CLIENT_RATE or None,
+        "route": ADMISSION_ROUTE_RATE or None,
+    },
+    # Proxies in front of the app, so clients are told apart by X-Forwarded-For
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES")) if os.getenv("NUM_PROXIES") else None,
+    "ADMISSION_CONTROL": {
+        # "local" (per process) or a cache alias shared by every worker
+        "BUCKET_STORE": os.getenv("ADMISSION_BUCKET_STORE", "local"),
+        "ROUTE_RATES": {
+            "registration-list": ADMISSION_REGISTRATION_RATE or None,
+            "token_obtain_pair": ADMISSION_LOGIN_RATE or None,
+        },
+        # Keep below the database pool size; 0 disables the limit
+        "MAX_CONCURRENCY": int(os.getenv("ADMISSION_MAX_CONCURRENCY", "16")),
+        "QUEUE_SIZE": int(os.getenv("ADMISSION_QUEUE_SIZE", "64")),
+        "QUEUE_TIMEOUT": float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0")),
+        "RETRY_AFTER": int(os.getenv("ADMISSION_RETRY_AFTER", "2")),
+        "SHED_ROUTES": (
+            "healthCampaigns-list",
+            "healthCampaigns-detail",
+            "vaccine-list",
+            "vaccine-detail",
+            "medicine-list",
+            "medicine-detail",
+        ),
+        "EXEMPT_PATHS": ("/api/_metrics/",),
+    },
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_OBTAIN_SERIALIZER": "users.authentication.ProfileTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.authentication.ProfileTokenRefreshSerializer",
 }
 
+# Seconds an authenticated user's row is cached (users.authentication)
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+# Embed profile fields in access tokens so /users/me needs no lookup at all
+JWT_PROFILE_CLAIMS = os.getenv("JWT_PROFILE_CLAIMS", "False").lower() == "true"
+
 # CORS
 _cors = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
 CORS_ALLOWED_ORIGINS = [o.strip() for o in _cors if o.strip()]
@@ -178,12 +358,48 @@ if DEBUG and not CORS_ALLOWED_ORIGINS:
 # Custom user
 AUTH_USER_MODEL = "users.User"
 
+# Per-endpoint query/latency instrumentation (core.instrumentation)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "True").lower() == "true"
+_slow_query_ms = os.getenv("METRICS_SLOW_QUERY_MS", "")
+METRICS_SLOW_QUERY_MS = float(_slow_query_ms) if _slow_query_ms else None
+
+# Serve the catalogue and registrations/mine reads from native async views
+# (core.async_views). Only worth enabling when running core.asgi under uvicorn.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False").lower() == "true"
+
+# Server-sent change events at /api/events/ (core.events), served by
+# core.asgi only. PUSH_BACKEND "redis" shares events between workers through
+# PUSH_LOCATION.
+PUSH_EVENTS = os.getenv("PUSH_EVENTS", "False").lower() == "true"
+PUSH_BACKEND = os.getenv("PUSH_BACKEND", "local").lower()
+PUSH_LOCATION = os.getenv("PUSH_LOCATION", "")
+PUSH_HEARTBEAT = float(os.getenv("PUSH_HEARTBEAT", "15"))
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "100"))
+PUSH_MAX_SUBSCRIBERS = int(os.getenv("PUSH_MAX_SUBSCRIBERS", "10000"))
+
+# Build URL patterns, serializers and connections before a worker serves
+# (core.warmup, called from core.wsgi and core.asgi)
+WARMUP = os.getenv("WARMUP", "True").lower() == "true"
+
+# Background jobs (jobs.queue; run workers with ``manage.py run_jobs``)
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))
+JOBS_LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", "300"))
+JOBS_RETRY_DELAY = int(os.getenv("JOBS_RETRY_DELAY", "30"))
+JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS", "7"))
+# Day-before campaign reminders (registrations.tasks): local time they go
+# out, and registrations notified per job
+REMINDER_TIME = os.getenv("REMINDER_TIME", "09:00")
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "2000"))
+
 # Default patient (for kiosk/demo flows without auth from app)
 DEFAULT_PATIENT_USERNAME = os.getenv("DEFAULT_PATIENT_USERNAME", "patient_demo")
 DEFAULT_PATIENT_PASSWORD = os.getenv("DEFAULT_PATIENT_PASSWORD", "changeme123")
 DEFAULT_PATIENT_FULL_NAME = os.getenv("DEFAULT_PATIENT_FULL_NAME", "Demo Patient")
 DEFAULT_PATIENT_EMAIL = os.getenv("DEFAULT_PATIENT_EMAIL", "patient@example.com")
 DEFAULT_PATIENT_PHONE = os.getenv("DEFAULT_PATIENT_PHONE", "+977-9800000000")
+# Seconds a process keeps the resolved default patient before re-reading it
+DEFAULT_PATIENT_CACHE_TTL = int(os.getenv("DEFAULT_PATIENT_CACHE_TTL", "300"))
 
 # Toggle: if true, unauthenticated registration requests will be attached to the default patient
 USE_DEFAULT_PATIENT_FOR_UNAUTH = os.getenv("USE_DEFAULT_PATIENT_FOR_UNAUTH", "True").lower() == "true"
@@ -0,0 +1,144 @@
+"""
+Cold-start probe for ``manage.py startup_profile``.
+
+Run in a fresh interpreter (``python -m core.startup``), it starts a worker
+the way ``core.wsgi`` does and prints, as JSON, how long each phase took:
+importing Django, loading settings (``load_dotenv`` separately), importing
+and readying each app, building the WSGI handler, warm-up (unless
+``--no-warmup``), then serving the first requests. Only the standard library
+is imported before the clock starts, so nothing here is paid for in advance.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+STARTED = time.perf_counter()
+
+
+def elapsed_ms(since):
+    return round((time.perf_counter() - since) * 1000, 2)
+
+
+def timed(func, record):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(elapsed_ms(start))
+
+    return wrapper
+
+
+def instrument_apps(per_app):
+    """Time each app's import, ``import_models()`` and ``ready()`` as ``django.setup()`` runs them."""
+    from django.apps import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def create_timed(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        timings = per_app[app_config.label]
+        timings["import_ms"] = elapsed_ms(start)
+        app_config.import_models = timed(app_config.import_models, lambda ms: timings.__setitem__("models_ms", ms))
+        app_config.ready = timed(app_config.ready, lambda ms: timings.__setitem__("ready_ms", ms))
+        return app_config
+
+    AppConfig.create = classmethod(create_timed)
+
+
+def request(application, path, host):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "HTTP_ACCEPT": "application/json",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    status = []
+    start = time.perf_counter()
+    body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return int(status[0].split()[0]), elapsed_ms(start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="/api/healthCampaigns/")
+    parser.add_argument("--requests", type=int, default=2)
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    phases = {}
+    per_app = defaultdict(dict)
+
+    start = time.perf_counter()
+    import django
+    import dotenv
+    from django.conf import settings
+
+    phases["django_import_ms"] = elapsed_ms(start)
+
+    dotenv.load_dotenv = timed(dotenv.load_dotenv, lambda ms: phases.__setitem__("dotenv_ms", ms))
+    start = time.perf_counter()
+    settings.INSTALLED_APPS
+    phases["settings_ms"] = elapsed_ms(start)
+
+    instrument_apps(per_app)
+    start = time.perf_counter()
+    django.setup(set_prefix=False)
+    phases["apps_ms"] = elapsed_ms(start)
+
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    phases["handler_ms"] = elapsed_ms(start)
+
+    warmup = None
+    if not args.no_warmup:
+        from core.warmup import warmup as run_warmup
+
+        start = time.perf_counter()
+        warmup = run_warmup()
+        phases["warmup_ms"] = elapsed_ms(start)
+    phases["ready_to_serve_ms"] = elapsed_ms(STARTED)
+
+    host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host and not host.startswith(".")), "127.0.0.1")
+    requests = []
+    for _ in range(args.requests):
+        status, ms = request(application, args.path, host)
+        requests.append({"status": status, "ms": ms})
+        if len(requests) == 1:
+            phases["first_response_ms"] = elapsed_ms(STARTED)
+
+    json.dump(
+        {"phases": phases, "apps": per_app, "warmup": warmup, "requests": requests},
+        sys.stdout,
+    )
+
+
+if __name__ == "__main__":
+    main()
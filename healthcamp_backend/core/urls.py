@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.instrumentation import MetricsView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -26,8 +27,12 @@ urlpatterns = [
     # JWT
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    # Instrumentation (admin only, Prometheus text format)
+    path("api/_metrics/", MetricsView.as_view(), name="metrics"),
     # App APIs
     path("api/", include("campaigns.urls")),
     path("api/", include("registrations.urls")),
     path("api/", include("users.urls")),
+    path("api/", include("facilities.urls")),
+    path("api/", include("notifications.urls")),
 ]
@@ -0,0 +1,144 @@
+"""
+Worker warm-up: do the work of a worker's first request before it takes
+traffic.
+
+A fresh worker otherwise pays, on the first requests it serves, for
+populating and compiling the URL resolver, importing the classes named in
+DRF's settings, building the model relation tree that ``ModelSerializer``
+walks, building the serializers' field trees (``CampaignSerializer`` nests
+``VaccineSerializer`` and ``MedicineSerializer``), loading the database
+driver and opening the first connection, and creating the cache clients.
+``core.wsgi`` and ``core.asgi`` call ``warmup()`` once the application is
+loaded, when ``WARMUP`` is true. Settings (``load_dotenv`` included) are
+already loaded by then.
+
+Database connections, and pools with ``DB_POOL``, are closed again
+afterwards. Django keeps connections per thread, and request threads are
+not the importing thread, so a connection left open would sit unused.
+Closing also keeps warm-up safe before a fork (``gunicorn --preload``). With
+``--preload`` the whole warm-up runs once in the master and is shared by
+every worker.
+
+A failing step is logged and skipped: warm-up must never stop a worker from
+starting. ``manage.py startup_profile`` measures what it saves.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger("healthcamp.warmup")
+
+
+def warmup():
+    """Run every warm-up step; return {step: milliseconds}."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run_steps()
+    # ASGI servers may import the application inside their event loop, where
+    # the ORM refuses to run
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(run_steps).result()
+
+
+def run_steps():
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info("Warm-up done in %.0fms: %s", sum(timings.values()), timings)
+    return timings
+
+
+def walk_urls(patterns):
+    for pattern in patterns:
+        # Route regexes are compiled on first match otherwise
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            yield from walk_urls(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    list(walk_urls(resolver.url_patterns))
+
+
+def warm_drf():
+    # Each of these imports its classes on first access
+    for name in api_settings.import_strings:
+        getattr(api_settings, name)
+
+
+def warm_models():
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+
+def serializer_classes():
+    seen = set()
+    for pattern in walk_urls(get_resolver().url_patterns):
+        view = getattr(pattern.callback, "cls", None) or getattr(pattern.callback, "view_class", None)
+        # Async views borrow their DRF viewset's serializer
+        view = getattr(view, "viewset_class", None) or view
+        serializer_class = getattr(view, "serializer_class", None)
+        if serializer_class is not None and serializer_class not in seen:
+            seen.add(serializer_class)
+            yield serializer_class
+
+
+def build_fields(serializer):
+    for field in serializer.fields.values():
+        child = getattr(field, "child", field)
+        if isinstance(child, serializers.BaseSerializer):
+            build_fields(child)
+
+
+def warm_serializers():
+    for serializer_class in serializer_classes():
+        try:
+            build_fields(serializer_class(context={}))
+        except Exception:
+            logger.debug("Could not build %s", serializer_class.__name__, exc_info=True)
+
+
+def warm_database():
+    try:
+        for alias in connections:
+            with connections[alias].cursor() as cursor:
+                cursor.execute("SELECT 1")
+    finally:
+        connections.close_all()
+        for connection in connections.all(initialized_only=True):
+            if getattr(connection, "pool", None) is not None:
+                connection.close_pool()
+
+
+def warm_caches():
+    for alias in caches:
+        caches[alias].get("warmup")
+
+
+STEPS = (
+    ("urls", warm_urls),
+    ("drf", warm_drf),
+    ("models", warm_models),
+    ("serializers", warm_serializers),
+    ("database", warm_database),
+    ("caches", warm_caches),
+)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import HealthFacility
+
+
+@admin.register(HealthFacility)
+class HealthFacilityAdmin(admin.ModelAdmin):
+    list_display = ("name", "district", "municipality", "operational_status", "active")
+    search_fields = ("name", "district", "municipality", "hmis_id")
+    list_filter = ("active", "province", "oxygen", "ambulance")
@@ -0,0 +1,208 @@
+import json
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from campaigns.cache import bump_version
+from facilities.models import HealthFacility
+
+UPDATE_FIELDS = [
+    "hmis_id",
+    "hf_code",
+    "name",
+    "active",
+    "operational_status",
+    "latitude",
+    "longitude",
+    "province",
+    "district",
+    "municipality",
+    "ward",
+    "ownership",
+    "facility_level",
+    "contact_person",
+    "contact_phone",
+    "telephone",
+    "email",
+    "oxygen",
+    "ambulance",
+    "ambulance_contact",
+    "pharmacy",
+    "insurance",
+    "beds",
+    "icu_beds",
+    "nicu_beds",
+    "hdu_beds",
+    "ventilators",
+    "updated_at",
+]
+
+
+def iter_json_array(fp, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    eof = False
+    while True:
+        if not eof and len(buf) < chunk_size:
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf += chunk
+        buf = buf.lstrip()
+        if not started:
+            if not buf:
+                if eof:
+                    return
+                continue
+            if buf[0] != "[":
+                raise ValueError("Expected a JSON array.")
+            buf = buf[1:]
+            started = True
+            continue
+        if buf.startswith(","):
+            buf = buf[1:]
+            continue
+        if buf.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buf)
+            # Only trust the element once its delimiter is buffered; a number
+            # at the buffer edge may otherwise be truncated.
+            complete = eof or buf[end:].lstrip()[:1] in (",", "]")
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            # Element spans the chunk boundary: read more
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf += chunk
+            continue
+        yield item
+        buf = buf[end:]
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _flag(value):
+    """Normalize registry yes/no strings; blank means unknown."""
+    value = _text(value).lower()
+    if value in ("yes", "true", "1", "y"):
+        return True
+    if value in ("no", "false", "0", "n"):
+        return False
+    return None
+
+
+def _count(value):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+
+def _coordinate(value, limit):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not -limit <= number <= limit or number == 0:
+        return None
+    return number
+
+
+def _name(props, key, field):
+    value = props.get(key)
+    return _text(value.get(field)) if isinstance(value, dict) else ""
+
+
+def facility_from_record(record):
+    """Map one HMIS registry record onto an unsaved HealthFacility."""
+    props = record.get("properties") or {}
+    coords = record.get("coordinates") or {}
+    identifiers = record.get("identifiers") or {}
+    return HealthFacility(
+        uuid=uuid.UUID(str(record["uuid"])),
+        hmis_id=_text(identifiers.get("iid"))[:40],
+        hf_code=_count(props.get("hfCode")),
+        name=_text(record.get("name"))[:255],
+        active=_flag(record.get("active")) is not False,
+        operational_status=_text(props.get("opstatus"))[:40],
+        latitude=_coordinate(coords.get("latitude"), 90),
+        longitude=_coordinate(coords.get("longitude"), 180),
+        province=_name(props, "province", "province_name")[:120],
+        district=_name(props, "district", "district_name")[:120],
+        municipality=_name(props, "municipality", "municipality_name")[:200],
+        ward=_count(props.get("ward")),
+        ownership=_name(props, "ownerships", "ownership_name")[:120],
+        facility_level=_name(props, "health_facility_level", "facility_level_name")[:200],
+        contact_person=_text(props.get("contact_person"))[:200],
+        contact_phone=_text(props.get("contact_person_mobile"))[:60],
+        telephone=_text(props.get("telephone"))[:60],
+        email=_text(props.get("email"))[:254],
+        oxygen=_flag(props.get("oxygen")),
+        ambulance=_flag(props.get("ambulance")),
+        ambulance_contact=_text(props.get("ambulance_contact"))[:60],
+        pharmacy=_flag(props.get("pharmacy")),
+        insurance=_flag(props.get("insurance")),
+        beds=_count(props.get("functional")),
+        icu_beds=_count(props.get("icu_functional")),
+        nicu_beds=_count(props.get("nicu_functional")),
+        hdu_beds=_count(props.get("hdu_functional")),
+        ventilators=_count(props.get("ventilator_functional")),
+    )
+
+
+class Command(BaseCommand):
+    help = "Import health facilities from an HMIS registry JSON export (e.g. list_of_health_centers.json)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the JSON array of facility records")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        imported = skipped = 0
+        batch = {}
+
+        def flush():
+            HealthFacility.objects.bulk_create(
+                list(batch.values()),
+                update_conflicts=True,
+                unique_fields=["uuid"],
+                update_fields=UPDATE_FIELDS,
+            )
+            batch.clear()
+
+        try:
+            fp = open(options["path"], encoding="utf-8")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with fp:
+            try:
+                for record in iter_json_array(fp):
+                    try:
+                        facility = facility_from_record(record)
+                    except (KeyError, TypeError, ValueError, AttributeError):
+                        skipped += 1
+                        continue
+                    # Last record wins if the export repeats a uuid
+                    batch[facility.uuid] = facility
+                    imported += 1
+                    if len(batch) >= batch_size:
+                        flush()
+            except ValueError as exc:
+                raise CommandError(f"Invalid JSON: {exc}")
+        if batch:
+            flush()
+
+        # bulk_create skips post_save; refresh the nearby-search index explicitly
+        bump_version(HealthFacility)
+        self.stdout.write(
+            self.style.SUCCESS(f"Import complete. Imported {imported} facilities, skipped {skipped}.")
+        )
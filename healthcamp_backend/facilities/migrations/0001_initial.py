@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HealthFacility",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("uuid", models.UUIDField(unique=True)),
+                ("hmis_id", models.CharField(blank=True, max_length=40)),
+                ("hf_code", models.BigIntegerField(blank=True, null=True)),
+                ("name", models.CharField(max_length=255)),
+                ("active", models.BooleanField(default=True)),
+                ("operational_status", models.CharField(blank=True, max_length=40)),
+                ("latitude", models.FloatField(blank=True, null=True)),
+                ("longitude", models.FloatField(blank=True, null=True)),
+                ("province", models.CharField(blank=True, max_length=120)),
+                ("district", models.CharField(blank=True, max_length=120)),
+                ("municipality", models.CharField(blank=True, max_length=200)),
+                ("ward", models.PositiveIntegerField(blank=True, null=True)),
+                ("ownership", models.CharField(blank=True, max_length=120)),
+                ("facility_level", models.CharField(blank=True, max_length=200)),
+                ("contact_person", models.CharField(blank=True, max_length=200)),
+                ("contact_phone", models.CharField(blank=True, max_length=60)),
+                ("telephone", models.CharField(blank=True, max_length=60)),
+                ("email", models.CharField(blank=True, max_length=254)),
+                ("oxygen", models.BooleanField(blank=True, null=True)),
+                ("ambulance", models.BooleanField(blank=True, null=True)),
+                ("ambulance_contact", models.CharField(blank=True, max_length=60)),
+                ("pharmacy", models.BooleanField(blank=True, null=True)),
+                ("insurance", models.BooleanField(blank=True, null=True)),
+                ("beds", models.PositiveIntegerField(blank=True, null=True)),
+                ("icu_beds", models.PositiveIntegerField(blank=True, null=True)),
+                ("nicu_beds", models.PositiveIntegerField(blank=True, null=True)),
+                ("hdu_beds", models.PositiveIntegerField(blank=True, null=True)),
+                ("ventilators", models.PositiveIntegerField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "health facilities",
+                "ordering": ["name"],
+                "indexes": [models.Index(fields=["latitude", "longitude"], name="facility_latlng_idx"), models.Index(fields=["district"], name="facility_district_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import models
+
+
+class HealthFacility(models.Model):
+    """A health facility from the HMIS registry (see ``import_facilities``)."""
+
+    uuid = models.UUIDField(unique=True)
+    hmis_id = models.CharField(max_length=40, blank=True)
+    hf_code = models.BigIntegerField(null=True, blank=True)
+    name = models.CharField(max_length=255)
+    active = models.BooleanField(default=True)
+    operational_status = models.CharField(max_length=40, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    province = models.CharField(max_length=120, blank=True)
+    district = models.CharField(max_length=120, blank=True)
+    municipality = models.CharField(max_length=200, blank=True)
+    ward = models.PositiveIntegerField(null=True, blank=True)
+    ownership = models.CharField(max_length=120, blank=True)
+    facility_level = models.CharField(max_length=200, blank=True)
+
+    contact_person = models.CharField(max_length=200, blank=True)
+    contact_phone = models.CharField(max_length=60, blank=True)
+    telephone = models.CharField(max_length=60, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+
+    # Service flags: None means the registry does not say
+    oxygen = models.BooleanField(null=True, blank=True)
+    ambulance = models.BooleanField(null=True, blank=True)
+    ambulance_contact = models.CharField(max_length=60, blank=True)
+    pharmacy = models.BooleanField(null=True, blank=True)
+    insurance = models.BooleanField(null=True, blank=True)
+    beds = models.PositiveIntegerField(null=True, blank=True)
+    icu_beds = models.PositiveIntegerField(null=True, blank=True)
+    nicu_beds = models.PositiveIntegerField(null=True, blank=True)
+    hdu_beds = models.PositiveIntegerField(null=True, blank=True)
+    ventilators = models.PositiveIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "health facilities"
+        indexes = [
+            # Bounding-box prefilter when the in-process index is cold
+            models.Index(fields=["latitude", "longitude"], name="facility_latlng_idx"),
+            models.Index(fields=["district"], name="facility_district_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def icu_functional(self) -> bool:
+        return bool(self.icu_beds)
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+from .models import HealthFacility
+
+
+class HealthFacilitySerializer(serializers.ModelSerializer):
+    icu_functional = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = HealthFacility
+        fields = [
+            "id",
+            "uuid",
+            "hf_code",
+            "name",
+            "active",
+            "operational_status",
+            "latitude",
+            "longitude",
+            "province",
+            "district",
+            "municipality",
+            "ward",
+            "ownership",
+            "facility_level",
+            "contact_person",
+            "contact_phone",
+            "telephone",
+            "email",
+            "oxygen",
+            "ambulance",
+            "ambulance_contact",
+            "pharmacy",
+            "insurance",
+            "beds",
+            "icu_beds",
+            "icu_functional",
+            "nicu_beds",
+            "hdu_beds",
+            "ventilators",
+            "updated_at",
+        ]
+
+
+class NearbyFacilitySerializer(HealthFacilitySerializer):
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(HealthFacilitySerializer.Meta):
+        fields = HealthFacilitySerializer.Meta.fields + ["distance_km"]
+
+    def get_distance_km(self, obj):
+        return round(self.context["distances"][obj.pk], 3)
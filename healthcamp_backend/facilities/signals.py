@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from campaigns.cache import bump_version
+from .models import HealthFacility
+
+
+@receiver(post_save, sender=HealthFacility)
+@receiver(post_delete, sender=HealthFacility)
+def bump_facility_version(sender, **kwargs):
+    # Marks the in-process spatial index stale (see facilities.spatial)
+    bump_version(sender)
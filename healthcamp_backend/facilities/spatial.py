@@ -0,0 +1,156 @@
+"""
+In-process spatial index for nearest-facility queries.
+
+Facilities are bucketed into a uniform lat/lng grid. A query walks rings of
+cells outward from the query point, prefilters each cell's points against the
+search bounding box and only then computes great-circle distances, stopping
+as soon as no unvisited ring can hold a closer point. No PostGIS needed.
+
+The index is rebuilt lazily whenever the ``HealthFacility`` version counter
+(bumped by ``facilities.signals`` and by ``import_facilities``) moves.
+"""
+
+import heapq
+import math
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from campaigns.cache import get_versions
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Service bits stored alongside each point so filters never hit the database
+SERVICE_FLAGS = {"oxygen": 1, "ambulance": 2, "pharmacy": 4, "icu": 8}
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def service_mask(oxygen=None, ambulance=None, pharmacy=None, icu_beds=None):
+    mask = 0
+    if oxygen:
+        mask |= SERVICE_FLAGS["oxygen"]
+    if ambulance:
+        mask |= SERVICE_FLAGS["ambulance"]
+    if pharmacy:
+        mask |= SERVICE_FLAGS["pharmacy"]
+    if icu_beds:
+        mask |= SERVICE_FLAGS["icu"]
+    return mask
+
+
+class GridIndex:
+    def __init__(self, points, cell_degrees=0.1):
+        """``points`` is an iterable of ``(id, lat, lng, mask)``."""
+        self.cell = cell_degrees
+        self.cells = defaultdict(list)
+        for pk, lat, lng, mask in points:
+            self.cells[self._key(lat, lng)].append((lat, lng, pk, mask))
+        self.size = sum(len(bucket) for bucket in self.cells.values())
+        if self.cells:
+            rows = [i for i, _ in self.cells]
+            cols = [j for _, j in self.cells]
+            self.bounds = (min(rows), max(rows), min(cols), max(cols))
+        else:
+            self.bounds = None
+
+    def _key(self, lat, lng):
+        return (math.floor(lat / self.cell), math.floor(lng / self.cell))
+
+    def _ring(self, ci, cj, r):
+        if r == 0:
+            yield ci, cj
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield ci - r, j
+            yield ci + r, j
+        for i in range(ci - r + 1, ci + r):
+            yield i, cj - r
+            yield i, cj + r
+
+    def nearest(self, lat, lng, radius_km, limit, required_mask=0):
+        """Return up to ``limit`` ``(distance_km, id)`` pairs within ``radius_km``, nearest first."""
+        if self.bounds is None or limit <= 0:
+            return []
+        min_i, max_i, min_j, max_j = self.bounds
+        ci, cj = self._key(lat, lng)
+
+        # Search bounding box; longitude degrees shrink towards the poles
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(min(89.9, abs(lat) + dlat))), 1e-6)
+        dlng = min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+        lat_lo, lat_hi = lat - dlat, lat + dlat
+        lng_lo, lng_hi = lng - dlng, lng + dlng
+
+        max_ring = max(
+            abs(ci - min_i), abs(ci - max_i), abs(cj - min_j), abs(cj - max_j)
+        )
+        max_ring = min(max_ring, math.ceil(max(dlat, dlng) / self.cell) + 1)
+
+        heap = []  # max-heap on distance via negation
+        cell_km = self.cell * KM_PER_DEGREE * cos_lat
+        for r in range(max_ring + 1):
+            # Every point in ring r is at least (r - 1) cells away
+            if len(heap) >= limit and (r - 1) * cell_km > -heap[0][0]:
+                break
+            for key in self._ring(ci, cj, r):
+                bucket = self.cells.get(key)
+                if not bucket:
+                    continue
+                for plat, plng, pk, mask in bucket:
+                    if not (lat_lo <= plat <= lat_hi and lng_lo <= plng <= lng_hi):
+                        continue
+                    if mask & required_mask != required_mask:
+                        continue
+                    dist = haversine_km(lat, lng, plat, plng)
+                    if dist > radius_km:
+                        continue
+                    if len(heap) < limit:
+                        heapq.heappush(heap, (-dist, -pk))
+                    elif dist < -heap[0][0]:
+                        heapq.heapreplace(heap, (-dist, -pk))
+        return sorted((-d, -pk) for d, pk in heap)
+
+
+_lock = threading.Lock()
+_index = None  # (version, GridIndex)
+
+
+def build_index():
+    from .models import HealthFacility
+
+    rows = (
+        HealthFacility.objects.filter(active=True, latitude__isnull=False, longitude__isnull=False)
+        .values_list("id", "latitude", "longitude", "oxygen", "ambulance", "pharmacy", "icu_beds")
+        .iterator(chunk_size=5000)
+    )
+    points = (
+        (pk, lat, lng, service_mask(oxygen, ambulance, pharmacy, icu))
+        for pk, lat, lng, oxygen, ambulance, pharmacy, icu in rows
+    )
+    return GridIndex(points, getattr(settings, "FACILITY_GRID_CELL_DEGREES", 0.1))
+
+
+def get_index():
+    """Return the current index, rebuilding it if facilities changed."""
+    from .models import HealthFacility
+
+    global _index
+    version = get_versions([HealthFacility])[0]
+    current = _index
+    if current is not None and current[0] == version:
+        return current[1]
+    with _lock:
+        current = _index
+        if current is None or current[0] != version:
+            current = (version, build_index())
+            _index = current
+    return current[1]
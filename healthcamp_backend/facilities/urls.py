@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import HealthFacilityViewSet
+
+router = DefaultRouter()
+router.register(r"facilities", HealthFacilityViewSet, basename="facility")
+
+urlpatterns = router.urls
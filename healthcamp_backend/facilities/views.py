@@ -0,0 +1,68 @@
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from campaigns.pagination import KeysetPagination
+from core.instrumentation import TimedSerializationMixin, serializer_timer
+from .models import HealthFacility
+from .serializers import HealthFacilitySerializer, NearbyFacilitySerializer
+from .spatial import SERVICE_FLAGS, get_index
+
+
+def _float_param(params, name, default=None, low=None, high=None):
+    raw = params.get(name)
+    if raw in (None, ""):
+        if default is None:
+            raise ValidationError({name: ["This parameter is required."]})
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValidationError({name: ["A valid number is required."]})
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValidationError({name: [f"Must be between {low} and {high}."]})
+    return value
+
+
+class FacilityPagination(KeysetPagination):
+    ordering = ("id",)
+
+
+class HealthFacilityViewSet(TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = HealthFacility.objects.filter(active=True)
+    serializer_class = HealthFacilitySerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = FacilityPagination
+
+    max_radius_km = 200
+    max_limit = 100
+
+    @action(detail=False, methods=["get"], url_path="nearby")
+    def nearby(self, request):
+        """
+        Nearest active facilities to ``lat``/``lng``.
+
+        Query params: ``radius`` in km (default 10), ``limit`` (default 20) and
+        ``services``, a comma-separated subset of oxygen, ambulance, pharmacy, icu.
+        """
+        params = request.query_params
+        lat = _float_param(params, "lat", low=-90, high=90)
+        lng = _float_param(params, "lng", low=-180, high=180)
+        radius = _float_param(params, "radius", 10.0, low=0, high=self.max_radius_km)
+        limit = int(_float_param(params, "limit", 20, low=1, high=self.max_limit))
+
+        required = 0
+        for name in [s.strip() for s in params.get("services", "").split(",") if s.strip()]:
+            if name not in SERVICE_FLAGS:
+                raise ValidationError({"services": [f"Unknown service: {name}."]})
+            required |= SERVICE_FLAGS[name]
+
+        hits = get_index().nearest(lat, lng, radius, limit, required)
+        distances = {pk: dist for dist, pk in hits}
+        rows = HealthFacility.objects.in_bulk(list(distances))
+        facilities = [rows[pk] for _, pk in hits if pk in rows]
+        serializer = NearbyFacilitySerializer(facilities, many=True, context={"distances": distances})
+        with serializer_timer():
+            data = serializer.data
+        return Response(data)
@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from core.admin_tools import LargeTableAdmin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "locked_by", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("key__exact",)
+    search_help_text = "Exact job key."
+    readonly_fields = ("created_at", "finished_at", "locked_by", "locked_at")
+    actions = ("retry",)
+
+    @admin.action(description="Retry selected failed jobs now")
+    def retry(self, request, queryset):
+        updated = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"{updated} job(s) queued again.")
@@ -0,0 +1,68 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import F
+
+from jobs import queue
+from jobs.models import Job
+
+# Seconds between checks for daily jobs coming due
+SCHEDULE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a background job worker: claim due jobs from the database, run them, retry "
+        "failures with backoff and enqueue daily jobs. Run several for more throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=10, help="Jobs claimed at a time")
+        parser.add_argument("--sleep", type=float, help="Seconds between polls of an empty queue")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due")
+        parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+
+    def handle(self, *args, **options):
+        worker = options["worker_id"]
+        sleep = options["sleep"] if options["sleep"] is not None else getattr(settings, "JOBS_POLL_INTERVAL", 1.0)
+        self.stopping = False
+        # Finish the job in hand on SIGTERM/SIGINT, then exit
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        counts = {Job.DONE: 0, Job.QUEUED: 0, Job.FAILED: 0}
+        next_schedule = 0
+        self.stdout.write(f"Worker {worker} started.")
+        while not self.stopping:
+            # Long-lived process: honour CONN_MAX_AGE and health checks as requests do
+            close_old_connections()
+            if time.monotonic() >= next_schedule:
+                queue.schedule_daily()
+                next_schedule = time.monotonic() + SCHEDULE_INTERVAL
+            jobs = queue.claim(worker, options["batch"])
+            if not jobs:
+                if options["burst"]:
+                    break
+                time.sleep(sleep)
+                continue
+            for index, job in enumerate(jobs):
+                if self.stopping:
+                    # Hand unstarted jobs back rather than waiting out their lease
+                    Job.objects.filter(pk__in=[j.pk for j in jobs[index:]], locked_by=worker).update(
+                        status=Job.QUEUED, locked_by="", attempts=F("attempts") - 1
+                    )
+                    break
+                counts[queue.run(job, worker)] += 1
+        close_old_connections()
+        self.stdout.write(
+            f"Worker {worker} stopped: {counts[Job.DONE]} done, {counts[Job.QUEUED]} to retry, "
+            f"{counts[Job.FAILED]} failed."
+        )
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,164 @@
+"""
+Database-backed job queue; no broker needed.
+
+Handlers are plain functions registered with ``@job`` in an app's ``tasks``
+module (autodiscovered at startup) and take the job's JSON payload::
+
+    @job("send_reminder", max_attempts=3)
+    def send_reminder(payload): ...
+
+    enqueue("send_reminder", {"campaign": 1})
+
+``manage.py run_jobs`` runs workers. A worker claims due jobs in a short
+transaction. On Postgres the claim is ``SELECT ... FOR UPDATE SKIP LOCKED``,
+so concurrent workers never wait on or claim each other's rows. Backends
+without ``SKIP LOCKED`` (SQLite) claim each candidate with a conditional
+``UPDATE`` instead, and whichever worker's update matches the row wins.
+
+A claimed job is leased for ``JOBS_LEASE_SECONDS``. If its worker dies, the
+job becomes claimable again once the lease expires. A failing job is retried
+with exponential backoff from ``JOBS_RETRY_DELAY`` seconds until it has been
+attempted ``max_attempts`` times, then left ``failed`` with its traceback
+for the admin. Handlers must therefore be idempotent.
+
+``@job(..., daily_at=time(9))`` also schedules the handler once a day, with
+the local date as ``payload["date"]``. Every worker enqueues it under a
+per-day key, so exactly one job runs per day however many workers there are.
+"""
+
+import logging
+import random
+import traceback
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("healthcamp.jobs")
+
+HANDLERS = {}
+# name -> time of day the job is enqueued
+DAILY = {}
+
+
+class Handler:
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.max_attempts = max_attempts
+
+
+def job(name, max_attempts=5, daily_at=None):
+    def register(func):
+        HANDLERS[name] = Handler(func, max_attempts)
+        if daily_at is not None:
+            DAILY[name] = daily_at
+        return func
+
+    return register
+
+
+def enqueue(name, payload=None, run_at=None, key=None, max_attempts=None):
+    """
+    Queue a job. With ``key``, a job already queued (or run) under the same
+    key makes this a no-op. Call inside the transaction that creates the work
+    so the job is only visible if it commits.
+    """
+    if name not in HANDLERS:
+        raise ValueError(f"Unknown job: {name}")
+    Job.objects.bulk_create(
+        [
+            Job(
+                name=name,
+                payload=payload or {},
+                key=key,
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts or HANDLERS[name].max_attempts,
+            )
+        ],
+        ignore_conflicts=key is not None,
+    )
+
+
+def schedule_daily(now=None):
+    """Enqueue today's run of every daily job whose time has come."""
+    now = timezone.localtime(now)
+    for name, at in DAILY.items():
+        run_at = timezone.make_aware(datetime.combine(now.date(), at))
+        if run_at <= now:
+            day = now.date().isoformat()
+            enqueue(name, {"date": day}, run_at=run_at, key=f"{name}@{day}")
+
+
+def lease_expired(now):
+    return now - timedelta(seconds=getattr(settings, "JOBS_LEASE_SECONDS", 300))
+
+
+def claimable(now):
+    return Q(status=Job.QUEUED, run_at__lte=now) | Q(status=Job.RUNNING, locked_at__lt=lease_expired(now))
+
+
+def claim(worker, limit=1):
+    """Lease up to ``limit`` due jobs to ``worker`` and return them."""
+    now = timezone.now()
+    lease = {"status": Job.RUNNING, "locked_by": worker, "locked_at": now, "attempts": F("attempts") + 1}
+    due = Job.objects.filter(claimable(now)).order_by("run_at", "id")
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**lease)
+    else:
+        ids = []
+        # Twice the limit: some candidates will be taken by other workers first
+        for pk in due.values_list("id", flat=True)[: limit * 2]:
+            if len(ids) < limit and Job.objects.filter(claimable(now), pk=pk).update(**lease):
+                ids.append(pk)
+    return list(Job.objects.filter(id__in=ids).order_by("run_at", "id"))
+
+
+def retry_delay(attempts):
+    base = getattr(settings, "JOBS_RETRY_DELAY", 30)
+    # Exponential, capped at a day, jittered so failed batches spread out
+    return min(base * 2 ** (attempts - 1), 86400) * random.uniform(0.8, 1.2)
+
+
+def run(job, worker):
+    """Run a claimed job and record the outcome. Returns the job's new status."""
+    mine = Job.objects.filter(pk=job.pk, locked_by=worker, status=Job.RUNNING)
+    handler = HANDLERS.get(job.name)
+    if handler is None:
+        error = f"No handler registered for {job.name!r}."
+    elif job.attempts > job.max_attempts:
+        # Leased again after its worker died, more often than it may be tried
+        error = "Lease expired on the last attempt."
+    else:
+        try:
+            handler.func(job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("Job %s failed (attempt %d of %d)", job, job.attempts, job.max_attempts, exc_info=True)
+        else:
+            mine.update(status=Job.DONE, locked_by="", last_error="", finished_at=timezone.now())
+            return Job.DONE
+    if handler is not None and job.attempts < job.max_attempts:
+        mine.update(
+            status=Job.QUEUED,
+            locked_by="",
+            last_error=error,
+            run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+        )
+        return Job.QUEUED
+    mine.update(status=Job.FAILED, locked_by="", last_error=error, finished_at=timezone.now())
+    logger.error("Job %s failed permanently", job)
+    return Job.FAILED
+
+
+def prune(days=None):
+    """Delete jobs that finished more than ``days`` ago; return how many."""
+    days = getattr(settings, "JOBS_RETENTION_DAYS", 7) if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,8 @@
+from datetime import time
+
+from .queue import job, prune
+
+
+@job("prune_jobs", daily_at=time(3))
+def prune_jobs(payload):
+    prune()
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from core.admin_tools import LargeTableAdmin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ("user", "kind", "title", "created_at", "read_at")
+    list_select_related = ("user",)
+    search_fields = ("user__username__exact", "user__phone__exact")
+    search_help_text = "Exact username or phone."
+    list_filter = ("kind", "created_at")
+    autocomplete_fields = ("user", "campaign")
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("campaigns", "0013_disease_diseaseavailability"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Notification",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("campaign_reminder", "Campaign reminder")], max_length=30)),
+                ("title", models.CharField(max_length=200)),
+                ("body", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("read_at", models.DateTimeField(blank=True, null=True)),
+                ("campaign", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="notifications", to="campaigns.campaign")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="notifications", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["-id"],
+                "indexes": [models.Index(fields=["user", "-id"], name="notification_inbox_idx")],
+                "constraints": [models.UniqueConstraint(fields=("user", "campaign", "kind"), name="notification_once")],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import models
+
+from campaigns.models import Campaign
+
+
+class Notification(models.Model):
+    """A message for one user, polled by the app from ``/api/notifications/``."""
+
+    CAMPAIGN_REMINDER = "campaign_reminder"
+    KIND_CHOICES = [(CAMPAIGN_REMINDER, "Campaign reminder")]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    campaign = models.ForeignKey(
+        Campaign, on_delete=models.CASCADE, related_name="notifications", null=True, blank=True
+    )
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        # The app's poll: one user's notifications newer than an id, newest first
+        indexes = [models.Index(fields=["user", "-id"], name="notification_inbox_idx")]
+        constraints = [
+            # One reminder per user and campaign, so a retried fan-out batch sends nothing twice
+            models.UniqueConstraint(fields=["user", "campaign", "kind"], name="notification_once"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} for {self.user_id}"
@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import NotificationViewSet
+
+router = DefaultRouter()
+router.register(r"notifications", NotificationViewSet, basename="notification")
+
+urlpatterns = router.urls
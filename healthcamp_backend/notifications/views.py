@@ -0,0 +1,56 @@
+from django.utils import timezone
+from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from campaigns.views import _parse_limit_param
+from core.instrumentation import serializer_timer
+from .models import Notification
+from .serializers import MarkReadSerializer, NotificationSerializer
+
+
+class NotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    The requester's notifications, newest first.
+
+    The app polls with ``?since=<highest id seen>`` so each poll returns only
+    what is new, oldest first: a full page means there is more, and the next
+    poll from the page's highest id picks it up. ``?unread=true`` leaves out
+    read ones; ``?limit=`` caps the list (default 50, at most 200).
+    """
+
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 50
+    max_limit = 200
+
+    def get_queryset(self):
+        return Notification.objects.filter(user_id=self.request.user.pk)
+
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        queryset = self.get_queryset().order_by("-id")
+        if params.get("since"):
+            try:
+                # Ascending, or a burst larger than ``limit`` would be skipped
+                queryset = queryset.filter(id__gt=int(params["since"])).order_by("id")
+            except ValueError:
+                raise ValidationError({"since": ["Enter a notification id."]})
+        if params.get("unread", "").lower() in ("1", "true"):
+            queryset = queryset.filter(read_at__isnull=True)
+        limit = _parse_limit_param(params, self.default_limit, self.max_limit)
+        serializer = self.get_serializer(queryset[:limit], many=True)
+        with serializer_timer():
+            data = serializer.data
+        return Response(data)
+
+    @action(detail=False, methods=["post"], url_path="read")
+    def read(self, request):
+        """Mark ``{"ids": [...]}`` as read, or every unread notification when ``ids`` is left out."""
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_queryset().filter(read_at__isnull=True)
+        if "ids" in serializer.validated_data:
+            queryset = queryset.filter(id__in=serializer.validated_data["ids"])
+        return Response({"updated": queryset.update(read_at=timezone.now())})
@@ -1,9 +1,49 @@
 from django.contrib import admin
-from .models import Registration
+from django.db import transaction
+
+from core.admin_tools import LargeTableAdmin
+from .export import export_response
+from .models import Registration, WaitlistEntry
+from .seats import claim_seat
 
 
 @admin.register(Registration)
-class RegistrationAdmin(admin.ModelAdmin):
+class RegistrationAdmin(LargeTableAdmin):
+    list_display = ("user", "campaign", "created_at")
+    list_select_related = ("user", "campaign")
+    search_fields = ("user__username__exact", "user__phone__exact", "campaign__title__startswith")
+    search_help_text = "Exact username or phone, or the start of a campaign title."
+    list_filter = ("created_at",)
+    autocomplete_fields = ("user", "campaign")
+    actions = ("export_csv", "export_ndjson")
+
+    @admin.action(description="Export selected registrations as CSV")
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, "csv")
+
+    @admin.action(description="Export selected registrations as NDJSON")
+    def export_ndjson(self, request, queryset):
+        return export_response(request, queryset, "ndjson")
+
+    def get_readonly_fields(self, request, obj=None):
+        # Moving a registration would need a seat moved with it; cancel and re-add instead
+        if obj is not None:
+            return ("user", "campaign")
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                # Staff may place someone beyond capacity deliberately
+                claim_seat(obj.campaign_id, force=True)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(LargeTableAdmin):
     list_display = ("user", "campaign", "created_at")
-    search_fields = ("user__username", "campaign__title")
+    list_select_related = ("user", "campaign")
+    search_fields = ("user__username__exact", "user__phone__exact", "campaign__title__startswith")
+    search_help_text = "Exact username or phone, or the start of a campaign title."
     list_filter = ("created_at",)
+    autocomplete_fields = ("user", "campaign")
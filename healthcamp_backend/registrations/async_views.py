@@ -0,0 +1,31 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.async_views import AsyncAPIView, aauthenticate
+from core.db_router import allow_replica_reads
+from core.instrumentation import serializer_timer
+from users.default_patient import get_default_patient
+from .serializers import RegistrationSerializer
+from .views import registrations_for
+
+
+class AsyncMyRegistrationsView(AsyncAPIView):
+    """Async ``GET /api/registrations/mine/``, same payload as the DRF action."""
+
+    chunk_size = 500
+
+    async def get(self, request):
+        user = await aauthenticate(request)
+        allow_replica_reads()
+        if user is None:
+            if not getattr(settings, "USE_DEFAULT_PATIENT_FOR_UNAUTH", False):
+                # Anonymous users see no registrations
+                return self.render([])
+            user = await sync_to_async(get_default_patient)()
+
+        queryset = registrations_for(user.pk)
+        rows = [obj async for obj in queryset.aiterator(chunk_size=self.chunk_size)]
+        context = {"request": self.drf_request(request), "format": None, "view": self}
+        with serializer_timer():
+            data = RegistrationSerializer(rows, many=True, context=context).data
+        return self.render(data)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_registrations(apps, schema_editor):
+    Campaign = apps.get_model("campaigns", "Campaign")
+    Registration = apps.get_model("registrations", "Registration")
+    registered = (
+        Registration.objects.filter(campaign=OuterRef("pk"))
+        .order_by()
+        .values("campaign")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Campaign.objects.update(registered_count=Coalesce(Subquery(registered), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0009_campaign_capacity"),
+        ("registrations", "0003_registration_maps_url"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaitlistEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("campaign", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="waitlist_entries", to="campaigns.campaign")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="waitlist_entries", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "verbose_name_plural": "waitlist entries",
+                "ordering": ["created_at", "id"],
+                "indexes": [models.Index(fields=["campaign", "created_at", "id"], name="waitlist_queue_idx")],
+                "unique_together": {("user", "campaign")},
+            },
+        ),
+        migrations.RunPython(count_registrations, migrations.RunPython.noop),
+    ]
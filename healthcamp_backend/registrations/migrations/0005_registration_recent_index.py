@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0004_waitlistentry"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="registration",
+            index=models.Index(fields=["-created_at", "-id"], name="registration_recent_idx"),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0010_campaign_title_index"),
+        ("registrations", "0005_registration_recent_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistrationRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("gender", models.CharField(blank=True, max_length=10)),
+                ("age_band", models.CharField(blank=True, max_length=8)),
+                ("count", models.IntegerField(default=0)),
+                ("campaign", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="registration_rollups", to="campaigns.campaign")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["day"], name="registration_rollup_day_idx")],
+                "unique_together": {("campaign", "day", "gender", "age_band")},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0013_disease_diseaseavailability"),
+        ("registrations", "0006_registrationrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="registration",
+            index=models.Index(fields=["campaign", "id"], name="registration_campaign_id_idx"),
+        ),
+    ]
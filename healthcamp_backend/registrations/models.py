@@ -13,6 +13,46 @@ class Registration(models.Model):
     class Meta:
         unique_together = ("user", "campaign")
         ordering = ["-created_at"]
+        indexes = [
+            # Admin changelist order (the admin adds -pk) and date filters
+            models.Index(fields=["-created_at", "-id"], name="registration_recent_idx"),
+            # Keyset batches over one campaign's registrations (reminder fan-out)
+            models.Index(fields=["campaign", "id"], name="registration_campaign_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user_id}->{self.campaign_id}"
+
+
+class WaitlistEntry(models.Model):
+    """A user waiting for a seat in a full campaign; promoted oldest first (see ``registrations.seats``)."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="waitlist_entries")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "campaign")
+        ordering = ["created_at", "id"]
+        indexes = [models.Index(fields=["campaign", "created_at", "id"], name="waitlist_queue_idx")]
+        verbose_name_plural = "waitlist entries"
+
+    def __str__(self) -> str:
+        return f"{self.user_id}~>{self.campaign_id}"
+
+
+class RegistrationRollup(models.Model):
+    """Registrations per campaign, day, gender and age band, kept current by ``registrations.rollups``."""
+
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE, related_name="registration_rollups")
+    day = models.DateField()
+    gender = models.CharField(max_length=10, blank=True)
+    age_band = models.CharField(max_length=8, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("campaign", "day", "gender", "age_band")
+        indexes = [models.Index(fields=["day"], name="registration_rollup_day_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.campaign_id}@{self.day}/{self.gender or '-'}/{self.age_band or '-'}: {self.count}"
@@ -0,0 +1,169 @@
+"""
+Incrementally maintained registration counts for dashboards.
+
+``RegistrationRollup`` holds one row per (campaign, day, gender, age band).
+Every registration created or deleted adds +1/-1 to its bucket with a single
+``INSERT ... ON CONFLICT DO UPDATE`` in the same transaction as the change
+(signals in ``registrations.signals``; bulk registration calls ``apply``
+directly, and bulk loads ``record_inserted``), so ``/api/stats/`` reads O(buckets) rows instead of grouping the
+registrations table.
+
+Buckets use the user's current gender and age: changing either moves that
+user's registrations to the new bucket. ``rebuild`` recomputes everything
+from the registrations table, holding off changes until it commits.
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Case, CharField, Count, F, Max, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Registration, RegistrationRollup
+
+# (exclusive upper age, label); the last band is open-ended
+AGE_BANDS = (
+    (5, "0-4"),
+    (15, "5-14"),
+    (25, "15-24"),
+    (45, "25-44"),
+    (65, "45-64"),
+    (None, "65+"),
+)
+
+
+def age_band(age):
+    if age is None:
+        return ""
+    for upper, label in AGE_BANDS:
+        if upper is None or age < upper:
+            return label
+
+
+def age_band_expression(field):
+    """``age_band`` as a SQL expression over ``field``."""
+    return Case(
+        When(**{f"{field}__isnull": True}, then=Value("")),
+        *(When(**{f"{field}__lt": upper}, then=Value(label)) for upper, label in AGE_BANDS[:-1]),
+        default=Value(AGE_BANDS[-1][1]),
+        output_field=CharField(),
+    )
+
+
+def profile_bucket(user):
+    return user.gender or "", age_band(user.age)
+
+
+def apply(deltas):
+    """Add ``{(campaign_id, day, gender, age_band): n}`` to the rollups (n may be negative)."""
+    deltas = [(key, n) for key, n in deltas.items() if n]
+    if not deltas:
+        return
+    quote = connection.ops.quote_name
+    table = quote(RegistrationRollup._meta.db_table)
+    columns = [quote(RegistrationRollup._meta.get_field(name).column) for name in ("campaign", "day", "gender", "age_band")]
+    count = quote("count")
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}, {count}) VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({', '.join(columns)}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}"
+    )
+    adapt = connection.ops.adapt_datefield_value
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            sql, [(campaign_id, adapt(day), gender, band, n) for (campaign_id, day, gender, band), n in deltas]
+        )
+
+
+def record(registration, user, sign=1):
+    """Count (or with ``sign=-1`` uncount) one registration."""
+    day = timezone.localdate(registration.created_at)
+    apply({(registration.campaign_id, day, *profile_bucket(user)): sign})
+
+
+def record_many(rows, users):
+    """Count newly inserted ``(campaign_id, created_at, user_id)`` rows; ``users`` maps id to user."""
+    deltas = Counter()
+    for campaign_id, created_at, user_id in rows:
+        deltas[(campaign_id, timezone.localdate(created_at), *profile_bucket(users[user_id]))] += 1
+    apply(deltas)
+
+
+def move_user(user_id, old_bucket, new_bucket):
+    """Move a user's registrations between profile buckets after a gender/age change."""
+    per_day = (
+        Registration.objects.filter(user_id=user_id)
+        .order_by()
+        .values_list("campaign_id", TruncDate("created_at"))
+        .annotate(n=Count("pk"))
+    )
+    deltas = Counter()
+    for campaign_id, day, n in per_day:
+        deltas[(campaign_id, day, *old_bucket)] -= n
+        deltas[(campaign_id, day, *new_bucket)] += n
+    apply(deltas)
+
+
+def buckets(registrations):
+    """Group a registrations queryset into ``(campaign_id, day, gender, age_band, n)`` rows."""
+    return (
+        registrations.order_by()
+        .values_list("campaign_id", TruncDate("created_at"), F("user__gender"), age_band_expression("user__age"))
+        .annotate(n=Count("pk"))
+    )
+
+
+def record_inserted(after_pk):
+    """
+    Count the registrations with a primary key above ``after_pk``, inserted
+    in bulk without signals, with a single ``INSERT ... SELECT ... GROUP BY``
+    so the counting stays in the database. Returns the rollup rows written.
+    """
+    select, params = buckets(Registration.objects.filter(pk__gt=after_pk)).query.sql_with_params()
+    quote = connection.ops.quote_name
+    table = quote(RegistrationRollup._meta.db_table)
+    columns = [quote(RegistrationRollup._meta.get_field(name).column) for name in ("campaign", "day", "gender", "age_band")]
+    count = quote("count")
+    # SQLite needs the WHERE to tell the upsert clause from a join constraint
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}, {count}) SELECT * FROM ({select}) AS grouped WHERE true "
+        f"ON CONFLICT ({', '.join(columns)}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def rebuild(chunk_size=50000, progress=None):
+    """
+    Recompute the rollups from scratch in one transaction, aggregating
+    ``chunk_size`` registrations per query. ``/api/stats/`` keeps serving the
+    old counts until the new ones commit. Every change that moves a count
+    writes to the rollups table in its own transaction, so holding that
+    table's write lock for the rebuild makes those changes wait and land on
+    the rebuilt counts: registrations and profile edits stall until the
+    rebuild finishes. Returns the number of registrations counted.
+    """
+    counted = 0
+    with transaction.atomic():
+        lock_writes()
+        RegistrationRollup.objects.all().delete()
+        top = Registration.objects.aggregate(top=Max("pk"))["top"] or 0
+        for start in range(0, top, chunk_size):
+            chunk = buckets(Registration.objects.filter(pk__gt=start, pk__lte=start + chunk_size))
+            deltas = {(campaign_id, day, gender, band): n for campaign_id, day, gender, band, n in chunk}
+            apply(deltas)
+            counted += sum(deltas.values())
+            if progress:
+                progress(min(start + chunk_size, top), top)
+    return counted
+
+
+def lock_writes():
+    """
+    Block writes to the rollups, but not reads, until the transaction ends.
+    SQLite has one writer at a time, so the transaction's first write does it.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {connection.ops.quote_name(RegistrationRollup._meta.db_table)} IN EXCLUSIVE MODE")
@@ -0,0 +1,97 @@
+"""
+Seat allocation for capacity-limited campaigns.
+
+``Campaign.registered_count`` is maintained here instead of being counted per
+request. A seat is taken with one conditional UPDATE
+(``registered_count < capacity``): the database checks and increments under
+the campaign's row lock, so concurrent registrations never overbook and never
+hold a lock while the application decides. Callers insert the registration
+first and claim the seat last, inside one transaction, so the lock is held
+only until commit and a full campaign rolls the insert back.
+
+A freed seat goes to the oldest waitlist entry, when there is one.
+"""
+
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from campaigns.models import Campaign
+from .models import Registration, WaitlistEntry
+
+
+class CampaignFull(Exception):
+    pass
+
+
+def claim_seat(campaign_id, force=False):
+    """Take one seat; return False if the campaign is full. ``force`` ignores capacity."""
+    campaigns = Campaign.objects.filter(pk=campaign_id)
+    if not force:
+        campaigns = campaigns.filter(Q(capacity__isnull=True) | Q(registered_count__lt=F("capacity")))
+    return campaigns.update(registered_count=F("registered_count") + 1) == 1
+
+
+def add_seats(counts):
+    """Add ``{campaign_id: n}`` to the seat counts, one UPDATE per distinct n."""
+    by_count = sorted(counts.items(), key=lambda item: item[1])
+    for n, items in groupby(by_count, key=lambda item: item[1]):
+        if n:
+            Campaign.objects.filter(pk__in=[pk for pk, _ in items]).update(registered_count=F("registered_count") + n)
+
+
+def free_seat(campaign_id):
+    Campaign.objects.filter(pk=campaign_id, registered_count__gt=0).update(registered_count=F("registered_count") - 1)
+
+
+def release_seat(campaign_id, skip_user=None):
+    """Give a cancelled registration's seat to the waitlist, or back to the campaign."""
+    free_seat(campaign_id)
+    return promote_waitlist(campaign_id, skip_user=skip_user)
+
+
+def promote_waitlist(campaign_id, skip_user=None):
+    """
+    Register waitlisted users, oldest first, while seats are free. Concurrent
+    promoters skip each other's locked entries on Postgres. Returns the
+    registrations created.
+    """
+    entries = WaitlistEntry.objects.filter(campaign_id=campaign_id).order_by("created_at", "pk")
+    if skip_user is not None:
+        entries = entries.exclude(user_id=skip_user)
+    promoted = []
+    with transaction.atomic(savepoint=False):
+        while True:
+            entry = entries.select_for_update(skip_locked=True).first()
+            if entry is None or not claim_seat(campaign_id):
+                return promoted
+            entry.delete()
+            registration, created = Registration.objects.get_or_create(user_id=entry.user_id, campaign_id=campaign_id)
+            if created:
+                promoted.append(registration)
+            else:
+                # Registered some other way meanwhile; the seat is already counted
+                free_seat(campaign_id)
+
+
+def waitlist_position(entry):
+    """1-based position of ``entry`` in its campaign's queue."""
+    ahead = WaitlistEntry.objects.filter(campaign_id=entry.campaign_id).filter(
+        Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, pk__lt=entry.pk)
+    )
+    return ahead.count() + 1
+
+
+def recount_seats(campaigns=None):
+    """Recompute ``registered_count`` from the registrations table, e.g. after raw inserts."""
+    registered = (
+        Registration.objects.filter(campaign=OuterRef("pk"))
+        .order_by()
+        .values("campaign")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    campaigns = Campaign.objects.all() if campaigns is None else campaigns
+    return campaigns.update(registered_count=Coalesce(Subquery(registered), Value(0)))
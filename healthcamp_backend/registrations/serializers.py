@@ -39,3 +39,13 @@ class RegistrationSerializer(serializers.ModelSerializer):
             "campaign_maps_url",
             "campaign_detail",
         ]
+
+
+class BulkRegistrationItemSerializer(serializers.Serializer):
+    campaign = serializers.IntegerField(min_value=1)
+    # Only staff may register someone other than themselves
+    user = serializers.IntegerField(min_value=1, required=False)
+
+
+class BulkRegistrationSerializer(serializers.Serializer):
+    registrations = BulkRegistrationItemSerializer(many=True, allow_empty=False, max_length=1000)
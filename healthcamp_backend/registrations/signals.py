@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from campaigns.models import Campaign
+from core import events
+from . import rollups
+from .models import Registration
+from .seats import promote_waitlist, release_seat
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Registration)
+def release_registration_seat(sender, instance, origin=None, **kwargs):
+    # When the campaign itself is being deleted there is no seat to give back
+    if isinstance(origin, Campaign):
+        return
+    # A user being deleted may have waitlist entries that are going away too
+    release_seat(instance.campaign_id, skip_user=instance.user_id)
+
+
+@receiver(post_save, sender=Campaign)
+def fill_added_seats(sender, instance, created, raw=False, **kwargs):
+    # Raising capacity (or lifting it) frees seats for the waitlist
+    if not created and not raw:
+        promote_waitlist(instance.pk)
+
+
+@receiver(post_save, sender=Registration)
+def count_registration(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record(instance, instance.user)
+
+
+@receiver(post_delete, sender=Registration)
+def uncount_registration(sender, instance, origin=None, **kwargs):
+    # A deleted campaign's rollups are deleted with it
+    if isinstance(origin, Campaign):
+        return
+    user = origin if isinstance(origin, User) else instance.user
+    rollups.record(instance, user, sign=-1)
+
+
+@receiver(pre_save, sender=User)
+def remember_profile_bucket(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"gender", "age"} & set(update_fields):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list("gender", "age").first()
+    if stored is not None:
+        instance._stored_profile_bucket = (stored[0] or "", rollups.age_band(stored[1]))
+
+
+@receiver(post_save, sender=User)
+def move_profile_bucket(sender, instance, created, raw=False, **kwargs):
+    old = instance.__dict__.pop("_stored_profile_bucket", None)
+    new = rollups.profile_bucket(instance)
+    if old is not None and old != new:
+        rollups.move_user(instance.pk, old, new)
+
+
+@receiver(post_save, sender=Registration)
+def push_registration_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.publish(
+            events.user_topic(instance.user_id),
+            "registration.created",
+            {"id": instance.pk, "campaign": instance.campaign_id},
+        )
+
+
+@receiver(post_delete, sender=Registration)
+def push_registration_deleted(sender, instance, origin=None, **kwargs):
+    # Subscribers hear about a deleted campaign (campaign.deleted) or user once
+    if isinstance(origin, (Campaign, User)):
+        return
+    events.publish(
+        events.user_topic(instance.user_id),
+        "registration.deleted",
+        {"id": instance.pk, "campaign": instance.campaign_id},
+    )
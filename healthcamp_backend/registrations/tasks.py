@@ -0,0 +1,70 @@
+"""
+Day-before campaign reminders.
+
+``campaign_reminders`` runs daily at ``REMINDER_TIME`` and queues one
+``campaign_reminder_batch`` job for every campaign taking place the next day.
+A batch job reads the next ``REMINDER_BATCH_SIZE`` registrations by id
+(keyset pagination, so the thousandth batch costs the same as the first),
+bulk-inserts their notifications and queues the batch after it. A campaign
+with tens of thousands of registrations is worked through in short jobs,
+campaigns in parallel across workers, and a failure retries one batch only.
+"""
+
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from campaigns.models import Campaign
+from jobs.queue import enqueue, job
+from notifications.models import Notification
+from .models import Registration
+
+
+def batch_key(campaign_id, day, after):
+    return f"campaign_reminder:{campaign_id}:{day}:{after}"
+
+
+@job("campaign_reminders", daily_at=time.fromisoformat(settings.REMINDER_TIME))
+def campaign_reminders(payload):
+    day = (date.fromisoformat(payload["date"]) + timedelta(days=1)).isoformat()
+    for pk in Campaign.objects.filter(date=day).values_list("pk", flat=True):
+        # Keyed, so a retry of this job does not queue a campaign twice
+        enqueue("campaign_reminder_batch", {"campaign": pk, "date": day, "after": 0}, key=batch_key(pk, day, 0))
+
+
+@job("campaign_reminder_batch")
+def campaign_reminder_batch(payload):
+    campaign = Campaign.objects.filter(pk=payload["campaign"]).only("title", "location", "date").first()
+    if campaign is None or campaign.date.isoformat() != payload["date"]:
+        # Deleted or moved to another day since the reminders were queued
+        return
+    size = settings.REMINDER_BATCH_SIZE
+    batch = list(
+        Registration.objects.filter(campaign_id=campaign.pk, id__gt=payload["after"])
+        .order_by("id")
+        .values_list("id", "user_id")[:size]
+    )
+    if not batch:
+        return
+    title = f"Reminder: {campaign.title} is tomorrow"
+    body = f"{campaign.title} takes place on {campaign.date:%d %b %Y} at {campaign.location}."
+    with transaction.atomic():
+        # ignore_conflicts: a retried batch skips the users it already reached
+        Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=user_id, campaign_id=campaign.pk, kind=Notification.CAMPAIGN_REMINDER,
+                    title=title, body=body,
+                )
+                for _, user_id in batch
+            ],
+            ignore_conflicts=True,
+            batch_size=500,
+        )
+        if len(batch) == size:
+            after = batch[-1][0]
+            enqueue(
+                "campaign_reminder_batch", {**payload, "after": after},
+                key=batch_key(campaign.pk, payload["date"], after),
+            )
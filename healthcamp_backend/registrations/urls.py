@@ -1,7 +1,18 @@
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import RegistrationViewSet
+from .async_views import AsyncMyRegistrationsView
+from .views import RegistrationStatsView, RegistrationViewSet
 
 router = DefaultRouter()
 router.register(r"registrations", RegistrationViewSet, basename="registration")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("stats/", RegistrationStatsView.as_view(), name="registration-stats"),
+] + router.urls
+
+if settings.ASYNC_READ_VIEWS:
+    # Native async read path for ASGI deployments (see core.async_views)
+    urlpatterns = [
+        path("registrations/mine/", AsyncMyRegistrationsView.as_view(), name="registration-mine"),
+    ] + urlpatterns
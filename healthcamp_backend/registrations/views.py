@@ -1,18 +1,74 @@
+from collections import Counter
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import viewsets, permissions
-from rest_framework.exceptions import NotAuthenticated
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
 from rest_framework import status
 
-from .models import Registration
-from .serializers import RegistrationSerializer
+from campaigns.models import Campaign
+from campaigns.views import _parse_date_param, _parse_list_param
+from core import events
+from core.db_router import ReplicaReadMixin
+from core.instrumentation import TimedSerializationMixin, serializer_timer
+from users.default_patient import get_default_patient
+from .export import FORMATS, export_response, filter_registrations
+from . import rollups
+from .models import Registration, RegistrationRollup, WaitlistEntry
+from .seats import CampaignFull, add_seats, claim_seat, waitlist_position
+from .serializers import BulkRegistrationSerializer, RegistrationSerializer
+
+
+def _parse_ids_param(params, name):
+    try:
+        return [int(v) for v in params.get(name, "").split(",") if v.strip()]
+    except ValueError:
+        raise ValidationError({name: ["Enter ids separated by commas."]})
 
 
-class RegistrationViewSet(viewsets.ModelViewSet):
+def registrations_for(user_id):
+    """A user's registrations with everything the serializer reads."""
+    return (
+        Registration.objects.filter(user_id=user_id)
+        .select_related("campaign")
+        .prefetch_related("campaign__vaccines", "campaign__medicines")
+    )
+
+
+def insert_registrations(pairs, created_at, batch_size=500):
+    """
+    Insert ``(user_id, campaign_id)`` pairs, skipping those already registered,
+    and return ``{pair: id}`` for the rows actually inserted. The database
+    reports them (``ON CONFLICT DO NOTHING RETURNING``), so neither concurrent
+    calls nor clock skew can mislabel a row.
+    """
+    quote = connection.ops.quote_name
+    columns = [quote(Registration._meta.get_field(name).column) for name in ("user", "campaign", "created_at")]
+    created_at = connection.ops.adapt_datetimefield_value(created_at)
+    inserted = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start : start + batch_size]
+            cursor.execute(
+                f"INSERT INTO {quote(Registration._meta.db_table)} ({', '.join(columns)}) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({columns[0]}, {columns[1]}) DO NOTHING "
+                f"RETURNING {quote(Registration._meta.pk.column)}, {columns[0]}, {columns[1]}",
+                [value for user_id, campaign_id in batch for value in (user_id, campaign_id, created_at)],
+            )
+            for pk, user_id, campaign_id in cursor.fetchall():
+                inserted[(user_id, campaign_id)] = pk
+    return inserted
+
+
+class RegistrationViewSet(ReplicaReadMixin, TimedSerializationMixin, viewsets.ModelViewSet):
     serializer_class = RegistrationSerializer
     # AllowAny: we'll attach a default patient if unauthenticated
     permission_classes = [permissions.AllowAny]
@@ -22,23 +78,19 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             # If default patient flow is enabled, show registrations for the default patient
             if getattr(settings, "USE_DEFAULT_PATIENT_FOR_UNAUTH", False):
-                User = get_user_model()
-                try:
-                    default_user = User.objects.get(username=settings.DEFAULT_PATIENT_USERNAME)
-                except User.DoesNotExist:
-                    return Registration.objects.none()
-                return (
-                    Registration.objects.filter(user=default_user)
-                    .select_related("campaign")
-                    .prefetch_related("campaign__vaccines", "campaign__medicines")
-                )
+                return registrations_for(get_default_patient().pk)
             # Otherwise, anonymous users see no registrations
             return Registration.objects.none()
-        return (
-            Registration.objects.filter(user=user)
-            .select_related("campaign")
-            .prefetch_related("campaign__vaccines", "campaign__medicines")
-        )
+        return registrations_for(user.pk)
+
+    def get_registrant(self):
+        """Return the user registrations are made for, falling back to the default patient."""
+        user = self.request.user
+        if user.is_authenticated:
+            return user
+        if not getattr(settings, "USE_DEFAULT_PATIENT_FOR_UNAUTH", False):
+            raise NotAuthenticated("Authentication credentials were not provided.")
+        return get_default_patient()
 
     def create(self, request, *args, **kwargs):
         # Validate input first
@@ -46,22 +98,7 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         # Resolve user (AllowAny with default patient fallback)
-        user = request.user
-        if not user.is_authenticated:
-            if not getattr(settings, "USE_DEFAULT_PATIENT_FOR_UNAUTH", False):
-                raise NotAuthenticated("Authentication credentials were not provided.")
-            User = get_user_model()
-            user, _ = User.objects.get_or_create(
-                username=settings.DEFAULT_PATIENT_USERNAME,
-                defaults={
-                    "email": settings.DEFAULT_PATIENT_EMAIL,
-                    "full_name": settings.DEFAULT_PATIENT_FULL_NAME,
-                    "phone": settings.DEFAULT_PATIENT_PHONE,
-                },
-            )
-            if not user.has_usable_password():
-                user.set_password(settings.DEFAULT_PATIENT_PASSWORD)
-                user.save(update_fields=["password"])
+        user = self.get_registrant()
 
         campaign = serializer.validated_data.get("campaign")
         if campaign is None:
@@ -76,12 +113,19 @@ class RegistrationViewSet(viewsets.ModelViewSet):
         )
         if existing:
             existing_ser = self.get_serializer(existing)
-            body = {"detail": "You are already registered for this campaign.", "data": existing_ser.data}
+            with serializer_timer():
+                body = {"detail": "You are already registered for this campaign.", "data": existing_ser.data}
             return Response(body, status=status.HTTP_200_OK)
 
-        # Create new
+        # Create new; the seat is claimed last so the campaign row stays
+        # locked only until commit (see registrations.seats)
         try:
-            instance = serializer.save(user=user)
+            with transaction.atomic():
+                instance = serializer.save(user=user)
+                if not claim_seat(campaign.pk):
+                    raise CampaignFull
+        except CampaignFull:
+            return self.campaign_full(user, campaign)
         except IntegrityError:
             # In rare race conditions, fall back to fetching existing and return 200
             existing = (
@@ -92,17 +136,225 @@ class RegistrationViewSet(viewsets.ModelViewSet):
             )
             if existing:
                 existing_ser = self.get_serializer(existing)
-                body = {"detail": "You are already registered for this campaign.", "data": existing_ser.data}
+                with serializer_timer():
+                    body = {"detail": "You are already registered for this campaign.", "data": existing_ser.data}
                 return Response(body, status=status.HTTP_200_OK)
             # If truly another integrity error
             raise
 
         out = self.get_serializer(instance)
-        headers = self.get_success_headers(out.data)
-        return Response({"detail": "Registration successful.", "data": out.data}, status=status.HTTP_201_CREATED, headers=headers)
+        with serializer_timer():
+            data = out.data
+        headers = self.get_success_headers(data)
+        return Response({"detail": "Registration successful.", "data": data}, status=status.HTTP_201_CREATED, headers=headers)
+
+    def campaign_full(self, user, campaign):
+        if not campaign.waitlist_enabled:
+            return Response({"detail": "This campaign is full."}, status=status.HTTP_409_CONFLICT)
+        entry, created = WaitlistEntry.objects.get_or_create(user=user, campaign=campaign)
+        body = {
+            "detail": "This campaign is full; you have been added to the waitlist."
+            if created
+            else "You are already on the waitlist for this campaign.",
+            "waitlist": {
+                "campaign": campaign.pk,
+                "position": waitlist_position(entry),
+                "created_at": entry.created_at,
+            },
+        }
+        return Response(body, status=status.HTTP_202_ACCEPTED)
+
+    def perform_destroy(self, instance):
+        # The post_delete signal hands the seat to the waitlist in the same transaction
+        with transaction.atomic():
+            instance.delete()
+
+    @action(detail=False, methods=["get"], url_path="export", permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Stream registrations with attendee and campaign columns for organizers.
+
+        ``?output=csv`` (default) or ``ndjson``; filter with ``campaign``
+        (comma-separated ids), ``date_from``/``date_to`` (campaign date) and
+        ``district`` (matched against the campaign location).
+        """
+        params = request.query_params
+        fmt = params.get("output", "csv")
+        if fmt not in FORMATS:
+            raise ValidationError({"output": [f"Choose one of: {', '.join(FORMATS)}."]})
+        queryset = filter_registrations(
+            Registration.objects.all(),
+            campaigns=_parse_ids_param(params, "campaign"),
+            date_from=_parse_date_param(params, "date_from"),
+            date_to=_parse_date_param(params, "date_to"),
+            district=params.get("district", "").strip(),
+        )
+        # Rows are read after the view returns, outside the routing context;
+        # fix the database now so an export can still use a replica
+        return export_response(request, queryset.using(queryset.db), fmt)
 
     @action(detail=False, methods=["get"], url_path="mine")
     def mine(self, request):
         qs = self.get_queryset()
         serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        with serializer_timer():
+            data = serializer.data
+        return Response(data)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Register many (user, campaign) pairs in one transaction.
+
+        Accepts ``{"registrations": [{"campaign": 1, "user": 2}, ...]}`` or a
+        bare list. Items without ``user`` are made for the requester (or the
+        default patient). Pairs that already exist are left untouched, matching
+        the idempotent behaviour of ``create``: ``insert_registrations``
+        reports which rows it inserted, and one follow-up query reads the ids
+        of the rest. Inserted rows are counted for seats and rollups and
+        pushed to their users as ``create`` would through its signals.
+
+        Capacity-limited campaigns are locked for the duration and fill in
+        request order; items beyond the free seats fail with "Campaign is
+        full." and are not waitlisted.
+        """
+        payload = request.data if isinstance(request.data, dict) else {"registrations": request.data}
+        serializer = BulkRegistrationSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["registrations"]
+
+        if any("user" in item for item in items) and not request.user.is_staff:
+            raise PermissionDenied("Only staff can register other users.")
+        registrant = self.get_registrant() if any("user" not in item for item in items) else None
+        pairs = [(item.get("user", registrant.pk if registrant else None), item["campaign"]) for item in items]
+
+        user_ids = {u for u, _ in pairs}
+        campaign_ids = {c for _, c in pairs}
+        known_campaigns = set(Campaign.objects.filter(pk__in=campaign_ids).values_list("pk", flat=True))
+        known_users = {registrant.pk} if registrant else set()
+        if user_ids - known_users:
+            known_users |= set(
+                get_user_model().objects.filter(pk__in=user_ids - known_users).values_list("pk", flat=True)
+            )
+
+        errors = {}
+        for user_id, campaign_id in pairs:
+            if campaign_id not in known_campaigns:
+                errors[(user_id, campaign_id)] = "Campaign not found."
+            elif user_id not in known_users:
+                errors[(user_id, campaign_id)] = "User not found."
+        valid = list(dict.fromkeys(p for p in pairs if p not in errors))
+
+        rows, created = {}, {}
+        if valid:
+            with transaction.atomic():
+                limited = {
+                    pk: capacity - registered
+                    for pk, capacity, registered in Campaign.objects.select_for_update()
+                    .filter(pk__in={c for _, c in valid}, capacity__isnull=False)
+                    .order_by("pk")
+                    .values_list("pk", "capacity", "registered_count")
+                }
+                if limited:
+                    already = set(
+                        Registration.objects.filter(
+                            user_id__in={u for u, c in valid if c in limited}, campaign_id__in=limited
+                        ).values_list("user_id", "campaign_id")
+                    )
+                    for user_id, campaign_id in valid:
+                        if campaign_id not in limited or (user_id, campaign_id) in already:
+                            continue
+                        if limited[campaign_id] > 0:
+                            limited[campaign_id] -= 1
+                        else:
+                            errors[(user_id, campaign_id)] = "Campaign is full."
+                    valid = [p for p in valid if p not in errors]
+
+                now = timezone.now()
+                created = insert_registrations(valid, now)
+                existing = [pair for pair in valid if pair not in created]
+                if existing:
+                    found = Registration.objects.filter(
+                        user_id__in={u for u, _ in existing}, campaign_id__in={c for _, c in existing}
+                    ).values_list("user_id", "campaign_id", "id")
+                    rows = {(u, c): pk for u, c, pk in found}
+                rows.update(created)
+
+                # Raw inserts send no post_save: do what its receivers do
+                add_seats(Counter(c for _, c in created))
+                if created:
+                    users = get_user_model().objects.only("gender", "age").in_bulk({u for u, _ in created})
+                    rollups.record_many([(c, now, u) for u, c in created], users)
+                for (user_id, campaign_id), pk in created.items():
+                    events.publish(
+                        events.user_topic(user_id), "registration.created", {"id": pk, "campaign": campaign_id}
+                    )
+
+        results = []
+        counts = {"created": 0, "already_registered": 0, "failed": 0}
+        for user_id, campaign_id in pairs:
+            entry = {"user": user_id, "campaign": campaign_id}
+            if (user_id, campaign_id) in errors:
+                entry.update(status="failed", error=errors[(user_id, campaign_id)])
+            else:
+                pair = (user_id, campaign_id)
+                entry.update(id=rows[pair], status="created" if pair in created else "already_registered")
+            counts[entry["status"]] += 1
+            results.append(entry)
+
+        code = status.HTTP_201_CREATED if counts["created"] else status.HTTP_200_OK
+        return Response({"detail": "Bulk registration processed.", **counts, "results": results}, status=code)
+
+
+class RegistrationStatsView(APIView):
+    """
+    Registration counts for dashboards, read from the rollups (see
+    ``registrations.rollups``) so the cost follows the number of buckets
+    returned, not the number of registrations.
+
+    ``group_by`` takes any of day, campaign, type, gender and age_band
+    (default day). Filter with ``campaign`` (ids), ``type`` and
+    ``date_from``/``date_to`` (registration day).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    groups = {
+        "day": "day",
+        "campaign": "campaign",
+        "type": "campaign__type",
+        "gender": "gender",
+        "age_band": "age_band",
+    }
+
+    def get(self, request):
+        params = request.query_params
+        group_by = list(dict.fromkeys(_parse_list_param(params, "group_by", list(self.groups)))) or ["day"]
+        types = _parse_list_param(params, "type", [choice for choice, _ in Campaign.TYPE_CHOICES])
+        campaigns = _parse_ids_param(params, "campaign")
+        date_from = _parse_date_param(params, "date_from")
+        date_to = _parse_date_param(params, "date_to")
+
+        queryset = RegistrationRollup.objects.all()
+        if campaigns:
+            queryset = queryset.filter(campaign_id__in=campaigns)
+        if types:
+            queryset = queryset.filter(campaign__type__in=types)
+        if date_from:
+            queryset = queryset.filter(day__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(day__lte=date_to)
+
+        paths = [self.groups[name] for name in group_by]
+        rows = queryset.values(*paths).annotate(total=Sum("count")).filter(total__gt=0).order_by(*paths)
+        with serializer_timer():
+            results = [
+                {**{name: row[path] for name, path in zip(group_by, paths)}, "count": row["total"]}
+                for row in rows
+            ]
+        return Response(
+            {
+                "group_by": group_by,
+                "total": sum(row["count"] for row in results),
+                "results": results,
+            }
+        )
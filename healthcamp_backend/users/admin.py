@@ -1,11 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from core.admin_tools import LargeTableAdmin
+
 User = get_user_model()
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(LargeTableAdmin):
     list_display = ("username", "email", "full_name", "age", "gender")
-    search_fields = ("username", "email", "full_name", "phone")
+    search_fields = ("username__startswith", "full_name__startswith", "email__exact", "phone__exact")
+    search_help_text = "Start of a username or full name, or an exact email or phone."
     list_filter = ("gender",)
+    # Indexed, and gives autocomplete a stable order
+    ordering = ("username",)
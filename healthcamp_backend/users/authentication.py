@@ -0,0 +1,157 @@
+"""
+JWT authentication that resolves the user without a database query.
+
+``CachedJWTAuthentication`` keeps a snapshot of each authenticated user's row
+in the cache for ``AUTH_USER_CACHE_TTL`` seconds. Keys are stamped with the
+user model's column list, so a deploy that changes the model never reads an
+incompatible snapshot. The password hash is left out; for
+``CHECK_REVOKE_TOKEN`` the snapshot holds only the digest of it that tokens
+carry in their revoke claim. Saving or deleting a user drops its snapshot
+(``users.signals``), which covers ``MeView.patch`` and admin edits.
+
+With ``JWT_PROFILE_CLAIMS`` enabled, access tokens issued at login and refresh
+also carry the fields ``UserSerializer`` renders plus the auth flags, and the
+user is built straight from the token. A user change leaves a marker in the
+cache for one access-token lifetime, and tokens issued before it fall back to
+the snapshot. Every worker must see that marker, so claims need a shared cache
+(``check_profile_claims()`` refuses a per-process one at start-up); otherwise
+a deactivated or demoted user's token would keep its flags on the other
+workers. If the cache is flushed, older tokens may show a changed profile
+until they expire, as with any claims carried in a JWT.
+
+Users are rebuilt with ``Model.from_db``. Fields missing from the claims are
+deferred, so saving such an instance only writes the fields it holds; views
+that update the user should still reload the row first.
+"""
+
+import time
+import zlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+User = get_user_model()
+
+PROFILE_CLAIM = "profile"
+# UserSerializer's fields plus what permission checks read
+PROFILE_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "full_name",
+    "age",
+    "gender",
+    "phone",
+    "address",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+# The password hash never goes into the (possibly shared) cache
+SNAPSHOT_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != "password"]
+PASSWORD_DIGEST = "password_digest"
+SNAPSHOT_STAMP = zlib.crc32(",".join(SNAPSHOT_FIELDS).encode("ascii"))
+USER_KEY = "auth:user:{}:{}"
+CHANGED_KEY = "auth:user-changed:{}"
+
+
+def profile_claims_enabled():
+    return getattr(settings, "JWT_PROFILE_CLAIMS", False)
+
+
+def check_profile_claims():
+    """Refuse ``JWT_PROFILE_CLAIMS`` on a cache that other workers cannot read."""
+    if profile_claims_enabled() and isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            "JWT_PROFILE_CLAIMS needs a cache shared by every worker (CACHE_BACKEND=redis); "
+            "user changes are only signalled through it."
+        )
+
+
+def build_user(data):
+    names = [name for name in SNAPSHOT_FIELDS if name in data]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [data[name] for name in names])
+
+
+def snapshot(user):
+    data = {name: getattr(user, name) for name in SNAPSHOT_FIELDS}
+    if api_settings.CHECK_REVOKE_TOKEN:
+        data[PASSWORD_DIGEST] = get_md5_hash_password(user.password)
+    return data
+
+
+def invalidate_user(user):
+    user_id = getattr(user, api_settings.USER_ID_FIELD)
+    cache.delete(USER_KEY.format(SNAPSHOT_STAMP, user_id))
+    if profile_claims_enabled():
+        lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set(CHANGED_KEY.format(user_id), time.time(), lifetime)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = validated_token.get(PROFILE_CLAIM)
+        if claims and self.claims_current(validated_token, user_id):
+            data = claims
+        else:
+            key = USER_KEY.format(SNAPSHOT_STAMP, user_id)
+            data = cache.get(key)
+            if data is None:
+                user = super().get_user(validated_token)
+                cache.set(key, snapshot(user), getattr(settings, "AUTH_USER_CACHE_TTL", 60))
+                return user
+        user = build_user(data)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != data.get(
+            PASSWORD_DIGEST
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def claims_current(self, validated_token, user_id):
+        # Revocation compares the password hash, which claims do not carry
+        if not profile_claims_enabled() or api_settings.CHECK_REVOKE_TOKEN:
+            return False
+        changed_at = cache.get(CHANGED_KEY.format(user_id))
+        return changed_at is None or changed_at < validated_token.get("iat", 0)
+
+
+class ProfileClaimsMixin:
+    """Embed the profile claims in the access token when ``JWT_PROFILE_CLAIMS`` is on."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if profile_claims_enabled():
+            access = AccessToken(data["access"])
+            user = getattr(self, "user", None) or CachedJWTAuthentication().get_user(access)
+            access[PROFILE_CLAIM] = {name: getattr(user, name) for name in PROFILE_FIELDS}
+            data["access"] = str(access)
+        return data
+
+
+class ProfileTokenObtainPairSerializer(ProfileClaimsMixin, TokenObtainPairSerializer):
+    pass
+
+
+class ProfileTokenRefreshSerializer(ProfileClaimsMixin, TokenRefreshSerializer):
+    pass
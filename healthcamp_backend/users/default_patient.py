@@ -0,0 +1,62 @@
+"""
+Process-wide resolver for the default patient used by kiosk/demo flows.
+
+The user row is bootstrapped (created and given a password) at most once per
+process and then served from memory, so unauthenticated traffic pays no extra
+queries and never hashes a password on the request path. The cached instance
+is dropped when the user is saved or deleted (see ``users.signals``) and
+refreshed after ``DEFAULT_PATIENT_CACHE_TTL`` seconds so edits made by other
+processes are eventually picked up.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+_lock = threading.Lock()
+_cached = None  # (user, expires_at)
+
+
+def _bootstrap():
+    User = get_user_model()
+    user, created = User.objects.get_or_create(
+        username=settings.DEFAULT_PATIENT_USERNAME,
+        defaults={
+            "email": settings.DEFAULT_PATIENT_EMAIL,
+            "full_name": settings.DEFAULT_PATIENT_FULL_NAME,
+            "phone": settings.DEFAULT_PATIENT_PHONE,
+        },
+    )
+    if created or not user.has_usable_password():
+        user.set_password(settings.DEFAULT_PATIENT_PASSWORD)
+        user.save(update_fields=["password"])
+    return user
+
+
+def get_default_patient():
+    """Return the default patient, creating it on first use."""
+    global _cached
+    cached = _cached
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    with _lock:
+        cached = _cached
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        user = _bootstrap()
+        _cached = (user, time.monotonic() + getattr(settings, "DEFAULT_PATIENT_CACHE_TTL", 300))
+        return user
+
+
+def is_default_patient(user):
+    cached = _cached
+    if cached is not None and user.pk == cached[0].pk:
+        return True
+    return user.username == settings.DEFAULT_PATIENT_USERNAME
+
+
+def invalidate_default_patient():
+    global _cached
+    _cached = None
@@ -9,11 +9,20 @@ class User(AbstractUser):
         ("other", "Other"),
     )
 
-    full_name = models.CharField(max_length=255, blank=True)
+    # db_index so Postgres also builds the pattern-ops index for prefix search
+    full_name = models.CharField(max_length=255, blank=True, db_index=True)
     age = models.PositiveIntegerField(null=True, blank=True)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, blank=True)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
 
+    class Meta(AbstractUser.Meta):
+        swappable = "AUTH_USER_MODEL"
+        indexes = [
+            # Admin search (see users.admin)
+            models.Index(fields=["email"], name="user_email_idx"),
+            models.Index(fields=["phone"], name="user_phone_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.username or self.full_name or str(self.pk)
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .default_patient import invalidate_default_patient, is_default_patient
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_default_patient(sender, instance, **kwargs):
+    if is_default_patient(instance):
+        invalidate_default_patient()
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance)
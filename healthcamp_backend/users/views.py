@@ -1,15 +1,17 @@
 from django.contrib.auth import get_user_model
-from django.conf import settings
+from django.db import transaction
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.instrumentation import TimedSerializationMixin, serializer_timer
+from .default_patient import get_default_patient
 from .serializers import SignupSerializer, UserSerializer
 
 User = get_user_model()
 
 
-class SignupView(generics.CreateAPIView):
+class SignupView(TimedSerializationMixin, generics.CreateAPIView):
     serializer_class = SignupSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -18,29 +20,28 @@ class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        return Response(UserSerializer(request.user).data)
+        with serializer_timer():
+            data = UserSerializer(request.user).data
+        return Response(data)
 
     def patch(self, request):
-        serializer = UserSerializer(instance=request.user, data=request.data, partial=True)
+        # request.user may come from the auth cache or token claims; update the current row
+        user = User.objects.get(pk=request.user.pk)
+        serializer = UserSerializer(instance=user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data)
+        # A gender/age change moves the user's registration rollups; commit both together
+        with transaction.atomic():
+            serializer.save()
+        with serializer_timer():
+            data = serializer.data
+        return Response(data)
 
 
 class DefaultPatientView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        user, created = User.objects.get_or_create(
-            username=settings.DEFAULT_PATIENT_USERNAME,
-            defaults={
-                "email": settings.DEFAULT_PATIENT_EMAIL,
-                "full_name": settings.DEFAULT_PATIENT_FULL_NAME,
-                "phone": settings.DEFAULT_PATIENT_PHONE,
-            },
-        )
-        if created or not user.has_usable_password():
-            user.set_password(settings.DEFAULT_PATIENT_PASSWORD)
-            user.save()
-        data = UserSerializer(user).data
+        patient = get_default_patient()
+        with serializer_timer():
+            data = UserSerializer(patient).data
         return Response(data)